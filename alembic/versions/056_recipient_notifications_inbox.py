@@ -0,0 +1,112 @@
+"""recipient_notifications_inbox
+
+Revision ID: 056
+Revises: 055
+Create Date: 2026-10-17 14:02:18.731942
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "056"
+down_revision: Union[str, None] = "055"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "recipient_notifications",
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True),
+        schema="xi_back_2",
+    )
+    op.add_column(
+        "recipient_notifications",
+        sa.Column("kind", sa.String(length=100), nullable=True),
+        schema="xi_back_2",
+    )
+
+    connection = op.get_bind()
+    metadata = sa.MetaData(schema="xi_back_2")
+
+    Notification = sa.Table("notifications", metadata, autoload_with=connection)
+    RecipientNotification = sa.Table(
+        "recipient_notifications", metadata, autoload_with=connection
+    )
+
+    connection.execute(
+        sa.update(RecipientNotification)
+        .values(
+            created_at=Notification.c.created_at,
+            kind=sa.cast(Notification.c.payload, postgresql.JSONB)["kind"].astext,
+        )
+        .where(RecipientNotification.c.notification_id == Notification.c.id)
+    )
+
+    op.alter_column(
+        "recipient_notifications",
+        column_name="created_at",
+        nullable=False,
+        schema="xi_back_2",
+    )
+    op.alter_column(
+        "recipient_notifications",
+        column_name="kind",
+        nullable=False,
+        schema="xi_back_2",
+    )
+
+    op.create_index(
+        "recipient_notifications_inbox_index",
+        "recipient_notifications",
+        [
+            "recipient_user_id",
+            sa.literal_column("created_at DESC"),
+            sa.literal_column("notification_id DESC"),
+        ],
+        unique=False,
+        schema="xi_back_2",
+    )
+    op.create_index(
+        "recipient_notifications_unread_index",
+        "recipient_notifications",
+        ["recipient_user_id"],
+        unique=False,
+        schema="xi_back_2",
+        postgresql_where=sa.text("read_at IS NULL"),
+    )
+    # covered by the inbox index
+    op.drop_index(
+        op.f("ix_xi_back_2_recipient_notifications_recipient_user_id"),
+        table_name="recipient_notifications",
+        schema="xi_back_2",
+    )
+
+
+def downgrade() -> None:
+    op.create_index(
+        op.f("ix_xi_back_2_recipient_notifications_recipient_user_id"),
+        "recipient_notifications",
+        ["recipient_user_id"],
+        unique=False,
+        schema="xi_back_2",
+    )
+    op.drop_index(
+        "recipient_notifications_unread_index",
+        table_name="recipient_notifications",
+        schema="xi_back_2",
+        postgresql_where=sa.text("read_at IS NULL"),
+    )
+    op.drop_index(
+        "recipient_notifications_inbox_index",
+        table_name="recipient_notifications",
+        schema="xi_back_2",
+    )
+    op.drop_column("recipient_notifications", "kind", schema="xi_back_2")
+    op.drop_column("recipient_notifications", "created_at", schema="xi_back_2")
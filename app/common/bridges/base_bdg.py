@@ -1,7 +1,81 @@
+import asyncio
+from collections.abc import Iterable
 from contextlib import AsyncExitStack
+from contextvars import ContextVar
+from typing import Any
 
 from faststream.redis import RedisBroker
-from httpx import AsyncClient
+from httpx import URL, ASGITransport, AsyncClient, Request, Response
+from starlette.types import ASGIApp
+
+from app.common.config import settings
+from app.common.models.outbox_messages_db import OutboxMessage
+from app.common.sqlalchemy_ext import session_context
+
+
+class LoopbackASGITransport(ASGITransport):
+    async def handle_async_request(self, request: Request) -> Response:
+        # the app is called in a separate task to copy the context: otherwise
+        # the inner request would override the caller's contextvars, like
+        # the database session from `session_context`
+        return await asyncio.create_task(super().handle_async_request(request))
+
+
+StreamMessage = tuple[str, Any]  # stream name & message body
+
+
+async def publish_many(broker: RedisBroker, messages: list[StreamMessage]) -> None:
+    if len(messages) == 0:
+        return
+    if len(messages) == 1:
+        stream, message = messages[0]
+        await broker.publish(message=message, stream=stream)
+        return
+
+    client = broker.config.broker_config.connection.client
+    async with client.pipeline(transaction=False) as pipeline:
+        for stream, message in messages:
+            await broker.publish(message=message, stream=stream, pipeline=pipeline)
+        await pipeline.execute()
+
+
+async def store_in_outbox(messages: list[StreamMessage]) -> bool:
+    """
+    Insert messages into the outbox as part of the current transaction,
+    if it's possible (outbox is enabled & the session is not on a replica)
+    """
+    lazy_session = session_context.get()
+    if not settings.outbox.enabled or lazy_session is None:
+        return False
+
+    if lazy_session.is_replica_session:
+        if lazy_session.is_started:
+            return False
+        lazy_session.route(use_replica=False)
+
+    await OutboxMessage.create_many(
+        {"stream": stream, "message": message} for stream, message in messages
+    )
+    return True
+
+
+class PublishBuffer:
+    def __init__(self) -> None:
+        self.broker_to_messages: dict[RedisBroker, list[StreamMessage]] = {}
+        self.has_outbox_messages = False
+
+    def add(self, broker: RedisBroker, messages: Iterable[StreamMessage]) -> None:
+        self.broker_to_messages.setdefault(broker, []).extend(messages)
+
+    async def flush(self) -> None:
+        for broker, messages in self.broker_to_messages.items():
+            await publish_many(broker, messages)
+        self.broker_to_messages.clear()
+
+
+publish_buffer_context: ContextVar[PublishBuffer | None] = ContextVar(
+    "publish_buffer_context", default=None
+)
 
 
 class BaseBridge:
@@ -11,6 +85,8 @@ class BaseBridge:
         base_url: str,
         headers: dict[str, str] | None = None,
     ) -> None:
+        self.base_url = base_url
+        self.headers = headers
         self.client = AsyncClient(base_url=base_url, headers=headers)
         self._broker: RedisBroker | None = None
 
@@ -20,6 +96,47 @@ class BaseBridge:
             raise EnvironmentError("Broker is not initialized")
         return self._broker
 
-    async def setup(self, exit_stack: AsyncExitStack, broker: RedisBroker) -> None:
+    @property
+    def is_colocated(self) -> bool:
+        base_url = URL(self.base_url)
+        bridge_base_url = URL(settings.bridge_base_url)
+        if (base_url.scheme, base_url.host, base_url.port) != (
+            bridge_base_url.scheme,
+            bridge_base_url.host,
+            bridge_base_url.port,
+        ):
+            return False
+        bridge_path = bridge_base_url.path.rstrip("/")
+        return base_url.path == bridge_path or base_url.path.startswith(
+            f"{bridge_path}/"
+        )
+
+    async def setup(
+        self,
+        exit_stack: AsyncExitStack,
+        broker: RedisBroker,
+        asgi_app: ASGIApp | None = None,
+    ) -> None:
+        if asgi_app is not None and self.is_colocated:
+            self.client = AsyncClient(
+                transport=LoopbackASGITransport(app=asgi_app),
+                base_url=self.base_url,
+                headers=self.headers,
+            )
         await exit_stack.enter_async_context(self.client)
         self._broker = broker
+
+    async def publish_many(self, stream: str, messages: Iterable[Any]) -> None:
+        stream_messages = [(stream, message) for message in messages]
+        publish_buffer = publish_buffer_context.get()
+        if len(stream_messages) == 0:
+            return
+        if publish_buffer is None:
+            await publish_many(self.broker, stream_messages)
+        elif await store_in_outbox(stream_messages):
+            publish_buffer.has_outbox_messages = True
+        else:
+            publish_buffer.add(self.broker, stream_messages)
+
+    async def publish(self, stream: str, message: Any) -> None:
+        await self.publish_many(stream, [message])
@@ -0,0 +1,20 @@
+from httpx import Response
+from pydantic import TypeAdapter
+
+from app.common.bridges.base_bdg import BaseBridge
+from app.common.bridges.utils import validate_external_json_response
+from app.common.config import settings
+
+
+class CommunitiesBridge(BaseBridge):
+    def __init__(self) -> None:
+        super().__init__(
+            base_url=f"{settings.bridge_base_url}/internal/community-service",
+            headers={"X-Api-Key": settings.api_key},
+        )
+
+    @validate_external_json_response(TypeAdapter(list[int]))
+    async def list_community_participant_user_ids(self, community_id: int) -> Response:
+        return await self.client.get(
+            f"/communities/{community_id}/participants/user-ids/",
+        )
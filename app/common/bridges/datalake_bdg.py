@@ -1,3 +1,5 @@
+from collections.abc import Iterable
+
 from app.common.bridges.base_bdg import BaseBridge
 from app.common.config import settings
 from app.common.schemas.datalake_sch import DatalakeEventInputSchema
@@ -11,7 +13,15 @@ class DatalakeBridge(BaseBridge):
         )
 
     async def record_datalake_event(self, data: DatalakeEventInputSchema) -> None:
-        await self.broker.publish(
+        await self.publish(
+            stream=settings.datalake_events_record_stream_name,
             message=data.model_dump(mode="json"),
+        )
+
+    async def record_datalake_events(
+        self, data: Iterable[DatalakeEventInputSchema]
+    ) -> None:
+        await self.publish_many(
             stream=settings.datalake_events_record_stream_name,
+            messages=(event.model_dump(mode="json") for event in data),
         )
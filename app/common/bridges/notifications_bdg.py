@@ -1,10 +1,15 @@
+from collections.abc import Iterable
+
 from httpx import Response
 from pydantic import TypeAdapter
 
 from app.common.bridges.base_bdg import BaseBridge
 from app.common.bridges.utils import validate_external_json_response
 from app.common.config import settings
-from app.common.schemas.notifications_sch import NotificationInputSchema
+from app.common.schemas.notifications_sch import (
+    NotificationInputSchema,
+    TelegramMessageInputSchema,
+)
 from app.common.schemas.user_contacts_sch import UserContactSchema
 
 
@@ -38,7 +43,21 @@ class NotificationsBridge(BaseBridge):
         )
 
     async def send_notification(self, data: NotificationInputSchema) -> None:
-        await self.broker.publish(
+        await self.publish(
+            stream=settings.notifications_send_stream_name,
             message=data.model_dump(mode="json"),
+        )
+
+    async def send_notifications(self, data: Iterable[NotificationInputSchema]) -> None:
+        await self.publish_many(
             stream=settings.notifications_send_stream_name,
+            messages=(notification.model_dump(mode="json") for notification in data),
+        )
+
+    async def send_telegram_messages(
+        self, data: Iterable[TelegramMessageInputSchema]
+    ) -> None:
+        await self.publish_many(
+            stream=settings.telegram_messages_send_stream_name,
+            messages=(message.model_dump(mode="json") for message in data),
         )
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+
+from faststream.redis import RedisBroker
+from sqlalchemy import delete, select
+
+from app.common.bridges.base_bdg import (
+    PublishBuffer,
+    publish_buffer_context,
+    publish_many,
+)
+from app.common.config import sessionmaker, settings
+from app.common.models.outbox_messages_db import OutboxMessage
+
+
+class OutboxRelay:
+    """
+    Moves committed outbox messages into their streams in batches. Rows are
+    locked with SKIP LOCKED, so relays on different instances don't collide.
+    Delivery is at-least-once: rows are deleted only after a successful publish
+    """
+
+    def __init__(self, batch_size: int, poll_interval: float) -> None:
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.wake_event = asyncio.Event()
+
+    def wake(self) -> None:
+        self.wake_event.set()
+
+    async def relay_batch(self, broker: RedisBroker) -> int:
+        async with sessionmaker.begin() as session:
+            outbox_messages = (
+                await session.scalars(
+                    select(OutboxMessage)
+                    .order_by(OutboxMessage.id)
+                    .limit(self.batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+            ).all()
+            if len(outbox_messages) == 0:
+                return 0
+
+            await publish_many(
+                broker,
+                [
+                    (outbox_message.stream, outbox_message.message)
+                    for outbox_message in outbox_messages
+                ],
+            )
+            await session.execute(
+                delete(OutboxMessage).filter(
+                    OutboxMessage.id.in_(
+                        [outbox_message.id for outbox_message in outbox_messages]
+                    )
+                )
+            )
+        return len(outbox_messages)
+
+    async def run(self, broker: RedisBroker) -> None:
+        while True:  # noqa: WPS457  # cancelled on shutdown
+            self.wake_event.clear()
+            try:
+                relayed_count = await self.relay_batch(broker)
+            except Exception:  # noqa: PIE786  # the relay has to keep going
+                logging.exception("Outbox relay failed")
+                relayed_count = 0
+
+            if relayed_count < self.batch_size:
+                with suppress(TimeoutError):
+                    await asyncio.wait_for(self.wake_event.wait(), self.poll_interval)
+
+
+outbox_relay = OutboxRelay(
+    batch_size=settings.outbox.batch_size,
+    poll_interval=settings.outbox.poll_interval,
+)
+
+
+@asynccontextmanager
+async def buffered_publishing() -> AsyncIterator[None]:
+    """
+    Collect stream publishes from all bridges made inside the block. They are
+    written to the outbox within the current transaction when possible, or
+    else sent in one pipeline after the block. Nothing is published if the
+    block fails, so this should wrap the database session
+    """
+    publish_buffer = PublishBuffer()
+    token = publish_buffer_context.set(publish_buffer)
+    try:
+        yield
+    finally:
+        publish_buffer_context.reset(token)
+
+    await publish_buffer.flush()
+    if publish_buffer.has_outbox_messages:
+        outbox_relay.wake()
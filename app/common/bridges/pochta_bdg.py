@@ -1,3 +1,5 @@
+from collections.abc import Iterable
+
 from app.common.bridges.base_bdg import BaseBridge
 from app.common.config import settings
 from app.common.schemas.pochta_sch import EmailMessageInputSchema
@@ -11,7 +13,15 @@ class PochtaBridge(BaseBridge):
         )
 
     async def send_email_message(self, data: EmailMessageInputSchema) -> None:
-        await self.broker.publish(
+        await self.publish(
+            stream=settings.email_messages_send_stream_name,
             message=data.model_dump(mode="json"),
+        )
+
+    async def send_email_messages(
+        self, data: Iterable[EmailMessageInputSchema]
+    ) -> None:
+        await self.publish_many(
             stream=settings.email_messages_send_stream_name,
+            messages=(message.model_dump(mode="json") for message in data),
         )
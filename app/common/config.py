@@ -1,4 +1,5 @@
 import sys
+from enum import StrEnum, auto
 from pathlib import Path
 
 import sentry_sdk
@@ -6,17 +7,30 @@ from aiosmtplib import SMTP
 from cryptography.fernet import Fernet
 from pydantic import BaseModel, Field, PostgresDsn, RedisDsn, computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from sqlalchemy import MetaData
-from sqlalchemy.ext.asyncio import AsyncAttrs, async_sessionmaker, create_async_engine
+from redis.asyncio import Redis
+from socketio import AsyncRedisManager  # type: ignore[import-untyped]
+from sqlalchemy import MetaData, event
+from sqlalchemy.ext.asyncio import (
+    AsyncAttrs,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
 
 from app.common.fastapi_tmexio_ext import TMEXIOExt
 from app.common.faststream_sentry_ext import FaststreamIntegration
 from app.common.itsdangerous_ext import SignedTokenProvider
 from app.common.livekit_ext import LiveKit
+from app.common.pillow_ext import ImageProcessor
+from app.common.query_stats_ext import QueryStatsRegistry, instrument_engine
 from app.common.schemas.storage_sch import StorageTokenPayloadSchema
 from app.common.sentry_ext import before_breadcrumb
-from app.common.sqlalchemy_ext import MappingBase, sqlalchemy_naming_convention
+from app.common.sqlalchemy_ext import (
+    MappingBase,
+    set_transaction_read_only,
+    sqlalchemy_naming_convention,
+)
 
 
 class SocketIOAdminSettings(BaseModel):
@@ -63,6 +77,99 @@ class SupbotSettings(TelegramBotSettings):
     group_id: int
 
 
+class ProxyAuthCacheSettings(BaseModel):
+    local_ttl: int = 5
+    local_max_size: int = 10000
+    shared_ttl: int = 60
+
+
+class QueryStatsSettings(BaseModel):
+    enabled: bool = True
+    repeats_threshold: int = 5
+
+
+class OutboxSettings(BaseModel):
+    enabled: bool = True
+    batch_size: int = 500
+    poll_interval: float = 1
+
+
+class NotificationsRetentionSettings(BaseModel):
+    enabled: bool = True
+    horizon_days: int = 180
+    batch_size: int = 1000
+    interval: float = 3600
+
+
+class EmailDigestsSettings(BaseModel):
+    # unisender go template rendering the list of notifications
+    template_id: str = ""
+    max_window_minutes: int = 1440
+    max_size: int = 50
+    poll_interval: float = 10
+    # buffers claimed by a crashed instance are flushed again after this
+    flush_lease: int = 300
+
+
+class StreamRetrySettings(BaseModel):
+    max_attempts: int = 3
+    initial_delay: float = 0.5
+    max_delay: float = 30
+    # entries pending for longer are considered abandoned by a crashed consumer
+    reclaim_min_idle_ms: int = 300000
+    reclaim_interval: float = 60
+    reclaim_batch_size: int = 100
+    max_deliveries: int = 5
+    dead_letters_max_length: int = 10000
+
+
+class ImageVariantsSettings(BaseModel):
+    max_workers: int = 2
+
+
+class UploadsSettings(BaseModel):
+    chunk_size: int = 1024 * 1024
+    max_file_size: int = 100 * 1024 * 1024
+    max_avatar_size: int = 5 * 1024 * 1024
+
+
+class FilesGCSettings(BaseModel):
+    enabled: bool = True
+    batch_size: int = 100
+    interval: float = 3600
+
+
+class StreamBatchSettings(BaseModel):
+    max_size: int = 500
+    max_wait_ms: int = 1000
+
+
+class TelegramDeliverySettings(BaseModel):
+    # below the documented ~30 messages per second, to leave room for replies
+    global_rate: float = 25
+    chat_rate: float = 1
+    max_concurrency: int = 10
+    max_attempts: int = 5
+    retry_delay: float = 1
+
+
+class StorageOffloadMode(StrEnum):
+    # the app only authorizes reads, file contents are sent by a reverse proxy
+    X_ACCEL_REDIRECT = "x-accel-redirect"  # nginx
+    X_SENDFILE = "x-sendfile"  # apache, lighttpd, caddy
+
+
+class StorageOffloadSettings(BaseModel):
+    mode: StorageOffloadMode
+    # internal location of nginx, which is aliased to the storage path
+    location: str = "/storage-internal/"
+
+
+class BridgeTransportMode(StrEnum):
+    HTTP = auto()
+    ASGI = auto()  # in-process calls, only for services co-located with the bridge
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -89,6 +196,7 @@ class Settings(BaseSettings):
     socketio_admin: SocketIOAdminSettings | None = None
 
     bridge_base_url: str = "http://localhost:5000"
+    bridge_transport_mode: BridgeTransportMode = BridgeTransportMode.HTTP
 
     cookie_domain: str = "localhost"
     frontend_app_base_url: str = "https://app.sovlium.ru"
@@ -129,6 +237,11 @@ class Settings(BaseSettings):
     def storage_path(self) -> Path:
         return self.base_path / self.storage_folder
 
+    storage_offload: StorageOffloadSettings | None = None
+    uploads: UploadsSettings = UploadsSettings()
+    image_variants: ImageVariantsSettings = ImageVariantsSettings()
+    files_gc: FilesGCSettings = FilesGCSettings()
+
     postgres_host: str = "localhost"
     postgres_port: int = 5432
     postgres_username: str = "test"
@@ -152,10 +265,15 @@ class Settings(BaseSettings):
     postgres_echo: bool = True
     postgres_pool_recycle: int = 280
 
+    postgres_replica_dsns: list[str] = []
+    postgres_primary_pin_timeout: int = 5  # read-your-writes window in seconds
+
     redis_host: str = "localhost"
     redis_port: int = 6379
     redis_faststream_db: int = 0
     redis_supbot_db: int = 1
+    redis_cache_db: int | None = None
+    redis_socketio_db: int | None = None
 
     @computed_field
     @property
@@ -177,9 +295,54 @@ class Settings(BaseSettings):
             path=str(self.redis_supbot_db),
         ).unicode_string()
 
+    @computed_field
+    @property
+    def redis_cache_dsn(self) -> str | None:
+        if self.redis_cache_db is None:
+            return None
+        return RedisDsn.build(
+            scheme="redis",
+            host=self.redis_host,
+            port=self.redis_port,
+            path=str(self.redis_cache_db),
+        ).unicode_string()
+
+    @computed_field
+    @property
+    def redis_socketio_dsn(self) -> str | None:
+        if self.redis_socketio_db is None:
+            return None
+        return RedisDsn.build(
+            scheme="redis",
+            host=self.redis_host,
+            port=self.redis_port,
+            path=str(self.redis_socketio_db),
+        ).unicode_string()
+
+    socketio_heartbeat_interval: int = 30
+
+    proxy_auth_cache: ProxyAuthCacheSettings = ProxyAuthCacheSettings()
+    query_stats: QueryStatsSettings = QueryStatsSettings()
+    outbox: OutboxSettings = OutboxSettings()
+    stream_retry: StreamRetrySettings = StreamRetrySettings()
+
     notifications_send_stream_name: str = "notifications.send"
+    notifications_send_max_workers: int = 8
+    unread_notifications_counters_ttl: int = 600
+    notifications_retention: NotificationsRetentionSettings = (
+        NotificationsRetentionSettings()
+    )
+    email_digests: EmailDigestsSettings = EmailDigestsSettings()
     email_messages_send_stream_name: str = "email-messages.send"
+    email_messages_send_batch: StreamBatchSettings = StreamBatchSettings(
+        max_wait_ms=500
+    )
+    telegram_messages_send_stream_name: str = "telegram-messages.send"
+    telegram_messages_send_batch: StreamBatchSettings = StreamBatchSettings(
+        max_size=100
+    )
     datalake_events_record_stream_name: str = "datalake-events.record"
+    datalake_events_record_batch: StreamBatchSettings = StreamBatchSettings()
 
     livekit_url: str = "ws://localhost:7880"
     livekit_api_key: str = "devkey"
@@ -191,6 +354,7 @@ class Settings(BaseSettings):
 
     supbot: SupbotSettings | None = None
     notifications_bot: TelegramBotSettings | None = None
+    telegram_delivery: TelegramDeliverySettings = TelegramDeliverySettings()
     telegram_webhook_base_url: str | None = None
 
     sentry_dsn: str | None = None
@@ -225,6 +389,30 @@ db_meta = MetaData(
 )
 sessionmaker = async_sessionmaker(bind=engine, expire_on_commit=False)
 
+query_stats_registry = QueryStatsRegistry(
+    repeats_threshold=settings.query_stats.repeats_threshold
+)
+if settings.query_stats.enabled:
+    instrument_engine(engine.sync_engine)
+
+
+def create_replica_sessionmaker(dsn: str) -> async_sessionmaker[AsyncSession]:
+    replica_engine = create_async_engine(
+        url=dsn,
+        echo=settings.postgres_echo,
+        pool_recycle=settings.postgres_pool_recycle,
+    )
+    event.listen(replica_engine.sync_engine, "begin", set_transaction_read_only)
+    if settings.query_stats.enabled:
+        instrument_engine(replica_engine.sync_engine)
+    return async_sessionmaker(bind=replica_engine, expire_on_commit=False)
+
+
+replica_sessionmakers: list[async_sessionmaker[AsyncSession]] = [
+    create_replica_sessionmaker(replica_dsn)
+    for replica_dsn in settings.postgres_replica_dsns
+]
+
 
 class Base(AsyncAttrs, DeclarativeBase, MappingBase):
     __tablename__: str | None
@@ -239,6 +427,8 @@ livekit = LiveKit(
     api_secret=settings.livekit_api_secret,
 )
 
+image_processor = ImageProcessor(max_workers=settings.image_variants.max_workers)
+
 smtp_client: SMTP | None = (
     None
     if settings.email is None
@@ -252,6 +442,18 @@ smtp_client: SMTP | None = (
     )
 )
 
+redis_cache: Redis | None = (
+    None
+    if settings.redis_cache_dsn is None
+    else Redis.from_url(settings.redis_cache_dsn)
+)
+
+redis_socketio: Redis | None = (
+    None
+    if settings.redis_socketio_dsn is None
+    else Redis.from_url(settings.redis_socketio_dsn)
+)
+
 storage_token_provider = SignedTokenProvider[StorageTokenPayloadSchema](
     secret_keys=settings.storage_token_keys.keys,
     encryption_ttl=settings.storage_token_keys.encryption_ttl,
@@ -259,6 +461,11 @@ storage_token_provider = SignedTokenProvider[StorageTokenPayloadSchema](
 )
 
 tmex = TMEXIOExt(
+    client_manager=(
+        None
+        if settings.redis_socketio_dsn is None
+        else AsyncRedisManager(settings.redis_socketio_dsn)
+    ),
     async_mode="asgi",
     transports=["websocket"],
     cors_allowed_origins="*",
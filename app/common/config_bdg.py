@@ -1,6 +1,7 @@
 from app.common.bridges.autocomplete_bdg import AutocompleteBridge
 from app.common.bridges.base_bdg import BaseBridge
 from app.common.bridges.classrooms_bdg import ClassroomsBridge
+from app.common.bridges.communities_bdg import CommunitiesBridge
 from app.common.bridges.datalake_bdg import DatalakeBridge
 from app.common.bridges.messenger_bdg import MessengerBridge
 from app.common.bridges.notifications_bdg import NotificationsBridge
@@ -12,6 +13,7 @@ from app.common.bridges.users_public_bdg import UsersPublicBridge
 
 autocomplete_bridge = AutocompleteBridge()
 classrooms_bridge = ClassroomsBridge()
+communities_bridge = CommunitiesBridge()
 datalake_bridge = DatalakeBridge()
 messenger_bridge = MessengerBridge()
 notifications_bridge = NotificationsBridge()
@@ -24,6 +26,7 @@ storage_v2_bridge = StorageV2Bridge()
 all_bridges: tuple[BaseBridge, ...] = (
     autocomplete_bridge,
     classrooms_bridge,
+    communities_bridge,
     datalake_bridge,
     messenger_bridge,
     notifications_bridge,
@@ -0,0 +1,53 @@
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import Any
+
+from faststream import BaseMiddleware, StreamMessage
+from faststream.redis.fastapi import RedisRouter
+
+from app.common.bridges.outbox import buffered_publishing
+from app.common.config import query_stats_registry, sessionmaker, settings
+from app.common.faststream_ext import (
+    StreamDeadLetters,
+    StreamPendingReclaimer,
+    StreamRetryMiddleware,
+)
+from app.common.query_stats_ext import collect_query_stats
+from app.common.sqlalchemy_ext import LazySession, session_context
+
+
+class FastStreamDatabaseSessionMiddleware(BaseMiddleware):
+    async def consume_scope(
+        self,
+        call_next: Callable[[Any], Awaitable[Any]],
+        msg: StreamMessage[Any],
+    ) -> Any:
+        scope = f"stream {msg.raw_message.get('channel')}"
+        with collect_query_stats(query_stats_registry, scope):
+            async with buffered_publishing():
+                async with LazySession(sessionmaker) as lazy_session:
+                    session_context.set(lazy_session)
+                    return await call_next(msg)
+
+
+faststream = RedisRouter(
+    settings.redis_faststream_dsn,
+    middlewares=[FastStreamDatabaseSessionMiddleware],
+)
+stream_dead_letters = StreamDeadLetters(
+    broker=faststream.broker,
+    max_length=settings.stream_retry.dead_letters_max_length,
+)
+# outer to the session middleware, so that every attempt gets a fresh session
+faststream.broker.insert_middleware(
+    partial(
+        StreamRetryMiddleware,
+        dead_letters=stream_dead_letters,
+        retry=settings.stream_retry,
+    )
+)
+stream_pending_reclaimer = StreamPendingReclaimer(
+    broker=faststream.broker,
+    dead_letters=stream_dead_letters,
+    retry=settings.stream_retry,
+)
@@ -0,0 +1,90 @@
+import random
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from time import monotonic
+
+from redis.asyncio import Redis
+
+from app.common.config import (
+    redis_cache,
+    replica_sessionmakers,
+    sessionmaker,
+    settings,
+)
+from app.common.sqlalchemy_ext import LazySession, session_context
+
+
+class PrimaryPins:
+    """
+    Read-your-writes window: users are pinned to the primary for ``timeout``
+    seconds after a committed write, so that replica lag is not visible to them
+    """
+
+    max_local_pins: int = 10000
+
+    def __init__(self, redis: Redis | None, timeout: int) -> None:
+        self.redis = redis
+        self.timeout = timeout
+        self.local_pins: dict[int, float] = {}
+
+    @staticmethod
+    def build_key(user_id: int) -> str:
+        return f"primary-pins:{user_id}"
+
+    def prune_local(self) -> None:
+        now = monotonic()
+        self.local_pins = {
+            user_id: pinned_until
+            for user_id, pinned_until in self.local_pins.items()
+            if pinned_until > now
+        }
+
+    async def pin(self, user_id: int) -> None:
+        if len(self.local_pins) >= self.max_local_pins:
+            self.prune_local()
+        self.local_pins[user_id] = monotonic() + self.timeout
+
+        if self.redis is not None:
+            await self.redis.set(self.build_key(user_id), 1, ex=self.timeout)
+
+    async def is_pinned(self, user_id: int) -> bool:
+        if self.local_pins.get(user_id, 0) > monotonic():
+            return True
+        if self.redis is None:
+            return False
+        return bool(await self.redis.exists(self.build_key(user_id)))
+
+
+primary_pins = PrimaryPins(
+    redis=redis_cache,
+    timeout=settings.postgres_primary_pin_timeout,
+)
+
+
+@asynccontextmanager
+async def routed_session(
+    use_replica: bool,
+    user_id: int | None = None,
+) -> AsyncIterator[LazySession]:
+    """
+    Open a :py:class:`LazySession` in the current context, with reads going
+    to a random replica if ``use_replica`` is set, replicas are configured and
+    the user is not pinned to the primary. Routing can still be changed before
+    the session is first used (see ``database_dep``)
+    """
+    has_replicas = len(replica_sessionmakers) != 0
+
+    replica_sessionmaker = None
+    if has_replicas and (user_id is None or not await primary_pins.is_pinned(user_id)):
+        replica_sessionmaker = random.choice(replica_sessionmakers)  # noqa: S311
+
+    async with LazySession(
+        sessionmaker=sessionmaker,
+        replica_sessionmaker=replica_sessionmaker,
+        use_replica=use_replica,
+    ) as lazy_session:
+        session_context.set(lazy_session)
+        yield lazy_session
+
+    if has_replicas and user_id is not None and lazy_session.has_writes:
+        await primary_pins.pin(user_id)
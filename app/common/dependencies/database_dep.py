@@ -0,0 +1,21 @@
+from fastapi import Depends
+
+from app.common.sqlalchemy_ext import session_context
+
+
+def route_session(use_replica: bool) -> None:
+    lazy_session = session_context.get()
+    if lazy_session is not None:
+        lazy_session.route(use_replica=use_replica)
+
+
+async def use_primary_database() -> None:
+    route_session(use_replica=False)
+
+
+async def use_replica_database() -> None:
+    route_session(use_replica=True)
+
+
+PrimaryDatabase = Depends(use_primary_database)  # for reads with side effects
+ReplicaDatabase = Depends(use_replica_database)  # for reads not using GET
@@ -1,11 +1,546 @@
-from faststream.redis import StreamSub
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Sequence
+from contextvars import ContextVar
+from datetime import datetime
+from itertools import zip_longest
+from typing import Any
 
-from app.common.config import settings
+from faststream import BaseMiddleware, ContextRepo, StreamMessage
+from faststream.redis import BinaryMessageFormatV1, RedisBroker, StreamSub
+from faststream.redis.message import (
+    BatchStreamMessage,
+    DefaultStreamMessage,
+    bDATA_KEY,
+)
+from pydantic import AwareDatetime, BaseModel
+from redis.asyncio import Redis
 
+from app.common.config import StreamBatchSettings, StreamRetrySettings, settings
+from app.common.utils.datetime import datetime_utc_now
 
-def build_stream_sub(stream_name: str, service_name: str) -> StreamSub:
+
+def build_stream_sub(
+    stream_name: str,
+    service_name: str,
+    batch: StreamBatchSettings | None = None,
+) -> StreamSub:
+    if batch is None:
+        return StreamSub(
+            stream=stream_name,
+            group=service_name,
+            consumer=settings.instance_name,
+        )
+    # XREADGROUP returns up to `max_records` messages, as soon as any
+    # are available or blocks for up to `polling_interval` milliseconds
     return StreamSub(
         stream=stream_name,
         group=service_name,
         consumer=settings.instance_name,
+        batch=True,
+        max_records=batch.max_size,
+        polling_interval=batch.max_wait_ms,
+    )
+
+
+class StreamGroupLagSchema(BaseModel):
+    stream_name: str
+    group_name: str
+    consumer_count: int
+    pending_count: int
+    lag: int | None  # not available on redis < 7.0
+    last_delivered_id: str
+
+
+def decode_redis_value(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+async def retrieve_stream_group_lag(
+    broker: RedisBroker,
+    stream_name: str,
+    group_name: str,
+) -> StreamGroupLagSchema | None:
+    client = broker.config.broker_config.connection.client
+    for group_info in await client.xinfo_groups(stream_name):
+        if decode_redis_value(group_info["name"]) == group_name:
+            return StreamGroupLagSchema(
+                stream_name=stream_name,
+                group_name=group_name,
+                consumer_count=group_info["consumers"],
+                pending_count=group_info["pending"],
+                lag=group_info.get("lag"),
+                last_delivered_id=decode_redis_value(group_info["last-delivered-id"]),
+            )
+    return None
+
+
+class StreamConsumerStatsSchema(BaseModel):
+    batch_count: int = 0
+    message_count: int = 0
+    last_batch_size: int | None = None
+    last_batch_delay_ms: float | None = None  # age of its oldest message
+    last_batch_duration_ms: float | None = None
+    last_batch_consumed_at: AwareDatetime | None = None
+
+
+class StreamConsumerStats:
+    """Per-instance stats of a batch subscriber, reported next to group lag"""
+
+    def __init__(self) -> None:
+        self.stats = StreamConsumerStatsSchema()
+
+    def record_batch(
+        self,
+        size: int,
+        oldest_created_at: datetime | None,
+        duration: float,
+    ) -> None:
+        consumed_at = datetime_utc_now()
+        self.stats.batch_count += 1
+        self.stats.message_count += size
+        self.stats.last_batch_size = size
+        self.stats.last_batch_delay_ms = (
+            None
+            if oldest_created_at is None
+            else (consumed_at - oldest_created_at).total_seconds() * 1000
+        )
+        self.stats.last_batch_duration_ms = duration * 1000
+        self.stats.last_batch_consumed_at = consumed_at
+
+
+class StreamConsumerLagSchema(BaseModel):
+    group: StreamGroupLagSchema | None
+    instance: StreamConsumerStatsSchema
+
+
+async def retrieve_stream_consumer_lag(
+    broker: RedisBroker,
+    stream_name: str,
+    group_name: str,
+    consumer_stats: StreamConsumerStats,
+) -> StreamConsumerLagSchema:
+    return StreamConsumerLagSchema(
+        group=await retrieve_stream_group_lag(
+            broker=broker,
+            stream_name=stream_name,
+            group_name=group_name,
+        ),
+        instance=consumer_stats.stats,
+    )
+
+
+type RawStreamEntry = tuple[bytes | None, dict[bytes, bytes]]
+
+
+def find_subscriber_stream_sub(subscriber: Any) -> StreamSub | None:
+    # only stream subscribers (batch, concurrent or not) have a ``StreamSub``
+    stream_sub = getattr(subscriber, "stream_sub", None)
+    return stream_sub if isinstance(stream_sub, StreamSub) else None
+
+
+def is_stream_subscribed(
+    broker: RedisBroker, stream_name: str, group_name: str
+) -> bool:
+    return any(
+        stream_sub is not None
+        and stream_sub.name == stream_name
+        and stream_sub.group == group_name
+        for stream_sub in map(find_subscriber_stream_sub, broker.subscribers)
     )
+
+
+def iter_raw_stream_entries(raw_message: dict[str, Any]) -> Iterator[RawStreamEntry]:
+    entries = (
+        raw_message["data"]
+        if raw_message["type"] == "bstream"
+        else [raw_message["data"]]
+    )
+    # message ids are not filled in by the test broker
+    for fields, message_id in zip_longest(entries, raw_message["message_ids"]):
+        yield message_id, fields
+
+
+class StreamDeadLetterSchema(BaseModel):
+    id: str
+    message_id: str | None  # of the original entry
+    error: str
+    failed_at: AwareDatetime
+    headers: dict[str, Any]
+    body: str
+
+
+class StreamDeadLetters:
+    """
+    Messages a consumer group gave up on, kept in a capped stream per group.
+    Entries keep all original fields, so they can be replayed into the original
+    stream as they were (which delivers them to every group of that stream)
+    """
+
+    message_id_key = b"dead-letter-message-id"
+    error_key = b"dead-letter-error"
+    failed_at_key = b"dead-letter-failed-at"
+
+    def __init__(self, broker: RedisBroker, max_length: int) -> None:
+        self.broker = broker
+        self.max_length = max_length
+
+    @property
+    def client(self) -> Redis:
+        return self.broker.config.broker_config.connection.client
+
+    @staticmethod
+    def build_stream_name(stream_name: str, group_name: str) -> str:
+        return f"{stream_name}.dead-letters.{group_name}"
+
+    async def add_many(
+        self,
+        stream_name: str,
+        group_name: str,
+        entries: Iterable[RawStreamEntry],
+        error: str,
+    ) -> None:
+        failed_at = datetime_utc_now().isoformat()
+        for message_id, fields in entries:
+            await self.client.xadd(
+                self.build_stream_name(stream_name, group_name),
+                {
+                    **fields,
+                    self.message_id_key: message_id or b"",
+                    self.error_key: error,
+                    self.failed_at_key: failed_at,
+                },
+                maxlen=self.max_length,
+                approximate=True,
+            )
+
+    def parse_entry(
+        self, entry_id: bytes, fields: dict[bytes, bytes]
+    ) -> StreamDeadLetterSchema:
+        body, headers = BinaryMessageFormatV1.parse(fields.get(bDATA_KEY, b""))
+        return StreamDeadLetterSchema(
+            id=decode_redis_value(entry_id),
+            message_id=decode_redis_value(fields[self.message_id_key]) or None,
+            error=decode_redis_value(fields[self.error_key]),
+            failed_at=datetime.fromisoformat(
+                decode_redis_value(fields[self.failed_at_key])
+            ),
+            headers=headers,
+            body=body.decode(errors="replace"),
+        )
+
+    async def list_latest(
+        self, stream_name: str, group_name: str, limit: int
+    ) -> list[StreamDeadLetterSchema]:
+        return [
+            self.parse_entry(entry_id, fields)
+            for entry_id, fields in await self.client.xrevrange(
+                self.build_stream_name(stream_name, group_name), count=limit
+            )
+        ]
+
+    async def replay_many(
+        self, stream_name: str, group_name: str, dead_letter_ids: Sequence[str]
+    ) -> list[str]:
+        dead_letters_stream_name = self.build_stream_name(stream_name, group_name)
+        dead_letter_keys = {self.message_id_key, self.error_key, self.failed_at_key}
+
+        replayed_ids: list[str] = []
+        for dead_letter_id in dead_letter_ids:
+            for entry_id, fields in await self.client.xrange(
+                dead_letters_stream_name, min=dead_letter_id, max=dead_letter_id
+            ):
+                await self.client.xadd(
+                    stream_name,
+                    {
+                        key: value
+                        for key, value in fields.items()
+                        if key not in dead_letter_keys
+                    },
+                )
+                await self.client.xdel(dead_letters_stream_name, entry_id)
+                replayed_ids.append(decode_redis_value(entry_id))
+        return replayed_ids
+
+
+class StreamBatch:
+    """
+    Entries of the message a consumer group is processing. Lets handlers move
+    single entries of a batch to dead letters, instead of failing all of them.
+    Those are only written once the handler succeeds, as failures are retried
+    """
+
+    def __init__(
+        self,
+        dead_letters: StreamDeadLetters,
+        stream_name: str,
+        group_name: str,
+        raw_message: dict[str, Any],
+    ) -> None:
+        self.dead_letters = dead_letters
+        self.stream_name = stream_name
+        self.group_name = group_name
+        self.raw_message = raw_message
+        self.index_to_error: dict[int, str] = {}
+
+    def dead_letter(self, index: int, error: str) -> None:
+        self.index_to_error[index] = error
+
+    def discard_dead_letters(self) -> None:
+        self.index_to_error.clear()
+
+    async def flush_dead_letters(self) -> None:
+        entries = list(iter_raw_stream_entries(self.raw_message))
+        for index, error in self.index_to_error.items():
+            await self.dead_letters.add_many(
+                stream_name=self.stream_name,
+                group_name=self.group_name,
+                entries=[entries[index]],
+                error=error,
+            )
+        self.index_to_error.clear()
+
+
+stream_batch_context: ContextVar[StreamBatch | None] = ContextVar(
+    "stream_batch", default=None
+)
+
+
+def dead_letter_stream_entry(index: int, error: str) -> None:
+    """
+    Move the ``index``-th entry of the message being consumed to dead letters.
+    Done after the handler succeeds, so that retries don't duplicate them
+    """
+    stream_batch = stream_batch_context.get()
+    if stream_batch is None:
+        logging.error(
+            f"Dropping stream entry {index} without a consumer group: {error}"
+        )
+        return
+    stream_batch.dead_letter(index, error)
+
+
+def calculate_retry_delay(retry: StreamRetrySettings, attempt: int) -> float:
+    return min(retry.initial_delay * 2 ** (attempt - 1), retry.max_delay)
+
+
+class StreamRetryMiddleware(BaseMiddleware):
+    """
+    Retries failed messages of stream consumer groups with an exponential
+    backoff, each attempt in a fresh scope of the inner middlewares. Messages
+    which still fail are moved to dead letters and acknowledged, so the group
+    doesn't keep them pending. If even that fails, they are reclaimed later
+    """
+
+    def __init__(
+        self,
+        msg: Any,
+        /,
+        *,
+        context: ContextRepo,
+        dead_letters: StreamDeadLetters,
+        retry: StreamRetrySettings,
+    ) -> None:
+        super().__init__(msg, context=context)
+        self.dead_letters = dead_letters
+        self.retry = retry
+
+    async def consume_scope(
+        self,
+        call_next: Callable[[Any], Awaitable[Any]],
+        msg: StreamMessage[Any],
+    ) -> Any:
+        stream_sub = find_subscriber_stream_sub(self.context.get_local("handler_"))
+        if stream_sub is None or stream_sub.group is None:
+            return await call_next(msg)
+
+        stream_batch = StreamBatch(
+            dead_letters=self.dead_letters,
+            stream_name=stream_sub.name,
+            group_name=stream_sub.group,
+            raw_message=msg.raw_message,
+        )
+        token = stream_batch_context.set(stream_batch)
+        try:
+            for attempt in range(1, self.retry.max_attempts):
+                stream_batch.discard_dead_letters()
+                try:
+                    result = await call_next(msg)
+                except Exception:  # noqa: PIE786  # any failure can be temporary
+                    logging.warning(
+                        f"Attempt {attempt} to process a message from "
+                        f"{stream_sub.name} in group {stream_sub.group} failed",
+                        exc_info=True,
+                    )
+                else:
+                    await stream_batch.flush_dead_letters()
+                    return result
+                await asyncio.sleep(calculate_retry_delay(self.retry, attempt))
+
+            stream_batch.discard_dead_letters()
+            try:
+                result = await call_next(msg)
+            except Exception as exc:  # noqa: PIE786  # any failure is dead-lettered
+                logging.exception(
+                    f"Moving a message from {stream_sub.name} "
+                    f"in group {stream_sub.group} to dead letters"
+                )
+                await self.dead_letters.add_many(
+                    stream_name=stream_sub.name,
+                    group_name=stream_sub.group,
+                    entries=iter_raw_stream_entries(msg.raw_message),
+                    error=repr(exc),
+                )
+                return None
+            await stream_batch.flush_dead_letters()
+            return result
+        finally:
+            stream_batch_context.reset(token)
+
+
+class StreamPendingReclaimer:
+    """
+    Claims entries left pending in consumer groups for longer than
+    ``reclaim_min_idle_ms`` (by crashed or restarted consumers) with XAUTOCLAIM
+    and passes them to their subscribers again. Entries delivered more than
+    ``max_deliveries`` times are moved to dead letters without processing
+    """
+
+    def __init__(
+        self,
+        broker: RedisBroker,
+        dead_letters: StreamDeadLetters,
+        retry: StreamRetrySettings,
+    ) -> None:
+        self.broker = broker
+        self.dead_letters = dead_letters
+        self.retry = retry
+        self.task: asyncio.Task[None] | None = None
+
+    @property
+    def client(self) -> Redis:
+        return self.broker.config.broker_config.connection.client
+
+    async def dead_letter_overdelivered(
+        self,
+        stream_sub: StreamSub,
+        entries: list[tuple[bytes, dict[bytes, bytes]]],
+    ) -> list[tuple[bytes, dict[bytes, bytes]]]:
+        message_id_to_times_delivered: dict[bytes, int] = {
+            pending_entry["message_id"]: pending_entry["times_delivered"]
+            for pending_entry in await self.client.xpending_range(
+                stream_sub.name,
+                stream_sub.group,
+                min=entries[0][0],
+                max=entries[-1][0],
+                count=len(entries),
+                consumername=stream_sub.consumer,
+            )
+        }
+
+        overdelivered_entries: list[tuple[bytes, dict[bytes, bytes]]] = []
+        remaining_entries: list[tuple[bytes, dict[bytes, bytes]]] = []
+        for message_id, fields in entries:
+            times_delivered = message_id_to_times_delivered.get(message_id, 0)
+            if times_delivered > self.retry.max_deliveries:
+                overdelivered_entries.append((message_id, fields))
+            else:
+                remaining_entries.append((message_id, fields))
+
+        if len(overdelivered_entries) != 0:
+            await self.dead_letters.add_many(
+                stream_name=stream_sub.name,
+                group_name=stream_sub.group,
+                entries=overdelivered_entries,
+                error=f"Delivered more than {self.retry.max_deliveries} times",
+            )
+            await self.client.xack(
+                stream_sub.name,
+                stream_sub.group,
+                *(message_id for message_id, _ in overdelivered_entries),
+            )
+        return remaining_entries
+
+    async def consume_entries(
+        self,
+        subscriber: Any,
+        stream_sub: StreamSub,
+        entries: list[tuple[bytes, dict[bytes, bytes]]],
+    ) -> None:
+        if len(entries) == 0:
+            return
+
+        if stream_sub.batch:
+            await subscriber.consume(
+                BatchStreamMessage(
+                    type="bstream",
+                    channel=stream_sub.name,
+                    data=[fields for _, fields in entries],
+                    message_ids=[message_id for message_id, _ in entries],
+                )
+            )
+            return
+
+        for message_id, fields in entries:
+            await subscriber.consume(
+                DefaultStreamMessage(
+                    type="stream",
+                    channel=stream_sub.name,
+                    data=fields,
+                    message_ids=[message_id],
+                )
+            )
+
+    async def reclaim_subscriber(self, subscriber: Any, stream_sub: StreamSub) -> int:
+        reclaimed_count = 0
+        start_id: bytes | str = "0-0"
+        while True:  # noqa: WPS457  # until the scan wraps around
+            start_id, claimed_entries, *_ = await self.client.xautoclaim(
+                stream_sub.name,
+                stream_sub.group,
+                consumername=stream_sub.consumer,
+                min_idle_time=self.retry.reclaim_min_idle_ms,
+                start_id=start_id,
+                count=self.retry.reclaim_batch_size,
+            )
+            # entries deleted from the stream are claimed without fields
+            entries = [
+                (message_id, fields)
+                for message_id, fields in claimed_entries
+                if fields is not None
+            ]
+            if len(entries) != 0:
+                reclaimed_count += len(entries)
+                entries = await self.dead_letter_overdelivered(stream_sub, entries)
+                await self.consume_entries(subscriber, stream_sub, entries)
+
+            if decode_redis_value(start_id) == "0-0":
+                return reclaimed_count
+
+    async def reclaim(self) -> int:
+        reclaimed_count = 0
+        for subscriber in self.broker.subscribers:
+            stream_sub = find_subscriber_stream_sub(subscriber)
+            if stream_sub is None or stream_sub.group is None:
+                continue
+            try:
+                reclaimed_count += await self.reclaim_subscriber(subscriber, stream_sub)
+            except Exception:  # noqa: PIE786  # other groups have to be reclaimed
+                logging.exception(
+                    f"Reclaiming pending entries of {stream_sub.name} "
+                    f"in group {stream_sub.group} failed"
+                )
+        return reclaimed_count
+
+    async def run(self) -> None:
+        while True:  # noqa: WPS457  # cancelled on shutdown
+            await self.reclaim()
+            await asyncio.sleep(self.retry.reclaim_interval)
+
+    def start(self) -> None:
+        self.task = asyncio.create_task(self.run())
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
@@ -0,0 +1,159 @@
+import asyncio
+import multiprocessing
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Literal, get_args
+from uuid import uuid4
+
+from PIL import Image
+from starlette.concurrency import run_in_threadpool
+
+ImageVariantSize = Literal[64, 256, 1024]
+IMAGE_VARIANT_SIZES: tuple[ImageVariantSize, ...] = get_args(ImageVariantSize)
+
+
+class InvalidImageError(Exception):
+    pass
+
+
+def build_temporary_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.{uuid4().hex}")
+
+
+# raised by pillow & its plugins for unrecognized, corrupted or huge images
+IMAGE_DECODING_ERRORS = (OSError, SyntaxError, ValueError, Image.DecompressionBombError)
+
+
+@contextmanager
+def open_image(path: Path) -> Iterator[Image.Image]:
+    """Open & decode an image, failing with ``InvalidImageError`` if it's broken"""
+    try:
+        image = Image.open(path)
+    except FileNotFoundError:
+        raise  # missing images aren't broken
+    except IMAGE_DECODING_ERRORS as e:
+        raise InvalidImageError(str(e)) from None
+    with image:
+        try:
+            image.load()
+        except IMAGE_DECODING_ERRORS as e:
+            raise InvalidImageError(str(e)) from None
+        yield image
+
+
+def render_image_variant(source_path: Path, target_path: Path, size: int) -> None:
+    """Fit an image into a ``size`` square (never upscaling) and save it as webp"""
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = build_temporary_path(target_path)
+    try:
+        with open_image(source_path) as image:
+            image.thumbnail((size, size))
+            image.save(temporary_path, format="WEBP")
+        os.replace(temporary_path, target_path)
+    finally:
+        temporary_path.unlink(missing_ok=True)
+
+
+def replace_paths(source_to_target_paths: dict[Path, Path]) -> None:
+    for source_path, target_path in source_to_target_paths.items():
+        os.replace(source_path, target_path)
+
+
+def unlink_paths(paths: Iterable[Path]) -> None:
+    for path in paths:
+        path.unlink(missing_ok=True)
+
+
+class ImageProcessor:
+    """
+    Renders image variants in a pool of worker processes, so that resizing
+    neither blocks the event loop nor holds the GIL. The pool is started with
+    the first task. Workers are spawned rather than forked: the app is always
+    multithreaded, and this module doesn't import anything heavy for them
+    """
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self.executor: ProcessPoolExecutor | None = None
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self.executor
+
+    async def render_variant(
+        self, source_path: Path, target_path: Path, size: int
+    ) -> None:
+        await asyncio.get_running_loop().run_in_executor(
+            self.get_executor(),
+            render_image_variant,
+            source_path,
+            target_path,
+            size,
+        )
+
+    async def render_variants(
+        self, source_path: Path, target_paths: dict[ImageVariantSize, Path]
+    ) -> None:
+        # all renders are awaited, so that no variant is written after a failure
+        results = await asyncio.gather(
+            *(
+                self.render_variant(source_path, target_path, size)
+                for size, target_path in target_paths.items()
+            ),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def replace_with_variants(
+        self,
+        source_path: Path,
+        target_path: Path,
+        variant_paths: dict[ImageVariantSize, Path],
+    ) -> None:
+        """
+        Move an image from ``source_path`` to ``target_path`` together with its
+        variants. Variants are rendered to temporary paths first, so that a
+        broken image (``InvalidImageError``) doesn't replace anything
+        """
+        temporary_paths = {
+            size: build_temporary_path(variant_path)
+            for size, variant_path in variant_paths.items()
+        }
+        try:
+            await self.render_variants(source_path, temporary_paths)
+            await run_in_threadpool(
+                replace_paths,
+                {
+                    **{
+                        temporary_paths[size]: variant_path
+                        for size, variant_path in variant_paths.items()
+                    },
+                    source_path: target_path,
+                },
+            )
+        finally:
+            await run_in_threadpool(
+                unlink_paths, [source_path, *temporary_paths.values()]
+            )
+
+    async def ensure_variant(
+        self, source_path: Path, target_path: Path, size: int
+    ) -> None:
+        # cached forever, so callers either key target paths by the content
+        # or render variants again whenever the source changes
+        if not await run_in_threadpool(target_path.is_file):
+            await self.render_variant(source_path, target_path, size)
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,176 @@
+import logging
+import re
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import Connection, Engine, event
+from sqlalchemy.engine import ExceptionContext
+
+STARTED_AT_INFO_KEY = "query_stats_started_at"
+
+QUERY_COUNT_HEADER_NAME = "X-Query-Count"
+QUERY_DURATION_HEADER_NAME = "X-Query-Duration"
+QUERY_REPEATS_HEADER_NAME = "X-Query-Max-Repeats"
+
+literal_regex = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+placeholder_list_regex = re.compile(r"\(\s*%\(\w+\)s(?:\s*,\s*%\(\w+\)s)*\s*\)")
+placeholder_regex = re.compile(r"%\(\w+\)s|\$\d+|\?")
+whitespace_regex = re.compile(r"\s+")
+
+logger = logging.getLogger("query_stats")
+
+
+def fingerprint_statement(statement: str) -> str:
+    """
+    Collapse literals, bound parameters and whitespace, so that statements
+    differing only by the values used get the same fingerprint
+    """
+    statement = literal_regex.sub("?", statement)
+    statement = placeholder_list_regex.sub("(?)", statement)
+    statement = placeholder_regex.sub("?", statement)
+    return whitespace_regex.sub(" ", statement).strip()
+
+
+class QueryStats:
+    def __init__(self, scope: str) -> None:
+        self.scope = scope
+        self.statement_count: int = 0
+        self.duration: float = 0
+        self.fingerprints: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.statement_count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint_statement(statement)] += 1
+
+    @property
+    def max_repeats(self) -> int:
+        return max(self.fingerprints.values(), default=0)
+
+    def repeated_fingerprints(self, threshold: int = 2) -> dict[str, int]:
+        return {
+            fingerprint: count
+            for fingerprint, count in self.fingerprints.items()
+            if count >= threshold
+        }
+
+    @property
+    def as_headers(self) -> dict[str, str]:
+        return {
+            QUERY_COUNT_HEADER_NAME: str(self.statement_count),
+            QUERY_DURATION_HEADER_NAME: f"{self.duration * 1000:.2f}",
+            QUERY_REPEATS_HEADER_NAME: str(self.max_repeats),
+        }
+
+
+class ScopeQueryStatsSchema(BaseModel):
+    scope: str
+    call_count: int = 0
+    statement_count: int = 0
+    max_statement_count: int = 0
+    duration_ms: float = 0
+    max_duration_ms: float = 0
+    repeated_fingerprints: dict[str, int] = {}
+
+
+QueryStatsListener = Callable[[QueryStats], None]
+
+
+class QueryStatsRegistry:
+    """
+    Aggregates stats of finished scopes (requests, events, messages) by name
+    and warns about statements repeated often enough to look like an N+1
+    """
+
+    def __init__(self, repeats_threshold: int) -> None:
+        self.repeats_threshold = repeats_threshold
+        self.scopes: dict[str, ScopeQueryStatsSchema] = {}
+        self.listeners: list[QueryStatsListener] = []
+
+    def record(self, stats: QueryStats) -> None:
+        scope_stats = self.scopes.get(stats.scope)
+        if scope_stats is None:
+            scope_stats = ScopeQueryStatsSchema(scope=stats.scope)
+            self.scopes[stats.scope] = scope_stats
+
+        duration_ms = stats.duration * 1000
+        scope_stats.call_count += 1
+        scope_stats.statement_count += stats.statement_count
+        scope_stats.max_statement_count = max(
+            scope_stats.max_statement_count, stats.statement_count
+        )
+        scope_stats.duration_ms += duration_ms
+        scope_stats.max_duration_ms = max(scope_stats.max_duration_ms, duration_ms)
+
+        repeated = stats.repeated_fingerprints(self.repeats_threshold)
+        for fingerprint, count in repeated.items():
+            logger.warning(
+                "Possible N+1 in %s: statement repeated %d times: %s",
+                stats.scope,
+                count,
+                fingerprint,
+            )
+            scope_stats.repeated_fingerprints[fingerprint] = max(
+                scope_stats.repeated_fingerprints.get(fingerprint, 0), count
+            )
+
+        for listener in self.listeners:
+            listener(stats)
+
+    def list_scopes(self) -> list[ScopeQueryStatsSchema]:
+        return sorted(
+            self.scopes.values(),
+            key=lambda scope_stats: scope_stats.statement_count,
+            reverse=True,
+        )
+
+    def reset(self) -> None:
+        self.scopes.clear()
+
+
+query_stats_context: ContextVar[QueryStats | None] = ContextVar(
+    "query_stats_context", default=None
+)
+
+
+@contextmanager
+def collect_query_stats(
+    registry: QueryStatsRegistry, scope: str
+) -> Iterator[QueryStats]:
+    stats = QueryStats(scope)
+    token = query_stats_context.set(stats)
+    try:
+        yield stats
+    finally:
+        query_stats_context.reset(token)
+        registry.record(stats)
+
+
+def before_cursor_execute(connection: Connection, *_: Any) -> None:
+    connection.info.setdefault(STARTED_AT_INFO_KEY, []).append(perf_counter())
+
+
+def after_cursor_execute(
+    connection: Connection, _: Any, statement: str, *__: Any
+) -> None:
+    started_at = connection.info[STARTED_AT_INFO_KEY].pop()
+    stats = query_stats_context.get()
+    if stats is not None:
+        stats.record(statement, perf_counter() - started_at)
+
+
+def handle_error(exception_context: ExceptionContext) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get(STARTED_AT_INFO_KEY):
+        connection.info[STARTED_AT_INFO_KEY].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
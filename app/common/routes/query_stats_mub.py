@@ -0,0 +1,24 @@
+from starlette import status
+
+from app.common.config import query_stats_registry
+from app.common.fastapi_ext import APIRouterExt
+from app.common.query_stats_ext import ScopeQueryStatsSchema
+
+router = APIRouterExt(tags=["query stats mub"])
+
+
+@router.get(
+    path="/query-stats/",
+    summary="List SQL statement stats aggregated per endpoint, event and message",
+)
+async def list_query_stats() -> list[ScopeQueryStatsSchema]:
+    return query_stats_registry.list_scopes()
+
+
+@router.delete(
+    path="/query-stats/",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Reset aggregated SQL statement stats",
+)
+async def reset_query_stats() -> None:
+    query_stats_registry.reset()
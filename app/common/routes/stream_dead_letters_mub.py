@@ -0,0 +1,57 @@
+from typing import Annotated
+
+from fastapi import Body, Query
+from starlette import status
+
+from app.common.config_faststream import faststream, stream_dead_letters
+from app.common.fastapi_ext import APIRouterExt, Responses
+from app.common.faststream_ext import StreamDeadLetterSchema, is_stream_subscribed
+
+router = APIRouterExt(tags=["stream dead letters mub"])
+
+
+class StreamDeadLettersResponses(Responses):
+    CONSUMER_GROUP_NOT_FOUND = status.HTTP_404_NOT_FOUND, "Consumer group not found"
+
+
+def validate_stream_consumer_group(stream_name: str, group_name: str) -> None:
+    if not is_stream_subscribed(faststream.broker, stream_name, group_name):
+        raise StreamDeadLettersResponses.CONSUMER_GROUP_NOT_FOUND
+
+
+@router.get(
+    path="/stream-dead-letters/{stream_name}/{group_name}/",
+    responses=StreamDeadLettersResponses.responses(),
+    summary="List latest dead letters of a stream consumer group",
+)
+async def list_stream_dead_letters(
+    stream_name: str,
+    group_name: str,
+    limit: Annotated[int, Query(gt=0, le=100)] = 50,
+) -> list[StreamDeadLetterSchema]:
+    validate_stream_consumer_group(stream_name, group_name)
+    return await stream_dead_letters.list_latest(
+        stream_name=stream_name,
+        group_name=group_name,
+        limit=limit,
+    )
+
+
+@router.post(
+    path="/stream-dead-letters/{stream_name}/{group_name}/replay/",
+    responses=StreamDeadLettersResponses.responses(),
+    summary="Replay dead letters into the original stream by ids",
+)
+async def replay_stream_dead_letters(
+    stream_name: str,
+    group_name: str,
+    dead_letter_ids: Annotated[
+        list[str], Body(embed=True, min_length=1, max_length=100)
+    ],
+) -> list[str]:
+    validate_stream_consumer_group(stream_name, group_name)
+    return await stream_dead_letters.replay_many(
+        stream_name=stream_name,
+        group_name=group_name,
+        dead_letter_ids=dead_letter_ids,
+    )
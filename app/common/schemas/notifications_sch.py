@@ -1,7 +1,7 @@
 from enum import StrEnum, auto
-from typing import Annotated, Literal
+from typing import Annotated, Literal, Self
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class NotificationKind(StrEnum):
@@ -58,6 +58,45 @@ AnyNotificationPayloadSchema = Annotated[
 ]
 
 
+class TelegramMessageInputSchema(BaseModel):
+    user_id: int
+    chat_id: int
+    message_text: str
+    button_text: str
+    button_link: str
+
+
+class NotificationAudienceKind(StrEnum):
+    CLASSROOM_STUDENTS = auto()
+    COMMUNITY_PARTICIPANTS = auto()
+
+
+class ClassroomStudentsAudienceSchema(BaseModel):
+    kind: Literal[NotificationAudienceKind.CLASSROOM_STUDENTS]
+
+    classroom_id: int
+
+
+class CommunityParticipantsAudienceSchema(BaseModel):
+    kind: Literal[NotificationAudienceKind.COMMUNITY_PARTICIPANTS]
+
+    community_id: int
+
+
+AnyNotificationAudienceSchema = Annotated[
+    ClassroomStudentsAudienceSchema | CommunityParticipantsAudienceSchema,
+    Field(discriminator="kind"),
+]
+
+
 class NotificationInputSchema(BaseModel):
     payload: AnyNotificationPayloadSchema
-    recipient_user_ids: Annotated[list[int], Field(min_length=1, max_length=100)]
+    # explicit recipients, merged with the ones resolved from the audience
+    recipient_user_ids: Annotated[list[int], Field(max_length=100)] = []
+    recipient_audience: AnyNotificationAudienceSchema | None = None
+
+    @model_validator(mode="after")
+    def validate_recipients(self) -> Self:
+        if len(self.recipient_user_ids) == 0 and self.recipient_audience is None:
+            raise ValueError("either recipient user ids or audience are required")
+        return self
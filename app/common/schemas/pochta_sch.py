@@ -20,6 +20,8 @@ class EmailMessageKind(StrEnum):
     RECIPIENT_INVOICE_CREATED_V1 = auto()
     STUDENT_RECIPIENT_INVOICE_PAYMENT_CONFIRMED_V1 = auto()
 
+    NOTIFICATIONS_DIGEST_V1 = auto()
+
 
 class TokenEmailMessagePayloadSchema(BaseModel):
     kind: Literal[
@@ -59,10 +61,26 @@ class RecipientInvoiceNotificationEmailMessagePayloadSchema(
     recipient_invoice_id: int
 
 
+AnyNotificationEmailMessagePayload = Annotated[
+    ClassroomNotificationEmailMessagePayloadSchema
+    | RecipientInvoiceNotificationEmailMessagePayloadSchema,
+    Field(discriminator="kind"),
+]
+
+
+class NotificationsDigestEmailMessagePayloadSchema(BaseModel):
+    kind: Literal[EmailMessageKind.NOTIFICATIONS_DIGEST_V1]
+
+    notifications: Annotated[
+        list[AnyNotificationEmailMessagePayload], Field(min_length=1)
+    ]
+
+
 AnyEmailMessagePayload = Annotated[
     TokenEmailMessagePayloadSchema
     | ClassroomNotificationEmailMessagePayloadSchema
-    | RecipientInvoiceNotificationEmailMessagePayloadSchema,
+    | RecipientInvoiceNotificationEmailMessagePayloadSchema
+    | NotificationsDigestEmailMessagePayloadSchema,
     Field(discriminator="kind"),
 ]
 
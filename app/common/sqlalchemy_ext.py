@@ -2,39 +2,153 @@ from __future__ import annotations
 
 import asyncio
 import sys
-from collections.abc import Iterable, Sequence
+from collections.abc import Awaitable, Callable, Iterable, Sequence
 from contextvars import ContextVar
+from types import TracebackType
 from typing import Any, Self
 
 from pydantic import TypeAdapter
 from sqlalchemy import (
     JSON,
+    Connection,
     Dialect,
     Row,
     Select,
     TypeDecorator,
     delete,
+    event,
     func,
     insert,
     select,
 )
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
 from sqlalchemy.sql.dml import ReturningInsert
 
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-session_context: ContextVar[AsyncSession | None] = ContextVar("session", default=None)
+HAS_WRITES_INFO_KEY = "has_writes"
+
+
+@event.listens_for(Session, "after_flush")
+def record_flush_writes(session: Session, _: UOWTransaction) -> None:
+    session.info[HAS_WRITES_INFO_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def record_execute_writes(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info[HAS_WRITES_INFO_KEY] = True
+
+
+def set_transaction_read_only(connection: Connection) -> None:
+    connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+
+
+class LazySession:
+    """
+    Proxy for a session, which is only created on first access. The session
+    autobegins a transaction on first use, which is committed (or rolled back
+    on error) on exit only if the session was ever accessed.
+
+    Before the first access the session can be routed between the primary
+    and the replica (if a replica sessionmaker is provided). Callbacks added
+    with :py:meth:`after_commit` are awaited once the transaction is
+    committed, and dropped if it's rolled back. They can still use
+    the database, in a new session closed (never committed) after them
+    """
+
+    def __init__(
+        self,
+        sessionmaker: async_sessionmaker[AsyncSession],
+        replica_sessionmaker: async_sessionmaker[AsyncSession] | None = None,
+        use_replica: bool = False,
+    ) -> None:
+        self.sessionmaker = sessionmaker
+        self.replica_sessionmaker = replica_sessionmaker
+        self.use_replica = use_replica
+        self.has_writes = False
+        self.after_commit_callbacks: list[Callable[[], Awaitable[None]]] = []
+        self._session: AsyncSession | None = None
+
+    @property
+    def is_started(self) -> bool:
+        return self._session is not None
+
+    @property
+    def is_replica_session(self) -> bool:
+        return self.use_replica and self.replica_sessionmaker is not None
+
+    def route(self, use_replica: bool) -> None:
+        if self._session is not None:
+            raise RuntimeError("Session is already started")
+        self.use_replica = use_replica
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            if self.is_replica_session and self.replica_sessionmaker is not None:
+                self._session = self.replica_sessionmaker()
+            else:
+                self._session = self.sessionmaker()
+        return self._session
+
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self.after_commit_callbacks.append(callback)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        after_commit_callbacks = self.after_commit_callbacks
+        self.after_commit_callbacks = []
+
+        if self._session is not None:
+            try:
+                if exc_type is None:
+                    await self._session.commit()
+                    self.has_writes = self._session.info.get(HAS_WRITES_INFO_KEY, False)
+                else:
+                    await self._session.rollback()
+            finally:
+                await self._session.close()
+                self._session = None
+
+        if exc_type is None and len(after_commit_callbacks) != 0:
+            try:
+                for callback in after_commit_callbacks:
+                    await callback()
+            finally:
+                if self._session is not None:  # started by a callback, never committed
+                    await self._session.close()
+                    self._session = None
+
+
+session_context: ContextVar[LazySession | None] = ContextVar("session", default=None)
 
 
 class DBController:
     @property
     def session(self) -> AsyncSession:
         """Return an instance of Session local to the current context"""
-        session = session_context.get()
-        if session is None:
+        lazy_session = session_context.get()
+        if lazy_session is None:
             raise ValueError("Session not initialized")
-        return session
+        return lazy_session.session
+
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Run ``callback`` once the transaction of the current context commits"""
+        lazy_session = session_context.get()
+        if lazy_session is None:
+            raise ValueError("Session not initialized")
+        lazy_session.after_commit(callback)
 
     async def get_first_row(self, stmt: Select[Any]) -> Row[Any] | None:
         return (await self.session.execute(stmt)).first()
@@ -72,8 +186,37 @@ class MappingBase:
         return entry
 
     @classmethod
-    async def create_batch(cls, values: Iterable[dict[str, Any]]) -> None:
-        await db.session.execute(insert(cls).values(list(values)))
+    async def create_many(cls, values: Iterable[dict[str, Any]]) -> Sequence[Self]:
+        """
+        Insert all rows in one round-trip, returning created objects
+        in the same order as the values were provided
+        """
+        values = list(values)
+        if len(values) == 0:
+            return []
+        stmt = insert(cls).returning(cls, sort_by_parameter_order=True)
+        return (await db.session.scalars(stmt, values)).all()
+
+    @classmethod
+    async def find_or_create_by_kwargs(cls, **kwargs: Any) -> Self:
+        """
+        Find a row by ``kwargs`` (covering a unique constraint) or create it.
+        Existing rows are only read, so nothing is written or locked for them.
+        A row created concurrently is found again after ON CONFLICT DO NOTHING
+        """
+        entry = await cls.find_first_by_kwargs(**kwargs)
+        if entry is not None:
+            return entry
+
+        stmt = postgresql_insert(cls).values(**kwargs).on_conflict_do_nothing()
+        entry = (await db.session.scalars(stmt.returning(cls))).first()
+        if entry is not None:
+            return entry
+
+        entry = await cls.find_first_by_kwargs(**kwargs)
+        if entry is None:
+            raise RuntimeError(f"{cls.__name__} conflicted, but can't be found")
+        return entry
 
     @classmethod
     def select_by_kwargs(cls, *order_by: Any, **kwargs: Any) -> Select[tuple[Self]]:
@@ -0,0 +1,88 @@
+import os
+from hashlib import sha256
+from pathlib import Path
+from typing import BinaryIO
+from uuid import uuid4
+
+from pydantic import BaseModel
+from starlette import status
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+
+from app.common.config import settings
+from app.common.fastapi_ext import Responses
+
+
+class UploadResponses(Responses):
+    TOO_LARGE = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Upload is too large"
+
+
+class UploadWriter:
+    """
+    Writes chunks into a temporary file next to ``path`` and hashes them,
+    so that all the blocking work can be done in the thread pool. The file
+    only appears under ``path`` once it's completely written
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.temporary_path = path.with_name(f".{path.name}.{uuid4().hex}")
+        self.content_hash = sha256()
+        self.size = 0
+        self.file: BinaryIO | None = None
+
+    def open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = self.temporary_path.open("wb")
+
+    def write(self, chunk: bytes) -> None:
+        if self.file is None:
+            raise RuntimeError("Upload writer is not open")
+        self.content_hash.update(chunk)
+        self.file.write(chunk)
+
+    def commit(self) -> None:
+        if self.file is None:
+            raise RuntimeError("Upload writer is not open")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.temporary_path, self.path)
+
+    def discard(self) -> None:
+        if self.file is not None:
+            self.file.close()
+        self.temporary_path.unlink(missing_ok=True)
+
+
+class StoredUpload(BaseModel):
+    sha256: str
+    size: int
+
+
+async def store_upload(
+    upload: UploadFile,
+    path: Path,
+    max_size: int,
+    chunk_size: int = settings.uploads.chunk_size,
+) -> StoredUpload:
+    # size of a multipart upload is known upfront, no need to read it at all
+    if upload.size is not None and upload.size > max_size:
+        raise UploadResponses.TOO_LARGE
+
+    writer = UploadWriter(path=path)
+    await upload.seek(0)
+    try:
+        await run_in_threadpool(writer.open)
+        while chunk := await upload.read(chunk_size):
+            writer.size += len(chunk)
+            if writer.size > max_size:
+                raise UploadResponses.TOO_LARGE
+            await run_in_threadpool(writer.write, chunk)
+        await run_in_threadpool(writer.commit)
+    except BaseException:
+        # not awaited, so that cancelled uploads are cleaned up as well
+        writer.discard()
+        raise
+
+    return StoredUpload(sha256=writer.content_hash.hexdigest(), size=writer.size)
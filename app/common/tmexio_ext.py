@@ -1,18 +1,27 @@
 import logging
 from collections.abc import AsyncIterator
 
-from tmexio import EventRouter, register_dependency
+from tmexio import AsyncSocket, EventName, EventRouter, register_dependency
 from tmexio.handler_builders import Depends
 
-from app.common.config import sessionmaker
-from app.common.sqlalchemy_ext import session_context
+from app.common.bridges.outbox import buffered_publishing
+from app.common.config import query_stats_registry
+from app.common.database_routing import routed_session
+from app.common.query_stats_ext import collect_query_stats
+
+READ_ONLY_EVENT_PREFIXES: tuple[str, ...] = ("list-", "retrieve-")
 
 
 @register_dependency()
-async def db_session() -> AsyncIterator[None]:
-    async with sessionmaker.begin() as session:
-        session_context.set(session)
-        yield
+async def db_session(event_name: EventName, socket: AsyncSocket) -> AsyncIterator[None]:
+    auth_data = (await socket.get_session()).get("auth")
+    with collect_query_stats(query_stats_registry, f"sio {event_name}"):
+        async with buffered_publishing():
+            async with routed_session(
+                use_replica=event_name.startswith(READ_ONLY_EVENT_PREFIXES),
+                user_id=None if auth_data is None else auth_data.user_id,
+            ):
+                yield
 
 
 class EventRouterExt(EventRouter):
@@ -27,6 +27,7 @@ from app.communities.routes import (
     communities_sio,
     invitations_mub,
     invitations_sio,
+    participants_int,
     participants_mub,
     participants_sio,
     tasks_mub,
@@ -46,6 +47,7 @@ internal_router = APIRouterExt(
     prefix="/internal/community-service",
 )
 internal_router.include_router(board_channels_int.router)
+internal_router.include_router(participants_int.router)
 
 
 mub_router = APIRouterExt(
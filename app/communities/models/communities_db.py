@@ -6,6 +6,7 @@ from sqlalchemy import String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.common.config import Base, settings
+from app.common.pillow_ext import IMAGE_VARIANT_SIZES, ImageVariantSize
 
 
 class Community(Base):
@@ -23,6 +24,14 @@ class Community(Base):
     def avatar_path(self) -> Path:
         return settings.community_avatars_path / f"{self.id}.webp"
 
+    def build_avatar_variant_path(self, size: ImageVariantSize) -> Path:
+        return settings.community_avatars_path / f"{self.id}.{size}.webp"
+
+    def unlink_avatar(self) -> None:
+        self.avatar_path.unlink(missing_ok=True)
+        for size in IMAGE_VARIANT_SIZES:
+            self.build_avatar_variant_path(size).unlink(missing_ok=True)
+
 
 class CommunityIdSchema(BaseModel):
     community_id: int
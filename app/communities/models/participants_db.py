@@ -56,6 +56,14 @@ class Participant(Base):
             cls.created_at.desc(), community_id=community_id
         )
 
+    @classmethod
+    async def find_all_user_ids_by_community_id(
+        cls, community_id: int
+    ) -> Sequence[int]:
+        return await db.get_all(
+            select(cls.user_id).filter_by(community_id=community_id)
+        )
+
     # community-2-participant repository
     @classmethod
     async def find_first_community_by_user_id(
@@ -1,11 +1,22 @@
+from os import stat
 from typing import Annotated
 
 import filetype  # type: ignore[import-untyped]
-from fastapi import File, UploadFile
+from fastapi import File, Query, UploadFile
 from filetype.types.image import Webp  # type: ignore[import-untyped]
 from starlette import status
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import FileResponse
 
+from app.common.config import image_processor, settings
 from app.common.fastapi_ext import APIRouterExt, Responses
+from app.common.pillow_ext import (
+    IMAGE_VARIANT_SIZES,
+    ImageVariantSize,
+    InvalidImageError,
+    build_temporary_path,
+)
+from app.common.starlette_uploads_ext import UploadResponses, store_upload
 from app.communities.dependencies.communities_dep import CommunityById
 
 router = APIRouterExt(tags=["community avatars"])
@@ -15,11 +26,16 @@ class AvatarResponses(Responses):
     WRONG_FORMAT = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, "Invalid image format"
 
 
+class AvatarReadResponses(Responses):
+    AVATAR_NOT_FOUND = status.HTTP_404_NOT_FOUND, "Avatar not found"
+    INVALID_AVATAR = status.HTTP_409_CONFLICT, "Avatar can't be resized"
+
+
 # TODO authorize a user in the community
 @router.put(
     "/communities/{community_id}/avatar/",
     status_code=status.HTTP_204_NO_CONTENT,
-    responses=AvatarResponses.responses(),
+    responses=Responses.chain(AvatarResponses, UploadResponses),
     summary="Update or create a community avatar by id",
 )
 async def update_or_create_avatar(
@@ -29,8 +45,24 @@ async def update_or_create_avatar(
     if not filetype.match(avatar.file, [Webp()]):
         raise AvatarResponses.WRONG_FORMAT
 
-    with community.avatar_path.open("wb") as file:
-        file.write(await avatar.read())
+    upload_path = build_temporary_path(community.avatar_path)
+    await store_upload(
+        upload=avatar,
+        path=upload_path,
+        max_size=settings.uploads.max_avatar_size,
+    )
+    # variants are keyed by community id, so all of them are replaced right away
+    try:
+        await image_processor.replace_with_variants(
+            source_path=upload_path,
+            target_path=community.avatar_path,
+            variant_paths={
+                size: community.build_avatar_variant_path(size)
+                for size in IMAGE_VARIANT_SIZES
+            },
+        )
+    except InvalidImageError:
+        raise AvatarResponses.WRONG_FORMAT
 
 
 @router.delete(
@@ -39,4 +71,32 @@ async def update_or_create_avatar(
     summary="Delete a community avatar by id",
 )
 async def delete_avatar(community: CommunityById) -> None:
-    community.avatar_path.unlink(missing_ok=True)
+    community.unlink_avatar()
+
+
+@router.get(
+    "/communities/{community_id}/avatar/",
+    responses=AvatarReadResponses.responses(),
+    summary="Read a community avatar by id",
+)
+async def read_avatar(
+    community: CommunityById,
+    size: Annotated[ImageVariantSize | None, Query()] = None,
+) -> FileResponse:
+    path = community.avatar_path
+    try:
+        if size is not None:
+            # avatars uploaded before variants existed are resized on first read
+            path = community.build_avatar_variant_path(size)
+            await image_processor.ensure_variant(
+                source_path=community.avatar_path,
+                target_path=path,
+                size=size,
+            )
+        stat_result = await run_in_threadpool(stat, path)
+    except FileNotFoundError:
+        raise AvatarReadResponses.AVATAR_NOT_FOUND
+    except InvalidImageError:
+        raise AvatarReadResponses.INVALID_AVATAR
+
+    return FileResponse(path=path, media_type="image/webp", stat_result=stat_result)
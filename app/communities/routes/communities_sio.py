@@ -28,7 +28,7 @@ from app.communities.routes.participants_sio import (
     CreateParticipantEmitter,
     DeleteParticipantEmitter,
 )
-from app.communities.store import user_id_to_sids
+from app.communities.store import user_sids_registry
 
 router = EventRouterExt(tags=["communities-all"])  # TODO split community routers
 
@@ -199,7 +199,7 @@ async def leave_community(
     await participant.delete()
     await db.session.commit()
 
-    for sid in user_id_to_sids[user.user_id]:
+    for sid in await user_sids_registry.list_sids(user.user_id):
         await server.leave_room(sid=sid, room=community_room(community.id))
         await server.leave_room(sid=sid, room=participants_list_room(community.id))
 
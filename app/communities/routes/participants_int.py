@@ -0,0 +1,19 @@
+from collections.abc import Sequence
+
+from app.common.fastapi_ext import APIRouterExt
+from app.communities.dependencies.communities_dep import CommunityById
+from app.communities.models.participants_db import Participant
+
+router = APIRouterExt(tags=["participants internal"])
+
+
+@router.get(
+    path="/communities/{community_id}/participants/user-ids/",
+    summary="List user ids of all participants in a community by id",
+)
+async def list_community_participant_user_ids(
+    community: CommunityById,
+) -> Sequence[int]:
+    return await Participant.find_all_user_ids_by_community_id(
+        community_id=community.id
+    )
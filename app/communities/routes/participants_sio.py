@@ -26,7 +26,7 @@ from app.communities.rooms import (
     participant_room,
     participants_list_room,
 )
-from app.communities.store import user_id_to_sids
+from app.communities.store import user_sids_registry
 
 router = EventRouterExt(tags=["participants-list"])
 
@@ -154,7 +154,7 @@ async def kick_participant(
     await target_participant.delete()
     await db.session.commit()
 
-    for sid in user_id_to_sids[target_participant.user_id]:
+    for sid in await user_sids_registry.list_sids(target_participant.user_id):
         await server.leave_room(sid=sid, room=community_room(community.id))
         await server.leave_room(sid=sid, room=participants_list_room(community.id))
 
@@ -1,4 +1,78 @@
+import asyncio
 from collections import defaultdict
+from time import time
 
-# TODO rethink user_id_to_sids structure for horizontal scaling
-user_id_to_sids: dict[int, set[str]] = defaultdict(set)
+from redis.asyncio import Redis
+
+from app.common.config import redis_socketio, settings
+
+
+class UserSidsRegistry:
+    """
+    Registry of socket.io sids connected for each user. Sids of the current
+    instance are always tracked locally. With redis configured they are also
+    shared between instances via per-user sorted sets, where scores are expiry
+    timestamps, refreshed by :py:meth:`heartbeat` while the instance is alive
+    """
+
+    def __init__(self, redis: Redis | None, expiry_timeout: int) -> None:
+        self.redis = redis
+        self.expiry_timeout = expiry_timeout
+        self.local_user_id_to_sids: defaultdict[int, set[str]] = defaultdict(set)
+
+    @staticmethod
+    def build_key(user_id: int) -> str:
+        return f"socketio:user-sids:{user_id}"
+
+    async def add(self, user_id: int, sid: str) -> None:
+        self.local_user_id_to_sids[user_id].add(sid)
+
+        if self.redis is not None:
+            key = self.build_key(user_id)
+            async with self.redis.pipeline(transaction=False) as pipeline:
+                pipeline.zadd(key, {sid: time() + self.expiry_timeout})
+                pipeline.expire(key, self.expiry_timeout)
+                await pipeline.execute()
+
+    async def remove(self, user_id: int, sid: str) -> None:
+        local_sids = self.local_user_id_to_sids[user_id]
+        local_sids.discard(sid)
+        if len(local_sids) == 0:
+            self.local_user_id_to_sids.pop(user_id)
+
+        if self.redis is not None:
+            await self.redis.zrem(self.build_key(user_id), sid)
+
+    async def list_sids(self, user_id: int) -> set[str]:
+        if self.redis is None:
+            return set(self.local_user_id_to_sids.get(user_id, ()))
+
+        key = self.build_key(user_id)
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            pipeline.zremrangebyscore(key, "-inf", time())
+            pipeline.zrange(key, 0, -1)
+            _, sids = await pipeline.execute()
+        return {sid.decode() for sid in sids}
+
+    async def heartbeat(self) -> None:
+        if self.redis is None or len(self.local_user_id_to_sids) == 0:
+            return
+
+        expires_at = time() + self.expiry_timeout
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for user_id, sids in self.local_user_id_to_sids.items():
+                key = self.build_key(user_id)
+                pipeline.zadd(key, dict.fromkeys(sids, expires_at))
+                pipeline.expire(key, self.expiry_timeout)
+            await pipeline.execute()
+
+    async def run_heartbeats(self, interval: float) -> None:
+        while True:  # noqa: WPS457  # cancelled on shutdown
+            await asyncio.sleep(interval)
+            await self.heartbeat()
+
+
+user_sids_registry = UserSidsRegistry(
+    redis=redis_socketio,
+    expiry_timeout=settings.socketio_heartbeat_interval * 3,
+)
@@ -3,11 +3,13 @@ from typing import Annotated
 from fastapi import Path
 from starlette import status
 
-from app.common.config_bdg import classrooms_bridge, notifications_bridge
+from app.common.config_bdg import notifications_bridge
 from app.common.dependencies.authorization_dep import AuthorizationData
 from app.common.fastapi_ext import APIRouterExt
 from app.common.schemas.notifications_sch import (
     ClassroomNotificationPayloadSchema,
+    ClassroomStudentsAudienceSchema,
+    NotificationAudienceKind,
     NotificationInputSchema,
     NotificationKind,
 )
@@ -32,20 +34,16 @@ async def reactivate_classroom_conference(
 ) -> None:
     await conferences_svc.reactivate_room(livekit_room_name=livekit_room_name)
 
-    # TODO: make notifications service know classrooms instead
-    classroom_student_ids = await classrooms_bridge.list_classroom_student_ids(
-        classroom_id=classroom_id
-    )
-    if len(classroom_student_ids) == 0:
-        return
-
     await notifications_bridge.send_notification(
         NotificationInputSchema(
             payload=ClassroomNotificationPayloadSchema(
                 kind=NotificationKind.CLASSROOM_CONFERENCE_STARTED_V1,
                 classroom_id=classroom_id,
             ),
-            recipient_user_ids=classroom_student_ids,
+            recipient_audience=ClassroomStudentsAudienceSchema(
+                kind=NotificationAudienceKind.CLASSROOM_STUDENTS,
+                classroom_id=classroom_id,
+            ),
         )
     )
 
@@ -1,8 +1,17 @@
 from starlette import status
 
+from app.common.config import settings
 from app.common.config_bdg import datalake_bridge
 from app.common.fastapi_ext import APIRouterExt
+from app.common.faststream_ext import (
+    StreamConsumerLagSchema,
+    retrieve_stream_consumer_lag,
+)
 from app.common.schemas.datalake_sch import DatalakeEventInputSchema
+from app.datalake.routes.datalake_events_sub import (
+    DATALAKE_SERVICE_GROUP_NAME,
+    datalake_events_consumer_stats,
+)
 
 router = APIRouterExt(tags=["datalake events mub"])
 
@@ -14,3 +23,16 @@ router = APIRouterExt(tags=["datalake events mub"])
 )
 async def queue_datalake_event_recording(data: DatalakeEventInputSchema) -> None:
     await datalake_bridge.record_datalake_event(data)
+
+
+@router.get(
+    path="/datalake-events/consumer-lag/",
+    summary="Retrieve lag of the datalake events consumer",
+)
+async def retrieve_datalake_events_consumer_lag() -> StreamConsumerLagSchema:
+    return await retrieve_stream_consumer_lag(
+        broker=datalake_bridge.broker,
+        stream_name=settings.datalake_events_record_stream_name,
+        group_name=DATALAKE_SERVICE_GROUP_NAME,
+        consumer_stats=datalake_events_consumer_stats,
+    )
@@ -1,18 +1,78 @@
+from time import perf_counter
+from typing import Any
+
 from faststream.redis import RedisRouter
+from pydantic import ValidationError
+from sqlalchemy.exc import DataError, IntegrityError
 
 from app.common.config import settings
-from app.common.faststream_ext import build_stream_sub
+from app.common.faststream_ext import (
+    StreamConsumerStats,
+    build_stream_sub,
+    dead_letter_stream_entry,
+)
 from app.common.schemas.datalake_sch import DatalakeEventInputSchema
+from app.common.sqlalchemy_ext import db
 from app.datalake.models.datalake_events_db import DatalakeEvent
 
+DATALAKE_SERVICE_GROUP_NAME = "datalake-service"
+
 router = RedisRouter()
 
+datalake_events_consumer_stats = StreamConsumerStats()
+
+
+def validate_datalake_events(
+    data: list[Any],
+) -> list[tuple[int, DatalakeEventInputSchema]]:
+    indexed_events: list[tuple[int, DatalakeEventInputSchema]] = []
+    for index, raw_event in enumerate(data):
+        try:
+            event = DatalakeEventInputSchema.model_validate(raw_event)
+        except ValidationError as exc:
+            dead_letter_stream_entry(index, repr(exc))
+        else:
+            indexed_events.append((index, event))
+    return indexed_events
+
+
+async def create_datalake_events(
+    indexed_events: list[tuple[int, DatalakeEventInputSchema]],
+) -> None:
+    try:
+        async with db.session.begin_nested():
+            await DatalakeEvent.create_many(
+                event.model_dump() for _, event in indexed_events
+            )
+        return
+    except (DataError, IntegrityError):
+        pass  # some event is rejected by postgres, so they are retried one by one
+
+    for index, event in indexed_events:
+        try:
+            async with db.session.begin_nested():
+                await DatalakeEvent.create(**event.model_dump())
+        except (DataError, IntegrityError) as exc:
+            dead_letter_stream_entry(index, repr(exc))
+
 
 @router.subscriber(  # type: ignore[misc]  # bad typing in faststream
     stream=build_stream_sub(
         stream_name=settings.datalake_events_record_stream_name,
-        service_name="datalake-service",
+        service_name=DATALAKE_SERVICE_GROUP_NAME,
+        batch=settings.datalake_events_record_batch,
     ),
 )
-async def record_datalake_event(data: DatalakeEventInputSchema) -> None:
-    await DatalakeEvent.create(**data.model_dump())
+async def record_datalake_events(data: list[Any]) -> None:
+    # the whole batch is written in one multi-row INSERT and acked together,
+    # events that are invalid or rejected by postgres are dead-lettered alone
+    started_at = perf_counter()
+    indexed_events = validate_datalake_events(data)
+    await create_datalake_events(indexed_events)
+    datalake_events_consumer_stats.record_batch(
+        size=len(data),
+        oldest_created_at=min(
+            (event.recorded_at for _, event in indexed_events), default=None
+        ),
+        duration=perf_counter() - started_at,
+    )
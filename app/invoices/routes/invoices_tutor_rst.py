@@ -104,31 +104,37 @@ async def create_invoice(
         classroom_id=classroom_id,
     )
 
-    for position, invoice_item_data in enumerate(data.items):
-        await InvoiceItem.create(
+    await InvoiceItem.create_many(
+        {
             **invoice_item_data.model_dump(),
-            invoice_id=invoice.id,
-            position=position,
-        )
-
-    for student_id in included_student_ids:
-        recipient_invoice = await RecipientInvoice.create(
-            invoice_id=invoice.id,
-            student_id=student_id,
-            total=total,
-            status=PaymentStatus.WF_SENDER_CONFIRMATION,
-        )
-
-        # TODO: batch sending or use invoice_ids instead
-        await notifications_bridge.send_notification(
+            "invoice_id": invoice.id,
+            "position": position,
+        }
+        for position, invoice_item_data in enumerate(data.items)
+    )
+
+    recipient_invoices = await RecipientInvoice.create_many(
+        {
+            "invoice_id": invoice.id,
+            "student_id": student_id,
+            "total": total,
+            "status": PaymentStatus.WF_SENDER_CONFIRMATION,
+        }
+        for student_id in included_student_ids
+    )
+
+    await notifications_bridge.send_notifications(
+        [
             NotificationInputSchema(
                 payload=RecipientInvoiceNotificationPayloadSchema(
                     kind=NotificationKind.RECIPIENT_INVOICE_CREATED_V1,
                     recipient_invoice_id=recipient_invoice.id,
                 ),
-                recipient_user_ids=[student_id],
+                recipient_user_ids=[recipient_invoice.student_id],
             )
-        )
+            for recipient_invoice in recipient_invoices
+        ]
+    )
 
     return invoice
 
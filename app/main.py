@@ -1,11 +1,10 @@
+import asyncio
 from collections.abc import AsyncIterator, Awaitable, Callable
 from contextlib import AsyncExitStack, asynccontextmanager
 from typing import Annotated, Any
 
 from fastapi import FastAPI
 from fastapi.openapi.docs import get_swagger_ui_html
-from faststream import BaseMiddleware, StreamMessage
-from faststream.redis.fastapi import RedisRouter
 from pydantic import ValidationError
 from starlette import status
 from starlette.requests import Request
@@ -32,15 +31,33 @@ from app import (
     supbot,
     users,
 )
-from app.common.config import Base, engine, livekit, sessionmaker, settings, tmex
+from app.common.bridges.outbox import buffered_publishing, outbox_relay
+from app.common.config import (
+    Base,
+    BridgeTransportMode,
+    engine,
+    image_processor,
+    livekit,
+    query_stats_registry,
+    redis_cache,
+    redis_socketio,
+    settings,
+    tmex,
+)
 from app.common.config_bdg import all_bridges, datalake_bridge
+from app.common.config_faststream import faststream, stream_pending_reclaimer
+from app.common.database_routing import routed_session
+from app.common.dependencies.authorization_dep import AUTH_USER_ID_HEADER_NAME
 from app.common.dependencies.authorization_sio_dep import authorize_from_wsgi_environ
+from app.common.dependencies.mub_dep import MUBProtection
+from app.common.fastapi_ext import APIRouterExt
+from app.common.query_stats_ext import collect_query_stats
+from app.common.routes import query_stats_mub, stream_dead_letters_mub
 from app.common.schemas.datalake_sch import DatalakeEventInputSchema, DatalakeEventKind
-from app.common.sqlalchemy_ext import session_context
 from app.common.starlette_cors_ext import CorrectCORSMiddleware
 from app.common.tmexio_ext import remove_ping_pong_logs
 from app.communities.rooms import user_room
-from app.communities.store import user_id_to_sids
+from app.communities.store import user_sids_registry
 
 tmex.include_router(communities.event_router)
 tmex.include_router(messenger.event_router)
@@ -71,7 +88,7 @@ async def connect_user(socket: AsyncSocket) -> None:
     except ValidationError:
         raise EventException(status.HTTP_407_PROXY_AUTHENTICATION_REQUIRED, "bad")
     await socket.save_session({"auth": auth_data})
-    user_id_to_sids[auth_data.user_id].add(socket.sid)
+    await user_sids_registry.add(auth_data.user_id, socket.sid)
     await socket.enter_room(user_room(auth_data.user_id))
 
     await datalake_bridge.record_datalake_event(
@@ -85,7 +102,7 @@ async def connect_user(socket: AsyncSocket) -> None:
 @tmex.on_disconnect(summary="[special] Automatic event")
 async def disconnect_user(socket: AsyncSocket) -> None:
     user_id = (await socket.get_session())["auth"].user_id
-    user_id_to_sids[user_id].remove(socket.sid)
+    await user_sids_registry.remove(user_id, socket.sid)
 
 
 @tmex.on_other(summary="[special] Handler for non-existent events")
@@ -95,26 +112,23 @@ async def handle_other_events(  # TODO (38980978) pragma: no cover
     return f"Unknown event: '{event_name}'"
 
 
-class FastStreamDatabaseSessionMiddleware(BaseMiddleware):
-    async def consume_scope(
-        self,
-        call_next: Callable[[Any], Awaitable[Any]],
-        msg: StreamMessage[Any],
-    ) -> Any:
-        async with sessionmaker.begin() as session:
-            session_context.set(session)
-            return await call_next(msg)
-
-
-faststream = RedisRouter(
-    settings.redis_faststream_dsn,
-    middlewares=[FastStreamDatabaseSessionMiddleware],
-)
 faststream.include_router(datalake.stream_router)  # type: ignore[arg-type]
 faststream.include_router(notifications.stream_router)  # type: ignore[arg-type]
 faststream.include_router(pochta.stream_router)  # type: ignore[arg-type]
 
 
+@faststream.after_startup
+async def start_stream_pending_reclaimer(_app_instance: FastAPI) -> None:
+    # consumer groups are created when the broker starts subscribers
+    if not settings.is_testing_mode:
+        stream_pending_reclaimer.start()
+
+
+@faststream.on_broker_shutdown
+async def stop_stream_pending_reclaimer(_app_instance: FastAPI) -> None:
+    stream_pending_reclaimer.stop()
+
+
 async def reinit_database() -> None:  # pragma: no cover
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -122,15 +136,35 @@ async def reinit_database() -> None:  # pragma: no cover
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+async def lifespan(app_instance: FastAPI) -> AsyncIterator[None]:
     if settings.postgres_automigrate:
         await reinit_database()
 
     async with AsyncExitStack() as stack:
         for bridge in all_bridges:
-            await bridge.setup(exit_stack=stack, broker=faststream.broker)
+            await bridge.setup(
+                exit_stack=stack,
+                broker=faststream.broker,
+                asgi_app=(
+                    app_instance
+                    if settings.bridge_transport_mode is BridgeTransportMode.ASGI
+                    else None
+                ),
+            )
 
         await stack.enter_async_context(livekit)
+        stack.callback(image_processor.shutdown)
+        if redis_cache is not None:
+            await stack.enter_async_context(redis_cache)
+        if redis_socketio is not None:
+            await stack.enter_async_context(redis_socketio)
+            heartbeat_task = asyncio.create_task(
+                user_sids_registry.run_heartbeats(settings.socketio_heartbeat_interval)
+            )
+            stack.callback(heartbeat_task.cancel)
+        if settings.outbox.enabled and not settings.is_testing_mode:
+            relay_task = asyncio.create_task(outbox_relay.run(faststream.broker))
+            stack.callback(relay_task.cancel)
 
         yield
 
@@ -170,7 +204,12 @@ app.add_middleware(
 app.include_router(faststream)
 app.mount("/socket.io/", tmex.build_asgi_app())
 
+mub_router = APIRouterExt(dependencies=[MUBProtection], prefix="/mub")
+mub_router.include_router(query_stats_mub.router)
+mub_router.include_router(stream_dead_letters_mub.router)
+
 include_unused_services = not settings.production_mode
+app.include_router(mub_router)
 app.include_router(autocomplete.api_router)
 app.include_router(communities.api_router, include_in_schema=include_unused_services)
 app.include_router(conferences.api_router)
@@ -221,6 +260,25 @@ async def database_session_middleware(
     request: Request,
     call_next: Callable[[Request], Awaitable[Response]],
 ) -> Response:
-    async with sessionmaker.begin() as session:
-        session_context.set(session)
-        return await call_next(request)
+    user_id = request.headers.get(AUTH_USER_ID_HEADER_NAME)
+    # unmatched paths are not recorded separately, so scanners can't grow stats
+    scope = "http unmatched"
+    with collect_query_stats(query_stats_registry, scope) as query_stats:
+        async with buffered_publishing():
+            async with routed_session(
+                use_replica=request.method in {"GET", "HEAD"},
+                user_id=(
+                    int(user_id) if user_id is not None and user_id.isdigit() else None
+                ),
+            ):
+                response = await call_next(request)
+
+        # group stats by path templates, not concrete urls. Methods not allowed
+        # by the route (405s) are arbitrary too, so only allowed ones are used
+        route = request.scope.get("route")
+        if route is not None and request.method in getattr(route, "methods", ()):
+            query_stats.scope = f"{request.method} {route.path}"
+
+    if not settings.production_mode:
+        response.headers.update(query_stats.as_headers)
+    return response
@@ -30,7 +30,4 @@ class ChatUser(Base):
 
     @classmethod
     async def find_or_create(cls, chat_id: int, user_id: int) -> Self:
-        chat_user = await cls.find_first_by_kwargs(chat_id=chat_id, user_id=user_id)
-        if chat_user is None:
-            return await cls.create(chat_id=chat_id, user_id=user_id)
-        return chat_user
+        return await cls.find_or_create_by_kwargs(chat_id=chat_id, user_id=user_id)
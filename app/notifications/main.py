@@ -1,3 +1,4 @@
+import asyncio
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from typing import Any
@@ -19,16 +20,20 @@ from app.notifications.routes import (
     telegram_connections_mub,
     telegram_connections_rst,
     telegram_connections_tgm,
+    telegram_messages_sub,
     telegram_webhook_rst,
     user_contacts_int,
     user_contacts_mub,
     user_contacts_rst,
 )
+from app.notifications.services.email_digests_svc import email_notification_digests
+from app.notifications.services.retention_svc import notifications_retention
 
 telegram_app.include_router(telegram_connections_tgm.router)
 
 stream_router = RedisRouter()
 stream_router.include_router(notifications_sub.router)
+stream_router.include_router(telegram_messages_sub.router)
 
 outside_router = APIRouterExt(prefix="/api/public/notification-service")
 outside_router.include_router(telegram_webhook_rst.router)
@@ -65,8 +70,19 @@ async def lifespan(_: Any) -> AsyncIterator[None]:
         bot_settings=settings.notifications_bot,
         webhook_prefix=outside_router.prefix,
     )
+
+    tasks: list[asyncio.Task[None]] = []
+    if not settings.is_testing_mode:
+        if settings.notifications_retention.enabled:
+            tasks.append(asyncio.create_task(notifications_retention.run()))
+        if email_notification_digests.redis is not None:
+            tasks.append(asyncio.create_task(email_notification_digests.run()))
+
     yield
 
+    for task in tasks:
+        task.cancel()
+
 
 api_router = APIRouterExt(lifespan=lifespan)
 api_router.include_router(outside_router)
@@ -1,8 +1,13 @@
+from collections.abc import Sequence
+from typing import Annotated, Self
+
+from pydantic import Field
 from pydantic_marshals.sqlalchemy import MappedModel
-from sqlalchemy import String
+from sqlalchemy import String, select
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.common.config import Base
+from app.common.config import Base, settings
+from app.common.sqlalchemy_ext import db
 
 
 class EmailConnection(Base):
@@ -10,5 +15,19 @@ class EmailConnection(Base):
 
     user_id: Mapped[int] = mapped_column(primary_key=True)
     email: Mapped[str] = mapped_column(String(100), index=True)
+    # notifications are sent right away when zero, otherwise collected into digests
+    digest_window_minutes: Mapped[int] = mapped_column(default=0)
+
+    DigestWindowType = Annotated[
+        int, Field(ge=0, le=settings.email_digests.max_window_minutes)
+    ]
 
     InputSchema = MappedModel.create(columns=[email])
+    DigestSettingsSchema = MappedModel.create(
+        columns=[(digest_window_minutes, DigestWindowType)]
+    )
+
+    @classmethod
+    async def find_all_by_user_ids(cls, user_ids: Sequence[int]) -> Sequence[Self]:
+        stmt = select(cls).filter(cls.user_id.in_(user_ids)).order_by(cls.user_id)
+        return await db.get_all(stmt)
@@ -15,6 +15,7 @@ from app.common.utils.datetime import datetime_utc_now
 
 class NotificationCursorSchema(BaseModel):
     created_at: AwareDatetime
+    notification_id: UUID | None = None  # breaks ties between equal created_at
 
 
 class NotificationSearchRequestSchema(BaseModel):
@@ -5,15 +5,27 @@ from uuid import UUID
 
 from pydantic import AwareDatetime
 from pydantic_marshals.sqlalchemy import MappedModel
-from sqlalchemy import DateTime, ForeignKey, select
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Select,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql.functions import count
 
 from app.common.config import Base
+from app.common.schemas.notifications_sch import NotificationKind
 from app.common.sqlalchemy_ext import db
 from app.common.utils.datetime import datetime_utc_now
 from app.notifications.models.notifications_db import (
     Notification,
+    NotificationCursorSchema,
     NotificationSearchRequestSchema,
 )
 
@@ -27,48 +39,149 @@ class RecipientNotification(Base):
         index=True,
     )
     notification: Mapped[Notification] = relationship(lazy="joined")
-    recipient_user_id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    recipient_user_id: Mapped[int] = mapped_column(primary_key=True)
+
+    # denormalized from notifications, so that inboxes are served by an index
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=datetime_utc_now,
+    )
+    kind: Mapped[NotificationKind] = mapped_column(
+        Enum(NotificationKind, native_enum=False, create_constraint=False, length=100)
+    )
 
     read_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
 
+    __table_args__ = (
+        Index(
+            "recipient_notifications_inbox_index",
+            recipient_user_id,
+            created_at.desc(),
+            notification_id.desc(),
+        ),
+        Index(
+            "recipient_notifications_unread_index",
+            recipient_user_id,
+            postgresql_where=read_at.is_(None),
+        ),
+    )
+
     ResponseSchema = MappedModel.create(
         columns=[(read_at, AwareDatetime | None)],
         relationships=[(notification, Notification.ResponseSchema)],
     )
 
     @classmethod
-    async def find_paginated_by_recipient_user_id(
+    def select_paginated_by_recipient_user_id(
         cls,
         recipient_user_id: int,
         search_params: NotificationSearchRequestSchema,
-    ) -> Sequence[Self]:
+    ) -> Select[tuple[Self]]:
         stmt = (
             select(cls)
             .filter_by(recipient_user_id=recipient_user_id)
-            .join(Notification)
-            .order_by(Notification.created_at.desc())
+            .order_by(cls.created_at.desc(), cls.notification_id.desc())
         )
 
-        if search_params.cursor is not None:
+        cursor = search_params.cursor
+        if cursor is not None and cursor.notification_id is not None:
             stmt = stmt.filter(
-                Notification.created_at < search_params.cursor.created_at
+                tuple_(cls.created_at, cls.notification_id)
+                < tuple_(cursor.created_at, cursor.notification_id)
+            )
+        elif cursor is not None:
+            stmt = stmt.filter(cls.created_at < cursor.created_at)
+
+        return stmt.limit(search_params.limit)
+
+    @classmethod
+    async def find_paginated_by_recipient_user_id(
+        cls,
+        recipient_user_id: int,
+        search_params: NotificationSearchRequestSchema,
+    ) -> Sequence[Self]:
+        return await db.get_all(
+            stmt=cls.select_paginated_by_recipient_user_id(
+                recipient_user_id=recipient_user_id,
+                search_params=search_params,
             )
+        )
+
+    @classmethod
+    def select_unread_counts_by_recipient_user_ids(
+        cls,
+        recipient_user_ids: Sequence[int],
+    ) -> Select[tuple[int, int]]:
+        return (
+            select(cls.recipient_user_id, count())
+            .filter(cls.recipient_user_id.in_(recipient_user_ids))
+            .filter(cls.read_at.is_(None))
+            .group_by(cls.recipient_user_id)
+        )
 
-        return await db.get_all(stmt=stmt.limit(search_params.limit))
+    @classmethod
+    async def count_unread_by_recipient_user_ids(
+        cls,
+        recipient_user_ids: Sequence[int],
+    ) -> dict[int, int]:
+        rows = await db.session.execute(
+            cls.select_unread_counts_by_recipient_user_ids(
+                recipient_user_ids=recipient_user_ids
+            )
+        )
+        recipient_user_id_to_count = dict.fromkeys(recipient_user_ids, 0)
+        recipient_user_id_to_count.update(rows.tuples().all())
+        return recipient_user_id_to_count
 
     @classmethod
-    async def count_unread_by_recipient_user_id(
+    async def mark_unread_as_read_by_recipient_user_id(
         cls,
         recipient_user_id: int,
-        limit: int,
-    ) -> int:
+        *whereclause: ColumnElement[bool],
+    ) -> Sequence[UUID]:
         stmt = (
-            select(cls.notification_id)
+            update(cls)
             .filter_by(recipient_user_id=recipient_user_id)
-            .filter(cls.read_at.is_(None))
-            .limit(limit)
+            .filter(cls.read_at.is_(None), *whereclause)
+            .values(read_at=datetime_utc_now())
+            .returning(cls.notification_id)
+        )
+        return (await db.session.scalars(stmt)).all()
+
+    @classmethod
+    async def mark_all_as_read_by_recipient_user_id(
+        cls,
+        recipient_user_id: int,
+    ) -> Sequence[UUID]:
+        return await cls.mark_unread_as_read_by_recipient_user_id(recipient_user_id)
+
+    @classmethod
+    async def mark_as_read_until_cursor_by_recipient_user_id(
+        cls,
+        recipient_user_id: int,
+        cursor: NotificationCursorSchema,
+    ) -> Sequence[UUID]:
+        if cursor.notification_id is None:
+            return await cls.mark_unread_as_read_by_recipient_user_id(
+                recipient_user_id,
+                cls.created_at <= cursor.created_at,
+            )
+        return await cls.mark_unread_as_read_by_recipient_user_id(
+            recipient_user_id,
+            tuple_(cls.created_at, cls.notification_id)
+            <= tuple_(cursor.created_at, cursor.notification_id),
+        )
+
+    @classmethod
+    async def mark_as_read_by_ids_and_recipient_user_id(
+        cls,
+        notification_ids: Sequence[UUID],
+        recipient_user_id: int,
+    ) -> Sequence[UUID]:
+        return await cls.mark_unread_as_read_by_recipient_user_id(
+            recipient_user_id,
+            cls.notification_id.in_(notification_ids),
         )
-        return await db.get_count(select(count()).select_from(stmt.subquery()))
 
     @classmethod
     async def find_first_by_ids(
@@ -80,6 +193,3 @@ class RecipientNotification(Base):
             notification_id=notification_id,
             recipient_user_id=recipient_user_id,
         )
-
-    def mark_as_read(self) -> None:
-        self.read_at = datetime_utc_now()
@@ -1,3 +1,4 @@
+from collections.abc import Sequence
 from enum import StrEnum, auto
 from typing import Self
 
@@ -40,6 +41,18 @@ class TelegramConnection(Base):
         )
         return await db.get_first(stmt)
 
+    @classmethod
+    async def find_all_by_user_ids_and_status(
+        cls, user_ids: Sequence[int], allowed_statuses: list[TelegramConnectionStatus]
+    ) -> Sequence[Self]:
+        stmt = (
+            select(cls)
+            .filter(cls.user_id.in_(user_ids))
+            .filter(cls.status.in_(allowed_statuses))
+            .order_by(cls.user_id)
+        )
+        return await db.get_all(stmt)
+
     @classmethod
     async def find_first_by_chat_id_and_status(
         cls, chat_id: int, allowed_statuses: list[TelegramConnectionStatus]
@@ -1,10 +1,13 @@
 from pydantic import BaseModel, ConfigDict
+from starlette import status
 
 from app.common.dependencies.authorization_dep import AuthorizationData
-from app.common.fastapi_ext import APIRouterExt
+from app.common.fastapi_ext import APIRouterExt, Responses
 from app.common.schemas.user_contacts_sch import UserContactKind
+from app.notifications.models.email_connections_db import EmailConnection
 from app.notifications.models.telegram_connections_db import TelegramConnection
 from app.notifications.models.user_contacts_db import UserContact
+from app.notifications.services.email_digests_svc import email_notification_digests
 
 router = APIRouterExt(tags=["notification settings"])
 
@@ -23,6 +26,7 @@ class TelegramNotificationSettingsPreSchema(BaseModel):
 
 class NotificationSettingsPreSchema(BaseModel):
     # TODO email (enabled_categories / _kinds only)
+    email: EmailConnection.DigestSettingsSchema | None
     telegram: TelegramNotificationSettingsPreSchema | None
     # TODO vk
 
@@ -33,6 +37,7 @@ class TelegramNotificationSettingsSchema(BaseModel):
 
 
 class NotificationSettingsSchema(BaseModel):
+    email: EmailConnection.DigestSettingsSchema | None
     telegram: TelegramNotificationSettingsSchema | None
 
 
@@ -44,8 +49,16 @@ class NotificationSettingsSchema(BaseModel):
 async def retrieve_notification_settings(
     auth_data: AuthorizationData,
 ) -> NotificationSettingsPreSchema:
+    email_connection = await EmailConnection.find_first_by_id(auth_data.user_id)
     telegram_connection = await TelegramConnection.find_first_by_id(auth_data.user_id)
     return NotificationSettingsPreSchema(
+        email=(
+            None
+            if email_connection is None
+            else EmailConnection.DigestSettingsSchema.model_validate(
+                email_connection, from_attributes=True
+            )
+        ),
         telegram=(
             None
             if telegram_connection is None
@@ -58,3 +71,33 @@ async def retrieve_notification_settings(
             )
         ),
     )
+
+
+class EmailNotificationSettingsResponses(Responses):
+    EMAIL_CONNECTION_NOT_FOUND = (
+        status.HTTP_404_NOT_FOUND,
+        "Email connection not found",
+    )
+    EMAIL_DIGESTS_NOT_AVAILABLE = (
+        status.HTTP_409_CONFLICT,
+        "Email digests are not available",
+    )
+
+
+@router.patch(
+    path="/users/current/notification-settings/email/",
+    response_model=EmailConnection.DigestSettingsSchema,
+    responses=EmailNotificationSettingsResponses.responses(),
+    summary="Update email notification settings for the current user",
+)
+async def update_email_notification_settings(
+    auth_data: AuthorizationData,
+    data: EmailConnection.DigestSettingsSchema,
+) -> EmailConnection:
+    email_connection = await EmailConnection.find_first_by_id(auth_data.user_id)
+    if email_connection is None:
+        raise EmailNotificationSettingsResponses.EMAIL_CONNECTION_NOT_FOUND
+    if data.digest_window_minutes != 0 and not email_notification_digests.is_available:
+        raise EmailNotificationSettingsResponses.EMAIL_DIGESTS_NOT_AVAILABLE
+    email_connection.update(**data.model_dump())
+    return email_connection
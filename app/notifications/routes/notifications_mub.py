@@ -1,8 +1,21 @@
+from pydantic import BaseModel
 from starlette import status
 
+from app.common.config import settings
 from app.common.config_bdg import notifications_bridge
 from app.common.fastapi_ext import APIRouterExt
+from app.common.faststream_ext import (
+    StreamConsumerLagSchema,
+    retrieve_stream_consumer_lag,
+)
 from app.common.schemas.notifications_sch import NotificationInputSchema
+from app.notifications.routes.notifications_sub import (
+    NOTIFICATION_SERVICE_GROUP_NAME,
+    notifications_consumer_stats,
+)
+from app.notifications.routes.telegram_messages_sub import (
+    telegram_messages_consumer_stats,
+)
 
 router = APIRouterExt(tags=["notifications mub"])
 
@@ -14,3 +27,31 @@ router = APIRouterExt(tags=["notifications mub"])
 )
 async def queue_notification_sending(data: NotificationInputSchema) -> None:
     await notifications_bridge.send_notification(data)
+
+
+class NotificationChannelsLagSchema(BaseModel):
+    # persisting notifications and emitting socket events
+    platform: StreamConsumerLagSchema
+    telegram: StreamConsumerLagSchema
+    # emails are delivered by the pochta service, see its own consumer lag
+
+
+@router.get(
+    path="/notifications/consumer-lag/",
+    summary="Retrieve lag of notification consumers for every delivery channel",
+)
+async def retrieve_notifications_consumer_lag() -> NotificationChannelsLagSchema:
+    return NotificationChannelsLagSchema(
+        platform=await retrieve_stream_consumer_lag(
+            broker=notifications_bridge.broker,
+            stream_name=settings.notifications_send_stream_name,
+            group_name=NOTIFICATION_SERVICE_GROUP_NAME,
+            consumer_stats=notifications_consumer_stats,
+        ),
+        telegram=await retrieve_stream_consumer_lag(
+            broker=notifications_bridge.broker,
+            stream_name=settings.telegram_messages_send_stream_name,
+            group_name=NOTIFICATION_SERVICE_GROUP_NAME,
+            consumer_stats=telegram_messages_consumer_stats,
+        ),
+    )
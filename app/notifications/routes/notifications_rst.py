@@ -1,26 +1,82 @@
 from collections.abc import Sequence
+from functools import partial
 from typing import Annotated
+from uuid import UUID
 
-from fastapi import Query
+from fastapi import Body, Query
 from starlette import status
 
 from app.common.dependencies.authorization_dep import AuthorizationData
+from app.common.dependencies.database_dep import ReplicaDatabase
 from app.common.fastapi_ext import APIRouterExt, Responses
+from app.common.sqlalchemy_ext import db
+from app.communities.rooms import user_room
 from app.notifications.dependencies.recipient_notifications_dep import (
     MyRecipientNotificationByID,
 )
 from app.notifications.models.notifications_db import (
+    NotificationCursorSchema,
     NotificationSearchRequestSchema,
 )
 from app.notifications.models.recipient_notifications_db import RecipientNotification
+from app.notifications.routes.notifications_sio import (
+    UnreadNotificationsCountEmitter,
+    UnreadNotificationsCountSchema,
+)
+from app.notifications.services.unread_counters_svc import (
+    unread_notifications_counters,
+)
 
 router = APIRouterExt(tags=["notifications"])
 
 
+async def emit_unread_notifications_count_decrement(
+    emitter: UnreadNotificationsCountEmitter,
+    recipient_user_id: int,
+    read_count: int,
+) -> None:
+    unread_count = await unread_notifications_counters.decrement(
+        recipient_user_id, amount=read_count
+    )
+    await emitter.emit(
+        UnreadNotificationsCountSchema(unread_notifications_count=unread_count),
+        target=user_room(recipient_user_id),
+    )
+
+
+async def emit_unread_notifications_count_reset(
+    emitter: UnreadNotificationsCountEmitter,
+    recipient_user_id: int,
+) -> None:
+    await unread_notifications_counters.reset(recipient_user_id)
+    await emitter.emit(
+        UnreadNotificationsCountSchema(unread_notifications_count=0),
+        target=user_room(recipient_user_id),
+    )
+
+
+def decrement_unread_notifications_count_after_commit(
+    emitter: UnreadNotificationsCountEmitter,
+    recipient_user_id: int,
+    read_count: int,
+) -> None:
+    # counters & socket events can't be rolled back, so they wait for the commit
+    if read_count != 0:
+        db.after_commit(
+            partial(
+                emit_unread_notifications_count_decrement,
+                emitter=emitter,
+                recipient_user_id=recipient_user_id,
+                read_count=read_count,
+            )
+        )
+
+
 @router.post(
     path="/users/current/notifications/searches/",
     response_model=list[RecipientNotification.ResponseSchema],
     summary="List paginated notifications for the current user",
+    dependencies=[ReplicaDatabase],
 )
 async def list_notifications(
     auth_data: AuthorizationData,
@@ -40,9 +96,75 @@ async def count_unread_notifications(
     auth_data: AuthorizationData,
     limit: Annotated[int, Query(gt=0, le=100)] = 100,
 ) -> int:
-    return await RecipientNotification.count_unread_by_recipient_user_id(
+    return min(await unread_notifications_counters.get(auth_data.user_id), limit)
+
+
+@router.post(
+    path="/users/current/notifications/read/",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Mark all notifications as read by the current user",
+)
+async def mark_all_notifications_as_read(
+    auth_data: AuthorizationData,
+    emitter: UnreadNotificationsCountEmitter,
+) -> None:
+    await RecipientNotification.mark_all_as_read_by_recipient_user_id(
+        recipient_user_id=auth_data.user_id
+    )
+    db.after_commit(
+        partial(
+            emit_unread_notifications_count_reset,
+            emitter=emitter,
+            recipient_user_id=auth_data.user_id,
+        )
+    )
+
+
+@router.post(
+    path="/users/current/notifications/read-until/",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Mark notifications up to a cursor as read by the current user",
+)
+async def mark_notifications_as_read_until_cursor(
+    auth_data: AuthorizationData,
+    emitter: UnreadNotificationsCountEmitter,
+    cursor: NotificationCursorSchema,
+) -> None:
+    notification_ids = (
+        await RecipientNotification.mark_as_read_until_cursor_by_recipient_user_id(
+            recipient_user_id=auth_data.user_id,
+            cursor=cursor,
+        )
+    )
+    decrement_unread_notifications_count_after_commit(
+        emitter=emitter,
+        recipient_user_id=auth_data.user_id,
+        read_count=len(notification_ids),
+    )
+
+
+@router.post(
+    path="/users/current/notifications/read-many/",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Mark notifications by ids as read by the current user",
+)
+async def mark_notifications_as_read_by_ids(
+    auth_data: AuthorizationData,
+    emitter: UnreadNotificationsCountEmitter,
+    notification_ids: Annotated[
+        list[UUID], Body(embed=True, min_length=1, max_length=100)
+    ],
+) -> None:
+    read_notification_ids = (
+        await RecipientNotification.mark_as_read_by_ids_and_recipient_user_id(
+            notification_ids=notification_ids,
+            recipient_user_id=auth_data.user_id,
+        )
+    )
+    decrement_unread_notifications_count_after_commit(
+        emitter=emitter,
         recipient_user_id=auth_data.user_id,
-        limit=limit,
+        read_count=len(read_notification_ids),
     )
 
 
@@ -61,7 +183,20 @@ class NotificationReadResponses(Responses):
 )
 async def mark_notification_as_read(
     recipient_notification: MyRecipientNotificationByID,
+    emitter: UnreadNotificationsCountEmitter,
 ) -> None:
-    if recipient_notification.read_at is not None:
+    # conditional update, so that concurrent requests can't both decrement
+    read_notification_ids = (
+        await RecipientNotification.mark_as_read_by_ids_and_recipient_user_id(
+            notification_ids=[recipient_notification.notification_id],
+            recipient_user_id=recipient_notification.recipient_user_id,
+        )
+    )
+    if len(read_notification_ids) == 0:
         raise NotificationReadResponses.NOTIFICATION_ALREADY_MARKED_AS_READ
-    recipient_notification.mark_as_read()
+
+    decrement_unread_notifications_count_after_commit(
+        emitter=emitter,
+        recipient_user_id=recipient_notification.recipient_user_id,
+        read_count=1,
+    )
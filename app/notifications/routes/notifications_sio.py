@@ -1,16 +1,37 @@
 from typing import Annotated
 
+from pydantic import BaseModel
 from tmexio import Emitter
 
 from app.common.config import tmex
 from app.notifications.models.notifications_db import Notification
 
+
+class NewNotificationSchema(Notification.ResponseSchema):
+    unread_notifications_count: int
+
+
 NewNotificationEmitter = Annotated[
-    Emitter[Notification],
+    Emitter[NewNotificationSchema],
     tmex.register_server_emitter_fastapi_depends(
-        body_annotation=Notification.ResponseSchema,
+        body_annotation=NewNotificationSchema,
         event_name="new-notification",
         summary="A new notification has been sent to the current user",
         tags=["notifications"],
     ),
 ]
+
+
+class UnreadNotificationsCountSchema(BaseModel):
+    unread_notifications_count: int
+
+
+UnreadNotificationsCountEmitter = Annotated[
+    Emitter[UnreadNotificationsCountSchema],
+    tmex.register_server_emitter_fastapi_depends(
+        body_annotation=UnreadNotificationsCountSchema,
+        event_name="unread-notifications-count-changed",
+        summary="Notifications of the current user have been marked as read",
+        tags=["notifications"],
+    ),
+]
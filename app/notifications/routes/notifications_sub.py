@@ -1,55 +1,107 @@
-import asyncio
+import logging
+from collections.abc import Sequence
+from functools import partial
+from time import perf_counter
+from typing import Any
 
 from faststream.redis import RedisRouter
 
 from app.common.config import settings
-from app.common.faststream_ext import build_stream_sub
+from app.common.faststream_ext import StreamConsumerStats, build_stream_sub
 from app.common.schemas.notifications_sch import NotificationInputSchema
+from app.common.sqlalchemy_ext import db
 from app.notifications.models.notifications_db import Notification
 from app.notifications.models.recipient_notifications_db import RecipientNotification
 from app.notifications.routes.notifications_sio import NewNotificationEmitter
+from app.notifications.services import audiences_svc
 from app.notifications.services.senders import (
+    base_notification_sender,
     email_notification_sender,
     platform_notification_sender,
     telegram_notification_sender,
 )
 
+NOTIFICATION_SERVICE_GROUP_NAME = "notification-service"
+
 router = RedisRouter()
 
+notifications_consumer_stats = StreamConsumerStats()
+
+
+async def send_platform_notifications(
+    sender: platform_notification_sender.PlatformNotificationSender,
+    recipient_user_ids: Sequence[int],
+) -> None:
+    try:
+        await sender.send(recipient_user_ids)
+    except Exception:  # noqa: PIE786  # retrying would duplicate the notification
+        # counters expire and are recounted, clients refetch notifications
+        logging.exception(
+            "Sending platform notifications failed",
+            extra={"notification_id": sender.notification.id},
+        )
+
 
 @router.subscriber(  # type: ignore[misc]  # bad typing in faststream
     stream=build_stream_sub(
         stream_name=settings.notifications_send_stream_name,
-        service_name="notification-service",
+        service_name=NOTIFICATION_SERVICE_GROUP_NAME,
     ),
-    # TODO handle exceptions (retry?)
+    # messages are handled concurrently, each with its own session
+    max_workers=settings.notifications_send_max_workers,
 )
 async def send_notification(
     emitter: NewNotificationEmitter,
     data: NotificationInputSchema,
 ) -> None:
-    recipient_user_ids = list(set(data.recipient_user_ids))
+    started_at = perf_counter()
+    recipient_user_ids = await audiences_svc.resolve_recipient_user_ids(
+        recipient_user_ids=data.recipient_user_ids,
+        audience=data.recipient_audience,
+    )
+    if len(recipient_user_ids) == 0:
+        return
 
     notification = await Notification.create(payload=data.payload)
 
-    await RecipientNotification.create_batch(
+    await RecipientNotification.create_many(
         {
             "notification_id": notification.id,
             "recipient_user_id": recipient_user_id,
+            "created_at": notification.created_at,
+            "kind": notification.payload.kind,
         }
         for recipient_user_id in recipient_user_ids
     )
 
-    await asyncio.gather(
-        *platform_notification_sender.PlatformNotificationSender(
+    senders: list[base_notification_sender.BaseNotificationSender[Any]] = [
+        email_notification_sender.EmailNotificationSender(notification=notification),
+        telegram_notification_sender.TelegramNotificationSender(
             notification=notification,
-            emitter=emitter,
-        ).generate_tasks(recipient_user_ids=recipient_user_ids),
-        *email_notification_sender.EmailNotificationSender(
-            notification=notification
-        ).generate_tasks(recipient_user_ids=recipient_user_ids),
-        *telegram_notification_sender.TelegramNotificationSender(
-            notification=notification,
-        ).generate_tasks(recipient_user_ids=recipient_user_ids),
-        # TODO handle partial failure with `return_exceptions=True`
+        ),
+    ]
+
+    # resolution shares the session, so senders can't run it concurrently.
+    # Other channels only queue messages into their own streams (published
+    # after commit), so their delivery never holds this consumer
+    for sender in senders:
+        await sender.send(recipient_user_ids)
+
+    # unread counters & socket events can't be rolled back, so they are
+    # only updated once the notification is committed and never on retries
+    db.after_commit(
+        partial(
+            send_platform_notifications,
+            platform_notification_sender.PlatformNotificationSender(
+                notification=notification,
+                emitter=emitter,
+            ),
+            recipient_user_ids,
+        )
+    )
+
+    notifications_consumer_stats.record_batch(
+        size=1,
+        oldest_created_at=None,
+        duration=perf_counter() - started_at,
     )
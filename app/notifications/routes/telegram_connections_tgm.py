@@ -16,7 +16,7 @@ from app.notifications.models.telegram_connections_db import (
     TelegramConnection,
     TelegramConnectionStatus,
 )
-from app.notifications.services import user_contacts_svc
+from app.notifications.services import telegram_connections_svc, user_contacts_svc
 from app.notifications.utils.deep_links import DeepLinkException
 
 router = Router(name="telegram connections")
@@ -94,10 +94,7 @@ async def block_telegram_connection(
     _event: ChatMemberUpdatedExt,
     telegram_connection: TelegramConnection,
 ) -> None:
-    telegram_connection.status = TelegramConnectionStatus.BLOCKED
-    await user_contacts_svc.remove_personal_telegram_contact(
-        user_id=telegram_connection.user_id
-    )
+    await telegram_connections_svc.block_telegram_connection(telegram_connection)
     # TODO notify user on-platform about the blocked connection
 
 
@@ -0,0 +1,54 @@
+from time import perf_counter
+
+from faststream.redis import RedisRouter
+
+from app.common.config import settings
+from app.common.faststream_ext import StreamConsumerStats, build_stream_sub
+from app.common.schemas.notifications_sch import TelegramMessageInputSchema
+from app.notifications.models.telegram_connections_db import (
+    TelegramConnection,
+    TelegramConnectionStatus,
+)
+from app.notifications.routes.notifications_sub import (
+    NOTIFICATION_SERVICE_GROUP_NAME,
+)
+from app.notifications.services import telegram_connections_svc
+from app.notifications.services.telegram_delivery_svc import (
+    TelegramDeliveryResult,
+    telegram_delivery_scheduler,
+)
+
+router = RedisRouter()
+
+telegram_messages_consumer_stats = StreamConsumerStats()
+
+
+@router.subscriber(  # type: ignore[misc]  # bad typing in faststream
+    stream=build_stream_sub(
+        stream_name=settings.telegram_messages_send_stream_name,
+        service_name=NOTIFICATION_SERVICE_GROUP_NAME,
+        batch=settings.telegram_messages_send_batch,
+    ),
+)
+async def send_telegram_messages(data: list[TelegramMessageInputSchema]) -> None:
+    started_at = perf_counter()
+    delivery_results = await telegram_delivery_scheduler.deliver_many(data)
+    telegram_messages_consumer_stats.record_batch(
+        size=len(data),
+        oldest_created_at=None,
+        duration=perf_counter() - started_at,
+    )
+
+    blocked_user_ids = [
+        message.user_id
+        for message, delivery_result in zip(data, delivery_results, strict=True)
+        if delivery_result is TelegramDeliveryResult.BLOCKED
+    ]
+    if len(blocked_user_ids) == 0:
+        return
+
+    for telegram_connection in await TelegramConnection.find_all_by_user_ids_and_status(
+        user_ids=blocked_user_ids,
+        allowed_statuses=[TelegramConnectionStatus.ACTIVE],
+    ):
+        await telegram_connections_svc.block_telegram_connection(telegram_connection)
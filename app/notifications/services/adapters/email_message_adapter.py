@@ -5,7 +5,7 @@ from app.common.schemas.notifications_sch import (
     RecipientInvoiceNotificationPayloadSchema,
 )
 from app.common.schemas.pochta_sch import (
-    AnyEmailMessagePayload,
+    AnyNotificationEmailMessagePayload,
     ClassroomNotificationEmailMessagePayloadSchema,
     EmailMessageKind,
     RecipientInvoiceNotificationEmailMessagePayloadSchema,
@@ -14,7 +14,7 @@ from app.notifications.services.adapters.base_adapter import BaseNotificationAda
 
 
 class NotificationToEmailMessageAdapter(
-    BaseNotificationAdapter[AnyEmailMessagePayload]
+    BaseNotificationAdapter[AnyNotificationEmailMessagePayload]
 ):
     def adapt_individual_invitation_accepted_v1(
         self,
@@ -0,0 +1,35 @@
+from collections.abc import Sequence
+from typing import assert_never
+
+from app.common.config_bdg import classrooms_bridge, communities_bridge
+from app.common.schemas.notifications_sch import (
+    AnyNotificationAudienceSchema,
+    ClassroomStudentsAudienceSchema,
+    CommunityParticipantsAudienceSchema,
+)
+
+
+async def resolve_audience_user_ids(
+    audience: AnyNotificationAudienceSchema,
+) -> Sequence[int]:
+    match audience:
+        case ClassroomStudentsAudienceSchema():
+            return await classrooms_bridge.list_classroom_student_ids(
+                classroom_id=audience.classroom_id
+            )
+        case CommunityParticipantsAudienceSchema():
+            return await communities_bridge.list_community_participant_user_ids(
+                community_id=audience.community_id
+            )
+        case _:
+            assert_never(audience)
+
+
+async def resolve_recipient_user_ids(
+    recipient_user_ids: Sequence[int],
+    audience: AnyNotificationAudienceSchema | None,
+) -> list[int]:
+    if audience is None:
+        return sorted(set(recipient_user_ids))
+    audience_user_ids = await resolve_audience_user_ids(audience)
+    return sorted({*recipient_user_ids, *audience_user_ids})
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from collections.abc import Sequence
+from time import time
+
+from pydantic import TypeAdapter
+from redis.asyncio import Redis
+
+from app.common.config import redis_cache, settings
+from app.common.config_bdg import pochta_bridge
+from app.common.schemas.pochta_sch import (
+    AnyEmailMessagePayload,
+    AnyNotificationEmailMessagePayload,
+    EmailMessageInputSchema,
+    EmailMessageKind,
+    NotificationsDigestEmailMessagePayloadSchema,
+)
+from app.notifications.models.email_connections_db import EmailConnection
+
+notification_email_message_payload_adapter: TypeAdapter[
+    AnyNotificationEmailMessagePayload
+] = TypeAdapter(AnyNotificationEmailMessagePayload)
+
+
+class EmailNotificationDigests:
+    """
+    Buffers email notifications of users with a digest window in an optional
+    redis. A buffer is scheduled to be flushed when its first notification
+    arrives, then everything collected by that time is sent as one digest
+    (or as a regular message, if there was only one). Notifications are only
+    removed from the buffer after the digest is published, while a lease
+    keeps other instances from flushing it concurrently. Without redis or
+    a digest template, notifications are always sent right away
+    """
+
+    due_key = "notifications:email-digests:due"
+
+    def __init__(
+        self,
+        redis: Redis | None,
+        template_id: str,
+        max_size: int,
+        poll_interval: float,
+        flush_lease: int,
+    ) -> None:
+        self.redis = redis
+        self.template_id = template_id
+        self.max_size = max_size
+        self.poll_interval = poll_interval
+        self.flush_lease = flush_lease
+
+    @property
+    def is_available(self) -> bool:
+        # digests have to be buffered in redis and rendered with their template
+        return self.redis is not None and self.template_id != ""
+
+    @staticmethod
+    def build_key(email: str) -> str:
+        return f"notifications:email-digests:{email}"
+
+    @staticmethod
+    def build_lease_key(email: str) -> str:
+        return f"notifications:email-digests:flushing:{email}"
+
+    async def add_many(
+        self,
+        payload: AnyNotificationEmailMessagePayload,
+        email_connections: Sequence[EmailConnection],
+    ) -> None:
+        if self.redis is None:
+            raise RuntimeError("Email digests are not available without redis")
+
+        raw_payload = payload.model_dump_json()
+        added_at = time()
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for email_connection in email_connections:
+                pipeline.rpush(self.build_key(email_connection.email), raw_payload)
+                # the window starts with the first notification in the buffer
+                pipeline.zadd(
+                    self.due_key,
+                    {
+                        email_connection.email: (
+                            added_at + email_connection.digest_window_minutes * 60
+                        )
+                    },
+                    nx=True,
+                )
+            await pipeline.execute()
+
+    def build_email_message(
+        self, email: str, payloads: list[AnyNotificationEmailMessagePayload]
+    ) -> EmailMessageInputSchema:
+        digest_payload: AnyEmailMessagePayload = (
+            payloads[0]
+            if len(payloads) == 1
+            else NotificationsDigestEmailMessagePayloadSchema(
+                kind=EmailMessageKind.NOTIFICATIONS_DIGEST_V1,
+                notifications=payloads,
+            )
+        )
+        return EmailMessageInputSchema(
+            payload=digest_payload,
+            recipient_emails=[email],
+        )
+
+    async def claim_payloads(
+        self, redis: Redis, email: str
+    ) -> list[AnyNotificationEmailMessagePayload] | None:
+        # only one instance gets the lease, the buffer is left untouched
+        if not await redis.set(
+            self.build_lease_key(email), 1, nx=True, ex=self.flush_lease
+        ):
+            return None
+        raw_payloads: list[bytes] = await redis.lrange(
+            self.build_key(email), 0, self.max_size - 1
+        )
+        return [
+            notification_email_message_payload_adapter.validate_json(raw_payload)
+            for raw_payload in raw_payloads
+        ]
+
+    async def complete_flush(self, redis: Redis, email: str, size: int) -> None:
+        key = self.build_key(email)
+        await redis.zrem(self.due_key, email)
+        # new notifications are only pushed to the tail, so the head was sent
+        await redis.ltrim(key, size, -1)
+        if await redis.llen(key) != 0:
+            # the digest was full, the rest goes out in the next one right away
+            await redis.zadd(self.due_key, {email: time()}, nx=True)
+        await redis.delete(self.build_lease_key(email))
+
+    async def flush_due(self) -> int:
+        if self.redis is None:
+            return 0
+
+        email_to_payloads: dict[str, list[AnyNotificationEmailMessagePayload]] = {}
+        for raw_email in await self.redis.zrangebyscore(self.due_key, "-inf", time()):
+            email = raw_email.decode()
+            payloads = await self.claim_payloads(redis=self.redis, email=email)
+            if payloads is not None:
+                email_to_payloads[email] = payloads
+
+        email_messages = [
+            self.build_email_message(email=email, payloads=payloads)
+            for email, payloads in email_to_payloads.items()
+            if len(payloads) != 0
+        ]
+        try:
+            if len(email_messages) != 0:
+                await pochta_bridge.send_email_messages(email_messages)
+        except Exception:  # noqa: PIE786  # re-raised
+            # buffers are kept as is & flushed again on the next poll
+            await self.redis.delete(*map(self.build_lease_key, email_to_payloads))
+            raise
+
+        for email, payloads in email_to_payloads.items():
+            await self.complete_flush(redis=self.redis, email=email, size=len(payloads))
+        return len(email_messages)
+
+    async def run(self) -> None:
+        while True:  # noqa: WPS457  # cancelled on shutdown
+            try:
+                await self.flush_due()
+            except Exception:  # noqa: PIE786  # the job has to keep going
+                logging.exception("Flushing email notification digests failed")
+            await asyncio.sleep(self.poll_interval)
+
+
+email_notification_digests = EmailNotificationDigests(
+    redis=redis_cache,
+    template_id=settings.email_digests.template_id,
+    max_size=settings.email_digests.max_size,
+    poll_interval=settings.email_digests.poll_interval,
+    flush_lease=settings.email_digests.flush_lease,
+)
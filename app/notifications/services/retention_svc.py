@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from app.common.config import sessionmaker, settings
+from app.common.utils.datetime import datetime_utc_now
+from app.notifications.models.notifications_db import Notification
+
+
+class NotificationsRetention:
+    """
+    Periodically deletes notifications older than ``horizon``, together with
+    their recipient notifications (by the cascade). Each batch is deleted in
+    a separate short transaction, rows are locked with SKIP LOCKED, so jobs
+    on different instances don't collide. Unread counters of affected users
+    are left to be reconciled on expiry
+    """
+
+    def __init__(self, horizon: timedelta, batch_size: int, interval: float) -> None:
+        self.horizon = horizon
+        self.batch_size = batch_size
+        self.interval = interval
+
+    async def purge_batch(self, created_before: datetime) -> int:
+        async with sessionmaker.begin() as session:
+            notification_ids = (
+                await session.scalars(
+                    delete(Notification)
+                    .filter(
+                        Notification.id.in_(
+                            select(Notification.id)
+                            .filter(Notification.created_at < created_before)
+                            .order_by(Notification.created_at)
+                            .limit(self.batch_size)
+                            .with_for_update(skip_locked=True)
+                            .scalar_subquery()
+                        )
+                    )
+                    .returning(Notification.id)
+                    .execution_options(synchronize_session=False)
+                )
+            ).all()
+        return len(notification_ids)
+
+    async def purge(self) -> int:
+        created_before = datetime_utc_now() - self.horizon
+        purged_count = 0
+        while True:  # noqa: WPS457  # until a partial batch
+            batch_count = await self.purge_batch(created_before)
+            purged_count += batch_count
+            if batch_count < self.batch_size:
+                return purged_count
+
+    async def run(self) -> None:
+        while True:  # noqa: WPS457  # cancelled on shutdown
+            try:
+                await self.purge()
+            except Exception:  # noqa: PIE786  # the job has to keep going
+                logging.exception("Notifications retention failed")
+            await asyncio.sleep(self.interval)
+
+
+notifications_retention = NotificationsRetention(
+    horizon=timedelta(days=settings.notifications_retention.horizon_days),
+    batch_size=settings.notifications_retention.batch_size,
+    interval=settings.notifications_retention.interval,
+)
@@ -1,22 +1,28 @@
 from abc import ABC, abstractmethod
-from collections.abc import Awaitable, Iterator
+from collections.abc import Sequence
 
 from app.notifications.models.notifications_db import Notification
 
 
-class BaseNotificationSender(ABC):
+class BaseNotificationSender[Recipient](ABC):
     def __init__(self, notification: Notification) -> None:
         self.notification = notification
 
     @abstractmethod
-    async def send_notification(self, recipient_user_id: int) -> None:
+    async def resolve_recipients(
+        self, recipient_user_ids: Sequence[int]
+    ) -> Sequence[Recipient]:
+        """Load everything needed for delivery to all users in one query"""
         raise NotImplementedError
 
-    def generate_tasks(
-        self,
-        recipient_user_ids: list[int],
-    ) -> Iterator[Awaitable[None]]:
-        yield from (
-            self.send_notification(recipient_user_id=recipient_user_id)
-            for recipient_user_id in recipient_user_ids
-        )
+    @abstractmethod
+    async def deliver(self, recipients: Sequence[Recipient]) -> None:
+        """Deliver the notification to all resolved recipients at once"""
+        raise NotImplementedError
+
+    async def send(self, recipient_user_ids: Sequence[int]) -> None:
+        """
+        Recipients are resolved here, using the current session,
+        so senders sharing a session can't be run concurrently
+        """
+        await self.deliver(await self.resolve_recipients(recipient_user_ids))
@@ -1,18 +1,22 @@
 import logging
+from collections.abc import Sequence
+from functools import partial
 
 from app.common.config_bdg import pochta_bridge
 from app.common.schemas.pochta_sch import EmailMessageInputSchema
+from app.common.sqlalchemy_ext import db
 from app.notifications.models.email_connections_db import EmailConnection
 from app.notifications.models.notifications_db import Notification
 from app.notifications.services.adapters.email_message_adapter import (
     NotificationToEmailMessageAdapter,
 )
+from app.notifications.services.email_digests_svc import email_notification_digests
 from app.notifications.services.senders.base_notification_sender import (
     BaseNotificationSender,
 )
 
 
-class EmailNotificationSender(BaseNotificationSender):
+class EmailNotificationSender(BaseNotificationSender[EmailConnection]):
     def __init__(self, notification: Notification) -> None:
         super().__init__(notification=notification)
 
@@ -20,22 +24,67 @@ class EmailNotificationSender(BaseNotificationSender):
             notification=self.notification
         ).adapt()
 
-    async def send_notification(self, recipient_user_id: int) -> None:
-        email_connection = await EmailConnection.find_first_by_id(recipient_user_id)
+    async def resolve_recipients(
+        self, recipient_user_ids: Sequence[int]
+    ) -> Sequence[EmailConnection]:
+        email_connections = await EmailConnection.find_all_by_user_ids(
+            user_ids=recipient_user_ids
+        )
 
-        if email_connection is None:
-            logging.error(
-                f"User {recipient_user_id} has no email connections",
-                extra={
-                    "notification_id": self.notification.id,
-                    "recipient_user_id": recipient_user_id,
-                },
-            )
-            return
+        found_user_ids = {
+            email_connection.user_id for email_connection in email_connections
+        }
+        for recipient_user_id in recipient_user_ids:
+            if recipient_user_id not in found_user_ids:
+                logging.error(
+                    f"User {recipient_user_id} has no email connections",
+                    extra={
+                        "notification_id": self.notification.id,
+                        "recipient_user_id": recipient_user_id,
+                    },
+                )
+
+        return email_connections
+
+    def build_email_message(
+        self, recipient: EmailConnection
+    ) -> EmailMessageInputSchema:
+        return EmailMessageInputSchema(
+            payload=self.email_message_payload,
+            recipient_emails=[recipient.email],
+        )
 
-        await pochta_bridge.send_email_message(
-            EmailMessageInputSchema(
+    async def add_to_digests(self, recipients: Sequence[EmailConnection]) -> None:
+        try:
+            await email_notification_digests.add_many(
                 payload=self.email_message_payload,
-                recipient_emails=[email_connection.email],
+                email_connections=recipients,
             )
+        except Exception:  # noqa: PIE786  # retrying would duplicate the notification
+            logging.exception(
+                "Adding notifications to email digests failed",
+                extra={"notification_id": self.notification.id},
+            )
+
+    async def deliver(self, recipients: Sequence[EmailConnection]) -> None:
+        instant_recipients: list[EmailConnection] = []
+        digest_recipients: list[EmailConnection] = []
+        for recipient in recipients:
+            if (
+                recipient.digest_window_minutes == 0
+                or not email_notification_digests.is_available
+            ):
+                instant_recipients.append(recipient)
+            else:
+                digest_recipients.append(recipient)
+
+        if len(digest_recipients) != 0:
+            # digests can't be rolled back, so the notification is only added
+            # once it's committed and never again when the message is retried
+            db.after_commit(partial(self.add_to_digests, digest_recipients))
+
+        # published together, the pochta service merges messages with the
+        # same payload into one request
+        await pochta_bridge.send_email_messages(
+            [self.build_email_message(recipient) for recipient in instant_recipients]
         )
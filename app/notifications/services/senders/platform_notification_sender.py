@@ -1,20 +1,59 @@
+import asyncio
+from collections.abc import Sequence
+
 from tmexio import Emitter
 
 from app.communities.rooms import user_room
 from app.notifications.models.notifications_db import Notification
+from app.notifications.routes.notifications_sio import NewNotificationSchema
 from app.notifications.services.senders.base_notification_sender import (
     BaseNotificationSender,
 )
+from app.notifications.services.unread_counters_svc import (
+    unread_notifications_counters,
+)
 
 
-class PlatformNotificationSender(BaseNotificationSender):
+class PlatformNotificationSender(BaseNotificationSender[int]):
     def __init__(
         self,
         notification: Notification,
-        emitter: Emitter[Notification],
+        emitter: Emitter[NewNotificationSchema],
     ) -> None:
         super().__init__(notification=notification)
         self.emitter = emitter
 
-    async def send_notification(self, recipient_user_id: int) -> None:
-        await self.emitter.emit(self.notification, target=user_room(recipient_user_id))
+        self.new_notification = NewNotificationSchema.model_validate(
+            {
+                **Notification.ResponseSchema.model_validate(
+                    notification, from_attributes=True
+                ).model_dump(),
+                "unread_notifications_count": 0,
+            }
+        )
+
+    async def resolve_recipients(
+        self, recipient_user_ids: Sequence[int]
+    ) -> Sequence[int]:
+        return recipient_user_ids
+
+    async def deliver(self, recipients: Sequence[int]) -> None:
+        recipient_user_id_to_unread_count = (
+            await unread_notifications_counters.increment_many(recipients)
+        )
+        # TODO handle partial failure with `return_exceptions=True`
+        await asyncio.gather(
+            *(
+                self.emitter.emit(
+                    self.new_notification.model_copy(
+                        update={
+                            "unread_notifications_count": (
+                                recipient_user_id_to_unread_count[recipient]
+                            )
+                        }
+                    ),
+                    target=user_room(recipient),
+                )
+                for recipient in recipients
+            )
+        )
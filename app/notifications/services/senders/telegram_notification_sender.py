@@ -1,6 +1,7 @@
-from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from collections.abc import Sequence
 
-from app.notifications.config import telegram_app
+from app.common.config_bdg import notifications_bridge
+from app.common.schemas.notifications_sch import TelegramMessageInputSchema
 from app.notifications.models.notifications_db import Notification
 from app.notifications.models.telegram_connections_db import (
     TelegramConnection,
@@ -14,7 +15,7 @@ from app.notifications.services.senders.base_notification_sender import (
 )
 
 
-class TelegramNotificationSender(BaseNotificationSender):
+class TelegramNotificationSender(BaseNotificationSender[TelegramConnection]):
     def __init__(self, notification: Notification) -> None:
         super().__init__(notification=notification)
 
@@ -22,25 +23,26 @@ class TelegramNotificationSender(BaseNotificationSender):
             notification=self.notification
         ).adapt()
 
-    async def send_notification(self, recipient_user_id: int) -> None:
-        telegram_connection = await TelegramConnection.find_first_by_user_id_and_status(
-            user_id=recipient_user_id,
+    async def resolve_recipients(
+        self, recipient_user_ids: Sequence[int]
+    ) -> Sequence[TelegramConnection]:
+        return await TelegramConnection.find_all_by_user_ids_and_status(
+            user_ids=recipient_user_ids,
             allowed_statuses=[TelegramConnectionStatus.ACTIVE],
         )
-        if telegram_connection is None:
-            return
 
-        await telegram_app.bot.send_message(
-            chat_id=telegram_connection.chat_id,
-            text=self.telegram_message_payload.message_text,
-            reply_markup=InlineKeyboardMarkup(
-                inline_keyboard=[
-                    [
-                        InlineKeyboardButton(
-                            text=self.telegram_message_payload.button_text,
-                            url=self.telegram_message_payload.button_link,
-                        )
-                    ]
-                ]
-            ),
+    def build_telegram_message(
+        self, recipient: TelegramConnection
+    ) -> TelegramMessageInputSchema:
+        return TelegramMessageInputSchema(
+            user_id=recipient.user_id,
+            chat_id=recipient.chat_id,
+            **self.telegram_message_payload.model_dump(),
+        )
+
+    async def deliver(self, recipients: Sequence[TelegramConnection]) -> None:
+        # messages are only queued here, rate limits & retries are handled
+        # by the telegram messages consumer
+        await notifications_bridge.send_telegram_messages(
+            [self.build_telegram_message(recipient) for recipient in recipients]
         )
@@ -3,6 +3,7 @@ from app.notifications.models.telegram_connections_db import (
     TelegramConnection,
     TelegramConnectionStatus,
 )
+from app.notifications.services import user_contacts_svc
 
 
 async def retrieve_telegram_username_by_user_id(user_id: int) -> str | None:
@@ -17,3 +18,10 @@ async def retrieve_telegram_username_by_user_id(user_id: int) -> str | None:
         user_id=telegram_connection.chat_id,  # matches for private chats
     )
     return chat_member.user.username
+
+
+async def block_telegram_connection(telegram_connection: TelegramConnection) -> None:
+    telegram_connection.status = TelegramConnectionStatus.BLOCKED
+    await user_contacts_svc.remove_personal_telegram_contact(
+        user_id=telegram_connection.user_id
+    )
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+from collections.abc import Sequence
+from enum import StrEnum, auto
+from time import monotonic
+
+from aiogram.exceptions import (
+    TelegramForbiddenError,
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+
+from app.common.config import settings
+from app.common.schemas.notifications_sch import TelegramMessageInputSchema
+from app.notifications.config import telegram_app
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average with bursts up to
+    `capacity`. Waiters are served in order, one at a time
+    """
+
+    def __init__(self, rate: float, capacity: float = 1) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = monotonic()
+        self.paused_until: float = 0
+        self.lock = asyncio.Lock()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, monotonic() + seconds)
+
+    @property
+    def is_idle(self) -> bool:
+        self.refill(monotonic())
+        return not self.lock.locked() and self.tokens >= self.capacity
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:  # noqa: WPS457  # sleeps until a token is available
+                now = monotonic()
+                self.refill(now)
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+                if delay <= 0:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep(delay)
+
+
+class TelegramDeliveryResult(StrEnum):
+    DELIVERED = auto()
+    BLOCKED = auto()
+    FAILED = auto()
+
+
+async def send_telegram_message(message: TelegramMessageInputSchema) -> None:
+    await telegram_app.bot.send_message(
+        chat_id=message.chat_id,
+        text=message.message_text,
+        reply_markup=InlineKeyboardMarkup(
+            inline_keyboard=[
+                [
+                    InlineKeyboardButton(
+                        text=message.button_text,
+                        url=message.button_link,
+                    )
+                ]
+            ]
+        ),
+    )
+
+
+class TelegramDeliveryScheduler:
+    """
+    Sends messages while keeping under the global and per-chat limits of
+    the Bot API. Flood control (retry_after) pauses all sending, failures
+    are retried per message, so one recipient can't fail the whole batch
+    """
+
+    def __init__(
+        self,
+        global_rate: float,
+        chat_rate: float,
+        max_concurrency: int,
+        max_attempts: int,
+        retry_delay: float,
+    ) -> None:
+        self.global_bucket = TokenBucket(rate=global_rate)
+        self.chat_rate = chat_rate
+        self.chat_buckets: dict[int, TokenBucket] = {}
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def get_chat_bucket(self, chat_id: int) -> TokenBucket:
+        chat_bucket = self.chat_buckets.get(chat_id)
+        if chat_bucket is None:
+            chat_bucket = TokenBucket(rate=self.chat_rate)
+            self.chat_buckets[chat_id] = chat_bucket
+        return chat_bucket
+
+    def prune_idle_chat_buckets(self) -> None:
+        self.chat_buckets = {
+            chat_id: chat_bucket
+            for chat_id, chat_bucket in self.chat_buckets.items()
+            if not chat_bucket.is_idle
+        }
+
+    async def send_once(self, message: TelegramMessageInputSchema) -> None:
+        await self.get_chat_bucket(message.chat_id).acquire()
+        await self.global_bucket.acquire()
+        async with self.semaphore:
+            await send_telegram_message(message)
+
+    async def deliver(
+        self, message: TelegramMessageInputSchema
+    ) -> TelegramDeliveryResult:
+        for attempt in range(self.max_attempts):
+            try:
+                await self.send_once(message)
+            except TelegramRetryAfter as e:
+                # flood control is applied to the bot as a whole
+                self.global_bucket.pause(e.retry_after)
+            except TelegramForbiddenError:
+                return TelegramDeliveryResult.BLOCKED
+            except (TelegramNetworkError, TelegramServerError):
+                await asyncio.sleep(self.retry_delay * 2**attempt)
+            except Exception:  # noqa: PIE786  # other recipients are unaffected
+                logging.exception(
+                    "Telegram message delivery failed",
+                    extra={"user_id": message.user_id, "chat_id": message.chat_id},
+                )
+                return TelegramDeliveryResult.FAILED
+            else:
+                return TelegramDeliveryResult.DELIVERED
+
+        logging.error(
+            f"Telegram message delivery failed after {self.max_attempts} attempts",
+            extra={"user_id": message.user_id, "chat_id": message.chat_id},
+        )
+        return TelegramDeliveryResult.FAILED
+
+    async def deliver_many(
+        self, messages: Sequence[TelegramMessageInputSchema]
+    ) -> list[TelegramDeliveryResult]:
+        self.prune_idle_chat_buckets()
+        return await asyncio.gather(*(self.deliver(message) for message in messages))
+
+
+telegram_delivery_scheduler = TelegramDeliveryScheduler(
+    global_rate=settings.telegram_delivery.global_rate,
+    chat_rate=settings.telegram_delivery.chat_rate,
+    max_concurrency=settings.telegram_delivery.max_concurrency,
+    max_attempts=settings.telegram_delivery.max_attempts,
+    retry_delay=settings.telegram_delivery.retry_delay,
+)
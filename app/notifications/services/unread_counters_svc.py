@@ -0,0 +1,87 @@
+from collections.abc import Sequence
+
+from redis.asyncio import Redis
+
+from app.common.config import redis_cache, settings
+from app.notifications.models.recipient_notifications_db import RecipientNotification
+
+
+class UnreadNotificationsCounters:
+    """
+    Per-user counts of unread notifications, updated incrementally in an
+    optional redis. Missing counters are recounted from the database and
+    all counters expire after ``ttl``, so drift (from rolled back transactions
+    or lost updates) is reconciled periodically. Without redis, every read
+    is served by the database
+    """
+
+    def __init__(self, redis: Redis | None, ttl: int) -> None:
+        self.redis = redis
+        self.ttl = ttl
+
+    @staticmethod
+    def build_key(user_id: int) -> str:
+        return f"notifications:unread-counts:{user_id}"
+
+    async def recount_many(self, user_ids: Sequence[int]) -> dict[int, int]:
+        user_id_to_count = (
+            await RecipientNotification.count_unread_by_recipient_user_ids(
+                recipient_user_ids=user_ids
+            )
+        )
+
+        if self.redis is not None and len(user_id_to_count) != 0:
+            async with self.redis.pipeline(transaction=False) as pipeline:
+                for user_id, unread_count in user_id_to_count.items():
+                    pipeline.set(self.build_key(user_id), unread_count, ex=self.ttl)
+                await pipeline.execute()
+
+        return user_id_to_count
+
+    async def get(self, user_id: int) -> int:
+        if self.redis is not None:
+            raw_count = await self.redis.get(self.build_key(user_id))
+            if raw_count is not None:
+                return max(int(raw_count), 0)
+        return (await self.recount_many([user_id]))[user_id]
+
+    async def increment_many(
+        self, user_ids: Sequence[int], amount: int = 1
+    ) -> dict[int, int]:
+        if self.redis is None:
+            return await self.recount_many(user_ids)
+
+        async with self.redis.pipeline(transaction=False) as pipeline:
+            for user_id in user_ids:
+                pipeline.incrby(self.build_key(user_id), amount)
+                pipeline.ttl(self.build_key(user_id))
+            results: list[int] = await pipeline.execute()
+
+        user_id_to_count: dict[int, int] = {}
+        stale_user_ids: list[int] = []
+        for user_id, unread_count, ttl in zip(
+            user_ids, results[::2], results[1::2], strict=True
+        ):
+            # counters are always set with an expiry, so a key without one
+            # was missing and has just been created by the increment itself
+            if ttl < 0 or unread_count < 0:
+                stale_user_ids.append(user_id)
+            else:
+                user_id_to_count[user_id] = unread_count
+
+        if len(stale_user_ids) != 0:
+            user_id_to_count.update(await self.recount_many(stale_user_ids))
+        return user_id_to_count
+
+    async def decrement(self, user_id: int, amount: int = 1) -> int:
+        return (await self.increment_many([user_id], amount=-amount))[user_id]
+
+    async def reset(self, user_id: int) -> None:
+        if self.redis is not None:
+            await self.redis.set(self.build_key(user_id), 0, ex=self.ttl)
+
+
+unread_notifications_counters = UnreadNotificationsCounters(
+    redis=redis_cache,
+    ttl=settings.unread_notifications_counters_ttl,
+)
@@ -1,8 +1,17 @@
 from starlette import status
 
+from app.common.config import settings
 from app.common.config_bdg import pochta_bridge
 from app.common.fastapi_ext import APIRouterExt
+from app.common.faststream_ext import (
+    StreamConsumerLagSchema,
+    retrieve_stream_consumer_lag,
+)
 from app.common.schemas.pochta_sch import EmailMessageInputSchema
+from app.pochta.routes.email_messages_sub import (
+    POCHTA_SERVICE_GROUP_NAME,
+    email_messages_consumer_stats,
+)
 
 router = APIRouterExt(tags=["email messages mub"])
 
@@ -14,3 +23,16 @@ router = APIRouterExt(tags=["email messages mub"])
 )
 async def queue_email_message_sending(data: EmailMessageInputSchema) -> None:
     await pochta_bridge.send_email_message(data)
+
+
+@router.get(
+    path="/email-messages/consumer-lag/",
+    summary="Retrieve lag of the email messages consumer",
+)
+async def retrieve_email_messages_consumer_lag() -> StreamConsumerLagSchema:
+    return await retrieve_stream_consumer_lag(
+        broker=pochta_bridge.broker,
+        stream_name=settings.email_messages_send_stream_name,
+        group_name=POCHTA_SERVICE_GROUP_NAME,
+        consumer_stats=email_messages_consumer_stats,
+    )
@@ -1,19 +1,38 @@
 import logging
+from collections.abc import Iterator, Sequence
+from time import perf_counter
 
 from faststream.redis import RedisRouter
 
 from app.common.config import settings
-from app.common.faststream_ext import build_stream_sub
-from app.common.schemas.pochta_sch import EmailMessageInputSchema, EmailMessageKind
-from app.pochta.dependencies.unisender_go_dep import UnisenderGoClientDep
+from app.common.faststream_ext import (
+    StreamConsumerStats,
+    build_stream_sub,
+    dead_letter_stream_entry,
+)
+from app.common.schemas.pochta_sch import (
+    AnyEmailMessagePayload,
+    EmailMessageInputSchema,
+    EmailMessageKind,
+)
+from app.pochta.dependencies.unisender_go_dep import (
+    UnisenderGoClient,
+    UnisenderGoClientDep,
+)
 from app.pochta.schemas.unisender_go_sch import (
     UnisenderGoMessageSchema,
     UnisenderGoRecipientSchema,
     UnisenderGoSendEmailRequestSchema,
 )
 
+POCHTA_SERVICE_GROUP_NAME = "pochta-service"
+
 router = RedisRouter()
 
+email_messages_consumer_stats = StreamConsumerStats()
+
+UNISENDER_GO_MAX_RECIPIENTS = 500
+
 GLOBAL_TEMPLATE_VARIABLES: dict[str, str] = {
     "base_frontend_app_url": settings.frontend_app_base_url,
 }
@@ -28,28 +47,66 @@ KIND_TO_TEMPLATE_ID: dict[EmailMessageKind, str] = {
     EmailMessageKind.CLASSROOM_CONFERENCE_STARTED_V1: "0aef5510-b800-11f0-ad49-d2544595dc68",
     EmailMessageKind.RECIPIENT_INVOICE_CREATED_V1: "a466ca48-b800-11f0-80a2-d2544595dc68",
     EmailMessageKind.STUDENT_RECIPIENT_INVOICE_PAYMENT_CONFIRMED_V1: "9c5cd7cc-b7fe-11f0-8d2e-d2544595dc68",
+    EmailMessageKind.NOTIFICATIONS_DIGEST_V1: settings.email_digests.template_id,
 }
 
 
-@router.subscriber(  # type: ignore[misc]  # bad typing in faststream
-    stream=build_stream_sub(
-        stream_name=settings.email_messages_send_stream_name,
-        service_name="pochta-service",
-    ),
-)
-async def send_email_message(
-    unisender_go_client: UnisenderGoClientDep,
-    data: EmailMessageInputSchema,
+class CoalescedEmailMessage:
+    def __init__(self, payload: AnyEmailMessagePayload) -> None:
+        self.payload = payload
+        self.recipient_email_to_input_data: dict[str, EmailMessageInputSchema] = {}
+        self.recipient_email_to_index: dict[str, int] = {}
+
+    @property
+    def template_id(self) -> str:
+        return KIND_TO_TEMPLATE_ID[self.payload.kind]
+
+    def add(self, index: int, input_data: EmailMessageInputSchema) -> None:
+        for recipient_email in input_data.recipient_emails:
+            if recipient_email not in self.recipient_email_to_input_data:
+                self.recipient_email_to_input_data[recipient_email] = input_data
+                self.recipient_email_to_index[recipient_email] = index
+
+    def iter_recipient_email_chunks(self) -> Iterator[list[str]]:
+        recipient_emails = list(self.recipient_email_to_input_data)
+        for start in range(0, len(recipient_emails), UNISENDER_GO_MAX_RECIPIENTS):
+            yield recipient_emails[start : start + UNISENDER_GO_MAX_RECIPIENTS]
+
+
+def coalesce_email_messages(
+    messages: Sequence[EmailMessageInputSchema],
+) -> list[CoalescedEmailMessage]:
+    """
+    Merge messages with the same template & payload, so that they can be sent
+    in one request (fan-outs publish a message per recipient)
+    """
+    payload_key_to_coalesced: dict[tuple[str, str], CoalescedEmailMessage] = {}
+    for index, input_data in enumerate(messages):
+        coalesced = payload_key_to_coalesced.setdefault(
+            (
+                KIND_TO_TEMPLATE_ID[input_data.payload.kind],
+                input_data.payload.model_dump_json(),
+            ),
+            CoalescedEmailMessage(payload=input_data.payload),
+        )
+        coalesced.add(index, input_data)
+    return list(payload_key_to_coalesced.values())
+
+
+async def send_coalesced_email_message(
+    unisender_go_client: UnisenderGoClient,
+    coalesced: CoalescedEmailMessage,
+    recipient_emails: list[str],
 ) -> None:
     message_data = UnisenderGoMessageSchema(
         recipients=[
             UnisenderGoRecipientSchema(email=recipient_email)
-            for recipient_email in data.recipient_emails
+            for recipient_email in recipient_emails
         ],
-        template_id=KIND_TO_TEMPLATE_ID[data.payload.kind],
+        template_id=coalesced.template_id,
         global_substitutions={
             "global": GLOBAL_TEMPLATE_VARIABLES,
-            "data": data.payload.model_dump(mode="json"),
+            "data": coalesced.payload.model_dump(mode="json"),
         },
     )
 
@@ -57,12 +114,62 @@ async def send_email_message(
         UnisenderGoSendEmailRequestSchema(message=message_data)
     )
     # TODO better error handling
-    for recipient_email in data.recipient_emails:
+    for recipient_email in recipient_emails:
         if recipient_email not in unisender_go_response_data.emails:
             logging.error(
                 f"Sending email to {recipient_email} failed",
                 extra={
-                    "input_data": data,
+                    "input_data": coalesced.recipient_email_to_input_data[
+                        recipient_email
+                    ],
                     "unisender_go_response_data": unisender_go_response_data,
                 },
             )
+
+
+@router.subscriber(  # type: ignore[misc]  # bad typing in faststream
+    stream=build_stream_sub(
+        stream_name=settings.email_messages_send_stream_name,
+        service_name=POCHTA_SERVICE_GROUP_NAME,
+        batch=settings.email_messages_send_batch,
+    ),
+)
+async def send_email_messages(
+    unisender_go_client: UnisenderGoClientDep,
+    data: list[EmailMessageInputSchema],
+) -> None:
+    started_at = perf_counter()
+    failed_index_to_error: dict[int, str] = {}
+    last_exception: Exception | None = None
+    sent_any = False
+    for coalesced in coalesce_email_messages(data):
+        for recipient_emails in coalesced.iter_recipient_email_chunks():
+            try:
+                await send_coalesced_email_message(
+                    unisender_go_client=unisender_go_client,
+                    coalesced=coalesced,
+                    recipient_emails=recipient_emails,
+                )
+            except Exception as exc:  # noqa: PIE786  # failures are handled below
+                last_exception = exc
+                for recipient_email in recipient_emails:
+                    failed_index_to_error.setdefault(
+                        coalesced.recipient_email_to_index[recipient_email],
+                        repr(exc),
+                    )
+            else:
+                sent_any = True
+
+    if last_exception is not None and not sent_any:
+        raise last_exception  # nothing was sent, the whole batch can be retried
+
+    # retrying the batch would resend emails which were already sent,
+    # so only messages of the failed chunks are moved to dead letters
+    for index, error in failed_index_to_error.items():
+        dead_letter_stream_entry(index, error)
+
+    email_messages_consumer_stats.record_batch(
+        size=len(data),
+        oldest_created_at=None,
+        duration=perf_counter() - started_at,
+    )
@@ -0,0 +1,79 @@
+"""
+Moves contents of files uploaded before blobs into content-addressed storage.
+Every file is rehashed, files with equal contents end up sharing one blob.
+Can be stopped and restarted at any time, run with:
+``python -m app.storage_v2.blobs_migration``
+"""
+
+import asyncio
+import logging
+import os
+from hashlib import file_digest
+from pathlib import Path
+from uuid import UUID
+
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from app.common.config import sessionmaker
+from app.common.sqlalchemy_ext import LazySession, db, session_context
+from app.storage_v2.models.blobs_db import Blob
+from app.storage_v2.models.files_db import File
+
+
+def hash_legacy_content(path: Path) -> tuple[str, int]:
+    with path.open("rb") as f:
+        return file_digest(f, "sha256").hexdigest(), os.fstat(f.fileno()).st_size
+
+
+async def migrate_file(file: File) -> Path | None:
+    legacy_path = file.legacy_path
+    if not await run_in_threadpool(legacy_path.is_file):
+        logging.warning(f"Content of file {file.id} is missing, skipping it")
+        return None
+
+    sha256, size = await run_in_threadpool(hash_legacy_content, legacy_path)
+    blob = await Blob.acquire(sha256=sha256, size=size)
+    await run_in_threadpool(blob.adopt_content, legacy_path)
+    file.blob_sha256 = blob.sha256
+    return legacy_path
+
+
+async def migrate_batch(after_file_id: UUID | None, batch_size: int) -> list[File]:
+    """
+    Files are migrated in a separate transaction per batch. Contents are
+    hard-linked, so legacy paths are only removed after the commit
+    """
+    legacy_paths: list[Path] = []
+    async with LazySession(sessionmaker) as lazy_session:
+        session_context.set(lazy_session)
+        stmt = select(File).filter(File.blob_sha256.is_(None))
+        if after_file_id is not None:
+            stmt = stmt.filter(File.id > after_file_id)
+        files = await db.get_all(
+            stmt.order_by(File.id).limit(batch_size).with_for_update(skip_locked=True)
+        )
+        for file in files:
+            legacy_path = await migrate_file(file)
+            if legacy_path is not None:
+                legacy_paths.append(legacy_path)
+
+    for legacy_path in legacy_paths:
+        await run_in_threadpool(legacy_path.unlink, missing_ok=True)
+    return list(files)
+
+
+async def migrate_files(batch_size: int = 100) -> int:
+    migrated_count = 0
+    after_file_id: UUID | None = None
+    while True:  # noqa: WPS457  # until a partial batch
+        files = await migrate_batch(after_file_id=after_file_id, batch_size=batch_size)
+        migrated_count += sum(file.blob_sha256 is not None for file in files)
+        if len(files) < batch_size:
+            return migrated_count
+        after_file_id = files[-1].id
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    logging.info(f"Migrated {asyncio.run(migrate_files())} files into blobs")
@@ -1,3 +1,4 @@
+import asyncio
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from typing import Any
@@ -7,12 +8,18 @@ from app.common.dependencies.api_key_dep import APIKeyProtection
 from app.common.dependencies.authorization_dep import ProxyAuthorized
 from app.common.dependencies.mub_dep import MUBProtection
 from app.common.fastapi_ext import APIRouterExt
-from app.storage_v2.models.files_db import FILE_KIND_TO_FOLDER
+from app.storage_v2.models.blobs_db import (
+    BLOBS_FOLDER,
+    UPLOADS_FOLDER,
+    VARIANTS_FOLDER,
+)
 from app.storage_v2.routers import (
     access_groups_int,
+    files_mub,
     files_rst,
     ydocs_hocus_int,
 )
+from app.storage_v2.services.files_gc_svc import files_gc
 
 outside_router = APIRouterExt(prefix="/api/public/storage-service/v2")
 
@@ -33,15 +40,24 @@ mub_router = APIRouterExt(
     dependencies=[MUBProtection],
     prefix="/mub/storage-service/v2",
 )
+mub_router.include_router(files_mub.router)
 
 
 @asynccontextmanager
 async def lifespan(_: Any) -> AsyncIterator[None]:
     settings.storage_path.mkdir(exist_ok=True)
-    for sub_folder in FILE_KIND_TO_FOLDER.values():
+    for sub_folder in (BLOBS_FOLDER, VARIANTS_FOLDER, UPLOADS_FOLDER):
         (settings.storage_path / sub_folder).mkdir(exist_ok=True)
+
+    task: asyncio.Task[None] | None = None
+    if settings.files_gc.enabled and not settings.is_testing_mode:
+        task = asyncio.create_task(files_gc.run())
+
     yield
 
+    if task is not None:
+        task.cancel()
+
 
 api_router = APIRouterExt(lifespan=lifespan)
 api_router.include_router(outside_router)
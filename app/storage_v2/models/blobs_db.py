@@ -0,0 +1,136 @@
+import os
+from functools import partial
+from pathlib import Path
+from typing import Self
+from uuid import uuid4
+
+from sqlalchemy import BigInteger, String, delete, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.orm import Mapped, mapped_column
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+
+from app.common.config import Base, settings
+from app.common.pillow_ext import IMAGE_VARIANT_SIZES, ImageVariantSize
+from app.common.sqlalchemy_ext import db
+from app.common.starlette_uploads_ext import store_upload
+
+BLOBS_FOLDER = "blobs"
+VARIANTS_FOLDER = "variants"
+UPLOADS_FOLDER = "uploads"
+
+
+class Blob(Base):
+    """
+    Content of files, stored once per unique sha256. Every file holds
+    a reference, so the content is only removed with the last file
+    """
+
+    __tablename__ = "blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column(BigInteger)
+    refcount: Mapped[int] = mapped_column(default=0)
+
+    @staticmethod
+    def build_path(sha256: str) -> Path:
+        return settings.storage_path / BLOBS_FOLDER / sha256[:2] / sha256
+
+    @staticmethod
+    def build_variant_path(sha256: str, size: ImageVariantSize) -> Path:
+        return settings.storage_path / VARIANTS_FOLDER / sha256[:2] / f"{sha256}.{size}"
+
+    @property
+    def path(self) -> Path:
+        return self.build_path(self.sha256)
+
+    @classmethod
+    def unlink_content(cls, sha256: str) -> None:
+        cls.build_path(sha256).unlink(missing_ok=True)
+        for size in IMAGE_VARIANT_SIZES:
+            cls.build_variant_path(sha256, size).unlink(missing_ok=True)
+
+    @classmethod
+    async def unlink_released_content(cls, sha256: str) -> None:
+        # an uncommitted placeholder row takes the lock, which concurrent
+        # acquires wait for, so the content is only removed if the blob wasn't
+        # acquired since. The placeholder is never persisted: it's rolled back
+        # right after the removal, letting the waiting acquires insert the row
+        placeholder_sha256 = await db.session.scalar(
+            postgresql_insert(cls)
+            .values(sha256=sha256, size=0, refcount=0)
+            .on_conflict_do_nothing()
+            .returning(cls.sha256)
+        )
+        try:
+            if placeholder_sha256 is not None:
+                await run_in_threadpool(cls.unlink_content, sha256)
+        finally:
+            await db.session.rollback()
+
+    @classmethod
+    async def acquire(cls, sha256: str, size: int) -> Self:
+        # the row stays locked until commit, so a concurrent release
+        # can't remove the content of a blob while it's being acquired
+        stmt = postgresql_insert(cls).values(sha256=sha256, size=size, refcount=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.sha256],
+            set_={"refcount": cls.refcount + 1},
+        )
+        return (
+            await db.session.scalars(
+                stmt.returning(cls),
+                execution_options={"populate_existing": True},
+            )
+        ).one()
+
+    @classmethod
+    async def release(cls, sha256: str) -> int:
+        """Release a reference, returning the number of bytes freed on disk"""
+        refcount = await db.session.scalar(
+            update(cls)
+            .filter_by(sha256=sha256)
+            .values(refcount=cls.refcount - 1)
+            .returning(cls.refcount)
+            .execution_options(synchronize_session=False)
+        )
+        if refcount != 0:
+            return 0
+
+        size = await db.session.scalar(
+            delete(cls)
+            .filter_by(sha256=sha256, refcount=0)
+            .returning(cls.size)
+            .execution_options(synchronize_session=False)
+        )
+        if size is not None:
+            # a rollback would otherwise leave the row without its content
+            db.after_commit(partial(cls.unlink_released_content, sha256))
+        return size or 0
+
+    def adopt_content(self, source_path: Path) -> None:
+        """Hard-link ``source_path`` as the content, unless it's already stored"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(source_path, self.path)
+        except FileExistsError:
+            pass  # the same content was uploaded before
+
+    @classmethod
+    async def create_with_content(cls, upload: UploadFile, max_size: int) -> Self:
+        upload_path = settings.storage_path / UPLOADS_FOLDER / uuid4().hex
+        stored_upload = await store_upload(
+            upload=upload,
+            path=upload_path,
+            max_size=max_size,
+        )
+        try:
+            blob = await cls.acquire(
+                sha256=stored_upload.sha256,
+                size=stored_upload.size,
+            )
+            await run_in_threadpool(blob.adopt_content, upload_path)
+        finally:
+            # the content is either linked into the blob or not needed anymore
+            upload_path.unlink(missing_ok=True)
+        return blob
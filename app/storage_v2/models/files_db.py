@@ -1,14 +1,18 @@
 from enum import StrEnum
+from functools import partial
 from pathlib import Path
-from shutil import copyfileobj
-from typing import BinaryIO, Literal, Self
+from typing import Literal, Self
 from uuid import UUID, uuid4
 
 from pydantic_marshals.sqlalchemy import MappedModel
-from sqlalchemy import Enum
+from sqlalchemy import Enum, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
 
 from app.common.config import Base, settings
+from app.common.sqlalchemy_ext import db
+from app.storage_v2.models.blobs_db import Blob
 
 
 class FileKind(StrEnum):
@@ -32,6 +36,13 @@ FILE_KIND_TO_CONTENT_DISPOSITION: dict[FileKind, ContentDisposition] = {
 }
 
 
+def measure_legacy_content(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
 class File(Base):
     __tablename__ = "files"
 
@@ -39,13 +50,28 @@ class File(Base):
 
     name: Mapped[str] = mapped_column()
     kind: Mapped[FileKind] = mapped_column(Enum(FileKind, name="file_kind"))
+    # only empty for files uploaded before blobs, until they're migrated
+    blob_sha256: Mapped[str | None] = mapped_column(ForeignKey(Blob.sha256), index=True)
 
     ResponseSchema = MappedModel.create(columns=[id, name, kind])
 
     @property
-    def path(self) -> Path:
+    def legacy_path(self) -> Path:
         return settings.storage_path / FILE_KIND_TO_FOLDER[self.kind] / self.id.hex
 
+    @property
+    def path(self) -> Path:
+        if self.blob_sha256 is None:
+            return self.legacy_path
+        return Blob.build_path(self.blob_sha256)
+
+    @property
+    def etag(self) -> str | None:
+        # strong, because blobs are content-addressed
+        if self.blob_sha256 is None:
+            return None
+        return f'"{self.blob_sha256}"'
+
     @property
     def media_type(self) -> str | None:
         return FILE_KIND_TO_MEDIA_TYPE[self.kind]
@@ -57,18 +83,29 @@ class File(Base):
     @classmethod
     async def create_with_content(
         cls,
-        content: BinaryIO,
-        filename: str | None,
+        upload: UploadFile,
         file_kind: FileKind,
     ) -> Self:
-        file = await cls.create(
-            name=filename or "upload",
+        blob = await Blob.create_with_content(
+            upload=upload,
+            max_size=settings.uploads.max_file_size,
+        )
+        return await cls.create(
+            name=upload.filename or "upload",
             kind=file_kind,
+            blob_sha256=blob.sha256,
         )
-        with file.path.open("wb") as f:
-            copyfileobj(content, f)  # TODO maybe convert to async
-        return file
 
-    async def delete(self) -> None:
-        self.path.unlink(missing_ok=True)
+    async def purge(self) -> int:
+        """Delete the file, returning the number of bytes freed on disk"""
         await super().delete()
+        if self.blob_sha256 is None:
+            legacy_path = self.legacy_path
+            db.after_commit(
+                partial(run_in_threadpool, legacy_path.unlink, missing_ok=True)
+            )
+            return await run_in_threadpool(measure_legacy_content, legacy_path)
+        return await Blob.release(self.blob_sha256)
+
+    async def delete(self) -> None:
+        await self.purge()
@@ -0,0 +1,12 @@
+from app.common.fastapi_ext import APIRouterExt
+from app.storage_v2.services.files_gc_svc import FilesGCReportSchema, files_gc
+
+router = APIRouterExt(tags=["files mub"])
+
+
+@router.get(
+    "/files/orphaned/report/",
+    summary="Report what the files GC would delete, without deleting anything",
+)
+async def report_orphaned_files() -> FilesGCReportSchema:
+    return await files_gc.report()
@@ -1,14 +1,27 @@
 from datetime import datetime
+from email.utils import parsedate_to_datetime
 from os import stat
+from pathlib import Path
 from typing import Annotated
+from urllib.parse import quote
 
-from fastapi import Header, UploadFile
+from fastapi import Header, Query, UploadFile
 from starlette import status
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
 from starlette.responses import FileResponse, Response
 from starlette.staticfiles import NotModifiedResponse
 
-from app.common.fastapi_ext import APIRouterExt
+from app.common.config import (
+    StorageOffloadMode,
+    StorageOffloadSettings,
+    image_processor,
+    settings,
+)
+from app.common.fastapi_ext import APIRouterExt, Responses
+from app.common.pillow_ext import ImageVariantSize, InvalidImageError
 from app.common.schemas.storage_sch import StorageTokenPayloadSchema
+from app.common.starlette_uploads_ext import UploadResponses
 from app.storage_v2.dependencies.files_dep import MyFileByID
 from app.storage_v2.dependencies.storage_token_dep import (
     StorageTokenPayload,
@@ -16,6 +29,7 @@ from app.storage_v2.dependencies.storage_token_dep import (
 )
 from app.storage_v2.dependencies.uploads_dep import ValidatedImageUpload
 from app.storage_v2.models.access_groups_db import AccessGroup, AccessGroupFile
+from app.storage_v2.models.blobs_db import Blob
 from app.storage_v2.models.files_db import File, FileKind
 
 router = APIRouterExt(tags=["files"])
@@ -35,11 +49,7 @@ async def upload_file(
     if access_group is None:
         raise StorageTokenResponses.INVALID_STORAGE_TOKEN
 
-    file = await File.create_with_content(
-        content=upload.file,
-        filename=upload.filename,
-        file_kind=file_kind,
-    )
+    file = await File.create_with_content(upload=upload, file_kind=file_kind)
 
     await AccessGroupFile.create(
         access_group_id=storage_token_payload.access_group_id,
@@ -53,6 +63,7 @@ async def upload_file(
     "/file-kinds/uncategorized/files/",
     status_code=status.HTTP_201_CREATED,
     response_model=File.ResponseSchema,
+    responses=UploadResponses.responses(),
     summary="Upload a new uncategorized file",
 )
 async def upload_uncategorized_file(
@@ -70,6 +81,7 @@ async def upload_uncategorized_file(
     "/file-kinds/image/files/",
     status_code=status.HTTP_201_CREATED,
     response_model=File.ResponseSchema,
+    responses=UploadResponses.responses(),
     summary="Upload a new image file",
 )
 async def upload_image_file(
@@ -100,42 +112,118 @@ async def retrieve_file_meta(
 def parse_http_datetime(header: str | None) -> datetime | None:
     if header is None:
         return None
-    return datetime.strptime(header, "%a, %d %b %Y %H:%M:%S GMT")
+    try:
+        return parsedate_to_datetime(header)
+    except (TypeError, ValueError):  # malformed headers are ignored (RFC 9110)
+        return None
+
+
+def is_not_modified(
+    response_headers: MutableHeaders,
+    if_none_match: str | None,
+    if_modified_since: str | None,
+) -> bool:
+    if if_none_match is not None:
+        # If-Modified-Since is ignored when If-None-Match is present (RFC 9110)
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or response_headers.get("etag") in tags
+
+    modified_since = parse_http_datetime(if_modified_since)
+    last_modified = parse_http_datetime(response_headers.get("last-modified"))
+    return (
+        modified_since is not None
+        and last_modified is not None
+        and modified_since >= last_modified
+    )
+
+
+OFFLOADED_HEADER_NAMES = (
+    "content-type",
+    "content-disposition",
+    "etag",
+    "last-modified",
+)
+
+
+def offload_file_response(
+    path: Path,
+    response_headers: MutableHeaders,
+    storage_offload: StorageOffloadSettings,
+) -> Response:
+    headers = {
+        name: response_headers[name]
+        for name in OFFLOADED_HEADER_NAMES
+        if name in response_headers
+    }
+    match storage_offload.mode:
+        case StorageOffloadMode.X_ACCEL_REDIRECT:
+            headers["x-accel-redirect"] = storage_offload.location + quote(
+                path.relative_to(settings.storage_path).as_posix()
+            )
+        case StorageOffloadMode.X_SENDFILE:
+            headers["x-sendfile"] = str(path)
+    return Response(headers=headers)
+
+
+class FileVariantResponses(Responses):
+    NOT_AN_IMAGE = status.HTTP_409_CONFLICT, "Only images can be resized"
+    INVALID_IMAGE = status.HTTP_409_CONFLICT, "Image can't be resized"
 
 
 @router.get(
     "/files/{file_id}/",
     response_model=File.ResponseSchema,
+    responses=FileVariantResponses.responses(),
     summary="Read any file by id",
 )
 async def read_file(
     storage_token_payload: StorageTokenPayload,
     file: MyFileByID,
-    if_none_match: Annotated[str, Header()] = "",
+    size: Annotated[ImageVariantSize | None, Query()] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
     if_modified_since: Annotated[str | None, Header()] = None,
 ) -> Response:
     if not storage_token_payload.can_read_files:
         raise StorageTokenResponses.INVALID_STORAGE_TOKEN
 
+    path, etag = file.path, file.etag
+    if size is not None:
+        if file.kind is not FileKind.IMAGE:
+            raise FileVariantResponses.NOT_AN_IMAGE
+        if file.blob_sha256 is not None:  # legacy files are served as is
+            path = Blob.build_variant_path(file.blob_sha256, size)
+            etag = f'"{file.blob_sha256}.{size}"'
+            try:
+                await image_processor.ensure_variant(
+                    source_path=file.path,
+                    target_path=path,
+                    size=size,
+                )
+            except InvalidImageError:
+                raise FileVariantResponses.INVALID_IMAGE
+
+    # single and multiple byte ranges (with If-Range) are handled by the response
     response = FileResponse(
-        path=file.path,
+        path=path,
         filename=file.name,
         media_type=file.media_type,
         content_disposition_type=file.content_disposition,
-        stat_result=stat(file.path),
+        stat_result=await run_in_threadpool(stat, path),
+        headers=None if etag is None else {"etag": etag},
     )
 
-    etag = response.headers.get("etag")
-    if etag in {tag.strip(" W/") for tag in if_none_match.split(",")}:
-        return NotModifiedResponse(headers=response.headers)
-
-    modified_since = parse_http_datetime(if_modified_since)
-    last_modified = parse_http_datetime(response.headers.get("last-modified"))
-    if (
-        modified_since is not None
-        and last_modified is not None
-        and modified_since >= last_modified
+    if is_not_modified(
+        response_headers=response.headers,
+        if_none_match=if_none_match,
+        if_modified_since=if_modified_since,
     ):
         return NotModifiedResponse(headers=response.headers)
 
+    if settings.storage_offload is not None:
+        return offload_file_response(
+            path=path,
+            response_headers=response.headers,
+            storage_offload=settings.storage_offload,
+        )
+
     return response
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+
+from pydantic import BaseModel
+from redis.asyncio import Redis
+from sqlalchemy import BigInteger, Select, cast, exists, func, select
+
+from app.common.config import redis_cache, sessionmaker, settings
+from app.common.sqlalchemy_ext import LazySession, db, session_context
+from app.storage_v2.models.access_groups_db import AccessGroupFile
+from app.storage_v2.models.blobs_db import Blob
+from app.storage_v2.models.files_db import File
+
+
+class FilesGCReportSchema(BaseModel):
+    files_count: int = 0
+    # legacy files (not yet moved into blobs) are only measured when deleted
+    reclaimed_bytes: int = 0
+
+
+def select_orphaned_files() -> Select[tuple[File]]:
+    return select(File).filter(~exists().where(AccessGroupFile.file_id == File.id))
+
+
+class FilesGC:
+    """
+    Periodically deletes files no longer linked to any access group, together
+    with blobs nobody else references. Each batch is deleted in a separate
+    transaction, rows are locked with SKIP LOCKED, so concurrent runs can't
+    collide. The lock in an optional redis only saves instances from scanning
+    the same files: it's taken for the whole interval by the first instance
+    and expires by itself, so a crashed instance can't hold it forever
+    """
+
+    lock_key = "storage:files-gc:lock"
+
+    def __init__(self, redis: Redis | None, batch_size: int, interval: float) -> None:
+        self.redis = redis
+        self.batch_size = batch_size
+        self.interval = interval
+
+    async def collect_batch(self) -> FilesGCReportSchema:
+        report = FilesGCReportSchema()
+        async with LazySession(sessionmaker) as lazy_session:
+            session_context.set(lazy_session)
+            files = await db.get_all(
+                select_orphaned_files()
+                .order_by(File.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            for file in files:
+                report.reclaimed_bytes += await file.purge()
+            report.files_count = len(files)
+        return report
+
+    async def collect(self) -> FilesGCReportSchema:
+        report = FilesGCReportSchema()
+        while True:  # noqa: WPS457  # until a partial batch
+            batch_report = await self.collect_batch()
+            report.files_count += batch_report.files_count
+            report.reclaimed_bytes += batch_report.reclaimed_bytes
+            if batch_report.files_count < self.batch_size:
+                return report
+
+    async def report(self) -> FilesGCReportSchema:
+        """Measure what would be collected right now, without deleting anything"""
+        orphaned_files = select_orphaned_files().subquery()
+        released_blobs = (
+            select(
+                orphaned_files.c.blob_sha256,
+                func.count().label("released_count"),
+            )
+            .group_by(orphaned_files.c.blob_sha256)
+            .subquery()
+        )
+        return FilesGCReportSchema(
+            files_count=await db.get_count(
+                select(func.count()).select_from(orphaned_files)
+            ),
+            reclaimed_bytes=await db.get_count(
+                select(cast(func.coalesce(func.sum(Blob.size), 0), BigInteger))
+                .select_from(Blob)
+                .join(released_blobs, released_blobs.c.blob_sha256 == Blob.sha256)
+                .filter(Blob.refcount == released_blobs.c.released_count)
+            ),
+        )
+
+    async def acquire_lock(self) -> bool:
+        if self.redis is None:
+            return True
+        return bool(
+            await self.redis.set(
+                self.lock_key,
+                settings.instance_name,
+                nx=True,
+                ex=max(int(self.interval), 1),
+            )
+        )
+
+    async def run(self) -> None:
+        while True:  # noqa: WPS457  # cancelled on shutdown
+            try:
+                if await self.acquire_lock():
+                    report = await self.collect()
+                    logging.info(
+                        f"Files GC deleted {report.files_count} files, "
+                        f"reclaiming {report.reclaimed_bytes} bytes"
+                    )
+            except Exception:  # noqa: PIE786  # the job has to keep going
+                logging.exception("Files GC failed")
+            await asyncio.sleep(self.interval)
+
+
+files_gc = FilesGC(
+    redis=redis_cache,
+    batch_size=settings.files_gc.batch_size,
+    interval=settings.files_gc.interval,
+)
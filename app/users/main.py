@@ -5,6 +5,7 @@ from typing import Any
 from app.common.config import settings
 from app.common.dependencies.api_key_dep import APIKeyProtection
 from app.common.dependencies.authorization_dep import ProxyAuthorized
+from app.common.dependencies.database_dep import PrimaryDatabase
 from app.common.dependencies.mub_dep import MUBProtection
 from app.common.fastapi_ext import APIRouterExt
 from app.users.routes import (
@@ -66,4 +67,4 @@ api_router.include_router(outside_router)
 api_router.include_router(authorized_router)
 api_router.include_router(internal_router)
 api_router.include_router(mub_router)
-api_router.include_router(proxy_rst.router)
+api_router.include_router(proxy_rst.router, dependencies=[PrimaryDatabase])
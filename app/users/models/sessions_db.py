@@ -5,13 +5,14 @@ from typing import Any, ClassVar, Self
 from pydantic import AwareDatetime
 from pydantic_marshals.sqlalchemy import MappedModel
 from sqlalchemy import CHAR, DateTime, ForeignKey, Index, delete, select, update
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, joinedload, mapped_column, relationship
 
 from app.common.config import Base
 from app.common.cyptography import TokenGenerator
 from app.common.sqlalchemy_ext import db
 from app.common.utils.datetime import datetime_utc_now
 from app.users.models.users_db import User
+from app.users.utils.proxy_auth_cache import ProxyAuthCacheEntry, proxy_auth_cache
 
 session_token_generator = TokenGenerator(randomness=40, length=50)
 
@@ -78,6 +79,15 @@ class Session(Base):
         self.token = session_token_generator.generate_token()
         self.expires_at = self.generate_expiry()
 
+    def build_proxy_auth_cache_entry(self, username: str) -> ProxyAuthCacheEntry:
+        return ProxyAuthCacheEntry(
+            session_id=self.id,
+            user_id=self.user_id,
+            username=username,
+            expires_at=self.expires_at,
+            renew_after=self.expires_at - self.renew_period_length,
+        )
+
     @classmethod
     async def create(cls, **kwargs: Any) -> Self:
         if kwargs.get("token") is None:
@@ -87,6 +97,12 @@ class Session(Base):
             kwargs["token"] = token
         return await super().create(**kwargs)
 
+    @classmethod
+    async def find_first_by_token_with_user(cls, token: str) -> Self | None:
+        return await db.get_first(
+            select(cls).options(joinedload(cls.user)).filter_by(token=token)
+        )
+
     @classmethod
     async def find_by_user(
         cls,
@@ -114,6 +130,7 @@ class Session(Base):
             )
             .values(is_disabled=True)
         )
+        proxy_auth_cache.invalidate_user_after_commit(user_id)
 
     @classmethod
     async def cleanup_concurrent_by_user(cls, user_id: int) -> None:
@@ -136,6 +153,7 @@ class Session(Base):
                 )
                 .values(is_disabled=True)
             )
+            proxy_auth_cache.invalidate_user_after_commit(user_id)
 
     @classmethod
     async def cleanup_history_by_user(cls, user_id: int) -> None:
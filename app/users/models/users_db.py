@@ -12,6 +12,7 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 from app.common.config import Base, settings
 from app.common.cyptography import TokenGenerator
+from app.common.pillow_ext import IMAGE_VARIANT_SIZES, ImageVariantSize
 from app.common.sqlalchemy_ext import db
 from app.common.utils.datetime import datetime_utc_now
 
@@ -139,6 +140,14 @@ class User(Base):
     def avatar_path(self) -> Path:
         return settings.avatars_path / f"{self.id}.webp"
 
+    def build_avatar_variant_path(self, size: ImageVariantSize) -> Path:
+        return settings.avatars_path / f"{self.id}.{size}.webp"
+
+    def unlink_avatar(self) -> None:
+        self.avatar_path.unlink(missing_ok=True)
+        for size in IMAGE_VARIANT_SIZES:
+            self.build_avatar_variant_path(size).unlink(missing_ok=True)
+
     def change_password(self, password: str) -> None:
         if self.is_password_valid(password):
             return
@@ -1,12 +1,23 @@
+from os import stat
 from typing import Annotated
 
 import filetype  # type: ignore[import-untyped]
-from fastapi import File, UploadFile
+from fastapi import File, Query, UploadFile
 from filetype.types.image import Webp  # type: ignore[import-untyped]
 from starlette import status
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import FileResponse
 
+from app.common.config import image_processor, settings
 from app.common.fastapi_ext import APIRouterExt, Responses
-from app.users.dependencies.users_dep import AuthorizedUser
+from app.common.pillow_ext import (
+    IMAGE_VARIANT_SIZES,
+    ImageVariantSize,
+    InvalidImageError,
+    build_temporary_path,
+)
+from app.common.starlette_uploads_ext import UploadResponses, store_upload
+from app.users.dependencies.users_dep import AuthorizedUser, UserByID
 
 router = APIRouterExt(tags=["current user avatar"])
 
@@ -15,10 +26,15 @@ class AvatarResponses(Responses):
     WRONG_FORMAT = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, "Invalid image format"
 
 
+class AvatarReadResponses(Responses):
+    AVATAR_NOT_FOUND = status.HTTP_404_NOT_FOUND, "Avatar not found"
+    INVALID_AVATAR = status.HTTP_409_CONFLICT, "Avatar can't be resized"
+
+
 @router.put(
     "/users/current/avatar/",
     status_code=status.HTTP_204_NO_CONTENT,
-    responses=AvatarResponses.responses(),
+    responses=Responses.chain(AvatarResponses, UploadResponses),
     summary="Upload a new user avatar",
 )
 async def update_or_create_avatar(
@@ -28,8 +44,24 @@ async def update_or_create_avatar(
     if not filetype.match(avatar.file, [Webp()]):
         raise AvatarResponses.WRONG_FORMAT
 
-    with user.avatar_path.open("wb") as file:
-        file.write(await avatar.read())
+    upload_path = build_temporary_path(user.avatar_path)
+    await store_upload(
+        upload=avatar,
+        path=upload_path,
+        max_size=settings.uploads.max_avatar_size,
+    )
+    # variants are keyed by user id, so all of them are replaced right away
+    try:
+        await image_processor.replace_with_variants(
+            source_path=upload_path,
+            target_path=user.avatar_path,
+            variant_paths={
+                size: user.build_avatar_variant_path(size)
+                for size in IMAGE_VARIANT_SIZES
+            },
+        )
+    except InvalidImageError:
+        raise AvatarResponses.WRONG_FORMAT
 
 
 @router.delete(
@@ -38,4 +70,32 @@ async def update_or_create_avatar(
     summary="Remove current user avatar",
 )
 async def delete_avatar(user: AuthorizedUser) -> None:
-    user.avatar_path.unlink(missing_ok=True)
+    user.unlink_avatar()
+
+
+@router.get(
+    "/users/{user_id}/avatar/",
+    responses=AvatarReadResponses.responses(),
+    summary="Read any user's avatar by id",
+)
+async def read_avatar(
+    user: UserByID,
+    size: Annotated[ImageVariantSize | None, Query()] = None,
+) -> FileResponse:
+    path = user.avatar_path
+    try:
+        if size is not None:
+            # avatars uploaded before variants existed are resized on first read
+            path = user.build_avatar_variant_path(size)
+            await image_processor.ensure_variant(
+                source_path=user.avatar_path,
+                target_path=path,
+                size=size,
+            )
+        stat_result = await run_in_threadpool(stat, path)
+    except FileNotFoundError:
+        raise AvatarReadResponses.AVATAR_NOT_FOUND
+    except InvalidImageError:
+        raise AvatarReadResponses.INVALID_AVATAR
+
+    return FileResponse(path=path, media_type="image/webp", stat_result=stat_result)
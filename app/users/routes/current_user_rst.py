@@ -9,6 +9,7 @@ from app.users.dependencies.password_protected_dep import PasswordProtected
 from app.users.dependencies.users_dep import AuthorizedUser
 from app.users.models.sessions_db import Session
 from app.users.models.users_db import User
+from app.users.utils.proxy_auth_cache import proxy_auth_cache
 from app.users.utils.users import UsernameResponses, is_username_unique
 
 router = APIRouterExt(tags=["current user"])
@@ -33,6 +34,7 @@ async def patch_user_data(data: User.SettingsPatchSchema, user: AuthorizedUser)
     if not await is_username_unique(data.username, user.username):
         raise UsernameResponses.USERNAME_IN_USE
     user.update(**data.model_dump(exclude_defaults=True))
+    proxy_auth_cache.invalidate_user_after_commit(user.id)
     return user
 
 
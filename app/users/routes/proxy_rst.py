@@ -14,6 +14,7 @@ from app.users.utils.authorization import (
     AUTH_HEADER_NAME,
     add_session_to_response,
 )
+from app.users.utils.proxy_auth_cache import ProxyAuthCacheEntry, proxy_auth_cache
 
 router = APIRouterExt(tags=["proxy auth"])
 
@@ -41,7 +42,7 @@ async def authorize_session(
     if token is None:
         raise AuthorizedResponses.HEADER_MISSING
 
-    session = await Session.find_first_by_kwargs(token=token)
+    session = await Session.find_first_by_token_with_user(token=token)
     if session is None or session.is_invalid:
         raise AuthorizedResponses.INVALID_SESSION
 
@@ -59,6 +60,27 @@ async def authorize_user(
     return await session.awaitable_attrs.user  # type: ignore[no-any-return]
 
 
+async def authorize_cached(
+    response: Response,
+    header_token: AuthHeader = None,
+    cookie_token: AuthCookie = None,
+) -> ProxyAuthCacheEntry:
+    token = cookie_token or header_token
+    if token is not None:
+        cache_entry = await proxy_auth_cache.get(token)
+        if cache_entry is not None:
+            return cache_entry
+
+    session = await authorize_session(
+        header_token=header_token, cookie_token=cookie_token
+    )
+    user = await authorize_user(session, response)
+
+    cache_entry = session.build_proxy_auth_cache_entry(username=user.username)
+    await proxy_auth_cache.set(session.token, cache_entry)
+    return cache_entry
+
+
 @router.get(
     "/proxy/auth/",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -74,14 +96,13 @@ async def proxy_auth(
     if x_request_method and x_request_method.upper() == "OPTIONS":
         return
 
-    session = await authorize_session(
-        header_token=header_token, cookie_token=cookie_token
+    cache_entry = await authorize_cached(
+        response=response, header_token=header_token, cookie_token=cookie_token
     )
-    user = await authorize_user(session, response)
 
-    response.headers["X-Session-ID"] = str(session.id)
-    response.headers["X-User-ID"] = str(user.id)
-    response.headers["X-Username"] = user.username
+    response.headers["X-Session-ID"] = str(cache_entry.session_id)
+    response.headers["X-User-ID"] = str(cache_entry.user_id)
+    response.headers["X-Username"] = cache_entry.username
 
 
 @router.get(
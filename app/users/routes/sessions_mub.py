@@ -7,6 +7,7 @@ from app.common.fastapi_ext import APIRouterExt, Responses
 from app.users.dependencies.users_dep import UserByID
 from app.users.models.sessions_db import Session
 from app.users.utils.authorization import AUTH_COOKIE_NAME, add_session_to_response
+from app.users.utils.proxy_auth_cache import proxy_auth_cache
 
 router = APIRouterExt(tags=["sessions mub"])
 
@@ -75,3 +76,4 @@ async def disable_or_delete_session(
         await session.delete()
     else:
         session.is_disabled = True
+    proxy_auth_cache.invalidate_token_after_commit(session.token)
@@ -8,6 +8,7 @@ from app.common.fastapi_ext import APIRouterExt, Responses
 from app.users.dependencies.sessions_dep import AuthorizedSession
 from app.users.models.sessions_db import Session
 from app.users.utils.authorization import remove_session_from_response
+from app.users.utils.proxy_auth_cache import proxy_auth_cache
 
 router = APIRouterExt(tags=["user sessions"])
 
@@ -28,6 +29,7 @@ async def get_current_session(session: AuthorizedSession) -> Session:
 )
 async def signout(session: AuthorizedSession, response: Response) -> None:
     session.is_disabled = True
+    proxy_auth_cache.invalidate_token_after_commit(session.token)
     remove_session_from_response(response)
 
 
@@ -73,3 +75,4 @@ async def disable_session(session_id: int, auth_data: AuthorizationData) -> None
     if session is None:
         raise SessionResponses.SESSION_NOT_FOUND
     session.is_disabled = True
+    proxy_auth_cache.invalidate_token_after_commit(session.token)
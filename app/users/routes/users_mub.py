@@ -3,6 +3,7 @@ from starlette import status
 from app.common.fastapi_ext import APIRouterExt, Responses
 from app.users.dependencies.users_dep import UserByID
 from app.users.models.users_db import User
+from app.users.utils.proxy_auth_cache import proxy_auth_cache
 from app.users.utils.users import (
     UserEmailResponses,
     UsernameResponses,
@@ -49,6 +50,7 @@ async def update_user(user: UserByID, user_data: User.PatchMUBSchema) -> User:
     if not await is_username_unique(user_data.username, user.username):
         raise UsernameResponses.USERNAME_IN_USE
     user.update(**user_data.model_dump(exclude_defaults=True))
+    proxy_auth_cache.invalidate_user_after_commit(user.id)
     return user
 
 
@@ -59,4 +61,5 @@ async def update_user(user: UserByID, user_data: User.PatchMUBSchema) -> User:
 )
 async def delete_user(user: UserByID) -> None:
     await user.delete()
-    user.avatar_path.unlink(missing_ok=True)
+    proxy_auth_cache.invalidate_user_after_commit(user.id)
+    user.unlink_avatar()
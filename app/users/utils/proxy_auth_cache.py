@@ -0,0 +1,152 @@
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from functools import partial
+from hashlib import sha256
+from time import monotonic
+
+from pydantic import AwareDatetime, BaseModel
+from redis.asyncio import Redis
+
+from app.common.config import redis_cache, settings
+from app.common.sqlalchemy_ext import db
+from app.common.utils.datetime import datetime_utc_now
+
+
+class ProxyAuthCacheEntry(BaseModel):
+    session_id: int
+    user_id: int
+    username: str
+    expires_at: AwareDatetime
+    renew_after: AwareDatetime
+
+    @property
+    def is_usable(self) -> bool:  # noqa: FNE005
+        # renewal is only done on the cold path, so entries are not usable after it
+        now: datetime = datetime_utc_now()
+        return now < self.renew_after and now < self.expires_at
+
+
+class ProxyAuthCache:
+    """
+    Two-tier cache for resolving session tokens into proxy auth data:
+    a small process-local LRU in front of an optional shared redis tier.
+    Tokens are only stored as hashes, entries are indexed by user id
+    to allow invalidating all sessions of a user at once. Invalidation only
+    reaches local entries of the current instance, others expire after
+    a short ``local_ttl``. Changes should be invalidated after commit, or else
+    a concurrent cache miss can read the old state and store it again
+    """
+
+    def __init__(
+        self,
+        redis: Redis | None,
+        local_ttl: int,
+        local_max_size: int,
+        shared_ttl: int,
+    ) -> None:
+        self.redis = redis
+        self.local_ttl = local_ttl
+        self.local_max_size = local_max_size
+        self.shared_ttl = shared_ttl
+
+        self.local_entries: OrderedDict[str, tuple[float, ProxyAuthCacheEntry]] = (
+            OrderedDict()
+        )
+        self.local_user_keys: defaultdict[int, set[str]] = defaultdict(set)
+
+    @staticmethod
+    def build_key(token: str) -> str:
+        return sha256(token.encode()).hexdigest()
+
+    @staticmethod
+    def build_shared_token_key(key: str) -> str:
+        return f"proxy-auth:tokens:{key}"
+
+    @staticmethod
+    def build_shared_user_key(user_id: int) -> str:
+        return f"proxy-auth:users:{user_id}"
+
+    def pop_local(self, key: str) -> None:
+        local_entry = self.local_entries.pop(key, None)
+        if local_entry is not None:
+            self.local_user_keys[local_entry[1].user_id].discard(key)
+
+    def set_local(self, key: str, entry: ProxyAuthCacheEntry) -> None:
+        self.pop_local(key)
+        self.local_entries[key] = (monotonic() + self.local_ttl, entry)
+        self.local_user_keys[entry.user_id].add(key)
+        while len(self.local_entries) > self.local_max_size:
+            self.pop_local(next(iter(self.local_entries)))
+
+    def get_local(self, key: str) -> ProxyAuthCacheEntry | None:
+        local_entry = self.local_entries.get(key)
+        if local_entry is None:
+            return None
+        if local_entry[0] < monotonic():
+            self.pop_local(key)
+            return None
+        self.local_entries.move_to_end(key)
+        return local_entry[1]
+
+    async def get(self, token: str) -> ProxyAuthCacheEntry | None:
+        key = self.build_key(token)
+
+        entry = self.get_local(key)
+        if entry is None and self.redis is not None:
+            raw_entry = await self.redis.get(self.build_shared_token_key(key))
+            if raw_entry is not None:
+                entry = ProxyAuthCacheEntry.model_validate_json(raw_entry)
+                self.set_local(key, entry)
+
+        if entry is None or not entry.is_usable:
+            return None
+        return entry
+
+    async def set(self, token: str, entry: ProxyAuthCacheEntry) -> None:
+        key = self.build_key(token)
+        self.set_local(key, entry)
+
+        if self.redis is not None:
+            user_key = self.build_shared_user_key(entry.user_id)
+            async with self.redis.pipeline(transaction=False) as pipeline:
+                pipeline.set(
+                    self.build_shared_token_key(key),
+                    entry.model_dump_json(),
+                    ex=self.shared_ttl,
+                )
+                pipeline.sadd(user_key, key)
+                pipeline.expire(user_key, self.shared_ttl)
+                await pipeline.execute()
+
+    async def invalidate_token(self, token: str) -> None:
+        key = self.build_key(token)
+        self.pop_local(key)
+
+        if self.redis is not None:
+            await self.redis.delete(self.build_shared_token_key(key))
+
+    async def invalidate_user(self, user_id: int) -> None:
+        for key in self.local_user_keys.pop(user_id, set()):
+            self.local_entries.pop(key, None)
+
+        if self.redis is not None:
+            user_key = self.build_shared_user_key(user_id)
+            keys: set[bytes] = await self.redis.smembers(user_key)  # type: ignore[misc]
+            await self.redis.delete(
+                user_key,
+                *(self.build_shared_token_key(key.decode()) for key in keys),
+            )
+
+    def invalidate_token_after_commit(self, token: str) -> None:
+        db.after_commit(partial(self.invalidate_token, token))
+
+    def invalidate_user_after_commit(self, user_id: int) -> None:
+        db.after_commit(partial(self.invalidate_user, user_id))
+
+
+proxy_auth_cache = ProxyAuthCache(
+    redis=redis_cache,
+    local_ttl=settings.proxy_auth_cache.local_ttl,
+    local_max_size=settings.proxy_auth_cache.local_max_size,
+    shared_ttl=settings.proxy_auth_cache.shared_ttl,
+)
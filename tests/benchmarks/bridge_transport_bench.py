@@ -0,0 +1,123 @@
+"""
+Compare latencies of handlers calling bridges with HTTP and in-process transports
+
+Requires the same dependencies as the app itself (see `docker compose up`)
+and a free port from `settings.bridge_base_url`. Run with::
+
+    python -m tests.benchmarks.bridge_transport_bench --iterations 200
+"""
+
+import asyncio
+import statistics
+from argparse import ArgumentParser
+from collections.abc import Awaitable, Callable
+from time import perf_counter
+
+from httpx import AsyncClient, Response
+from uvicorn import Config, Server
+
+from app.classrooms.models.classrooms_db import IndividualClassroom
+from app.classrooms.models.invitations_db import IndividualInvitation
+from app.common.config import BridgeTransportMode, sessionmaker, settings
+from app.common.dependencies.authorization_dep import ProxyAuthData
+from app.common.sqlalchemy_ext import LazySession, session_context
+from app.main import app
+from app.users.models.users_db import User
+
+
+async def create_user(username: str) -> User:
+    return await User.create(
+        email=f"{username}@example.com",
+        username=username,
+        password=User.generate_hash(username),
+    )
+
+
+async def measure(
+    iterations: int, request: Callable[[int], Awaitable[Response]]
+) -> list[float]:
+    timings: list[float] = []
+    for iteration in range(iterations):
+        start = perf_counter()
+        response = await request(iteration)
+        timings.append(perf_counter() - start)
+        response.raise_for_status()
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    percentiles = statistics.quantiles(timings, n=100)
+    print(  # noqa: T201
+        f"{name:<40} p50={percentiles[49] * 1000:.2f}ms"
+        f" p99={percentiles[98] * 1000:.2f}ms"
+    )
+
+
+async def run_benchmark(mode: BridgeTransportMode, iterations: int) -> None:
+    settings.bridge_transport_mode = mode
+    port = int(settings.bridge_base_url.rpartition(":")[2])
+    server = Server(Config(app, port=port, log_level="warning"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.1)
+
+    async with LazySession(sessionmaker) as lazy_session:
+        session_context.set(lazy_session)
+        tutor = await create_user(f"tutor{mode}")
+        students = [await create_user(f"student{mode}{i}") for i in range(iterations)]
+        classroom = await IndividualClassroom.create(
+            tutor_id=tutor.id,
+            tutor_name=tutor.display_name,
+            student_id=students[0].id,
+            student_name=students[0].display_name,
+        )
+        invitation = await IndividualInvitation.create(tutor_id=tutor.id)
+
+    def auth_headers(user: User) -> dict[str, str]:
+        return ProxyAuthData(
+            session_id=1, user_id=user.id, username=user.username
+        ).as_headers
+
+    async with AsyncClient(base_url=settings.bridge_base_url) as client:
+        report(
+            f"[{mode}] create_invoice",
+            await measure(
+                iterations,
+                lambda _: client.post(
+                    "/api/protected/invoice-service/roles/tutor"
+                    + f"/classrooms/{classroom.id}/invoices/",
+                    json={
+                        "invoice": {"comment": None},
+                        "items": [{"name": "lesson", "price": 1000, "quantity": 1}],
+                    },
+                    headers=auth_headers(tutor),
+                ),
+            ),
+        )
+        report(
+            f"[{mode}] accept_individual_invitation",
+            await measure(
+                iterations - 1,
+                lambda i: client.post(
+                    "/api/protected/classroom-service/roles/student"
+                    + f"/invitations/{invitation.code}/usages/",
+                    headers=auth_headers(students[i + 1]),
+                ),
+            ),
+        )
+
+    server.should_exit = True
+    await server_task
+
+
+async def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    arguments = parser.parse_args()
+
+    for mode in BridgeTransportMode:
+        await run_benchmark(mode=mode, iterations=arguments.iterations)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
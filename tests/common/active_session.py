@@ -6,7 +6,7 @@ import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.common.config import sessionmaker
-from app.common.sqlalchemy_ext import session_context
+from app.common.sqlalchemy_ext import LazySession, session_context
 
 
 class ActiveSession(Protocol):
@@ -18,8 +18,8 @@ class ActiveSession(Protocol):
 def active_session() -> ActiveSession:
     @asynccontextmanager
     async def active_session_inner() -> AsyncIterator[AsyncSession]:
-        async with sessionmaker.begin() as session:
-            session_context.set(session)
-            yield session
+        async with LazySession(sessionmaker) as lazy_session:
+            session_context.set(lazy_session)
+            yield lazy_session.session
 
     return active_session_inner
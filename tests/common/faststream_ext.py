@@ -1,12 +1,18 @@
 from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock
 
 import pytest
 from faststream.redis import RedisBroker, TestRedisBroker
 
-from app.main import faststream
+from app.common.config_faststream import faststream
 
 
 @pytest.fixture(scope="session", autouse=True)
 async def faststream_broker() -> AsyncIterator[RedisBroker]:
     async with TestRedisBroker(faststream.broker) as broker:
+        # fake producer publishes directly, ignoring pipelines,
+        # but the pipelines on the fake connection still have to be executable
+        client = broker.config.broker_config.connection.client
+        pipeline = client.pipeline.return_value.__aenter__.return_value
+        pipeline.execute = AsyncMock()
         yield broker
@@ -0,0 +1,62 @@
+from collections.abc import Iterator
+
+import pytest
+
+from app.common.config import query_stats_registry
+from app.common.query_stats_ext import QueryStats
+
+
+class QueryBudget:
+    def __init__(
+        self,
+        statements: int,
+        scope: str | None = None,
+        max_repeats: int | None = None,
+    ) -> None:
+        self.statements = statements
+        self.scope = scope
+        self.max_repeats = max_repeats
+        self.violations: list[str] = []
+
+    def check(self, stats: QueryStats) -> None:
+        if self.scope is not None and stats.scope != self.scope:
+            return
+
+        if stats.statement_count > self.statements:
+            self.violations.append(
+                f"{stats.scope} issued {stats.statement_count} statements, "
+                f"budget is {self.statements}"
+            )
+        if self.max_repeats is not None and stats.max_repeats > self.max_repeats:
+            repeated = stats.repeated_fingerprints(self.max_repeats + 1)
+            self.violations.append(
+                f"{stats.scope} repeated statements more than "
+                f"{self.max_repeats} times: {repeated}"
+            )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line(
+        "markers",
+        "query_budget(statements, scope=None, max_repeats=None): fail the test "
+        "if any request, event or message handled during it (or only the ones "
+        "matching the scope, like 'GET /proxy/auth/') issues too many statements",
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item: pytest.Item) -> Iterator[None]:
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+
+    budget = QueryBudget(*marker.args, **marker.kwargs)
+    query_stats_registry.listeners.append(budget.check)
+    try:
+        result = yield
+    finally:
+        query_stats_registry.listeners.remove(budget.check)
+
+    if budget.violations:
+        pytest.fail("Query budget exceeded:\n" + "\n".join(budget.violations))
+    return result
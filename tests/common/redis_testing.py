@@ -0,0 +1,235 @@
+import asyncio
+import math
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from time import time
+from typing import Any
+
+
+class SimpleString(bytes):
+    pass
+
+
+RESPValue = bytes | int | list[Any] | None
+
+OK = SimpleString(b"OK")
+
+
+class RESPError(Exception):
+    pass
+
+
+class RedisStandIn:
+    """
+    Minimal in-memory stand-in for a redis server, speaking RESP2 over TCP,
+    so that real clients (including ones in other processes) can connect to it.
+    Implements only the subset of commands used throughout the app
+    """
+
+    def __init__(self) -> None:
+        self.values: dict[bytes, Any] = {}
+        self.expiry: dict[bytes, float] = {}
+        self.commands: dict[bytes, Callable[..., RESPValue]] = {
+            b"PING": lambda *_: SimpleString(b"PONG"),
+            b"SELECT": lambda *_: OK,
+            b"FLUSHDB": self.flushdb,
+            b"DEL": self.delete,
+            b"EXISTS": self.exists,
+            b"EXPIRE": self.expire,
+            b"GET": self.get,
+            b"SET": self.set,
+            b"INCRBY": self.incrby,
+            b"TTL": self.ttl,
+            b"RPUSH": self.rpush,
+            b"LPOP": self.lpop,
+            b"LLEN": self.llen,
+            b"LRANGE": self.lrange,
+            b"LTRIM": self.ltrim,
+            b"ZADD": self.zadd,
+            b"ZREM": self.zrem,
+            b"ZRANGE": self.zrange,
+            b"ZRANGEBYSCORE": self.zrangebyscore,
+            b"ZREMRANGEBYSCORE": self.zremrangebyscore,
+        }
+
+    def is_alive(self, key: bytes) -> bool:
+        expires_at = self.expiry.get(key)
+        if expires_at is not None and expires_at <= time():
+            self.values.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.values
+
+    def flushdb(self) -> RESPValue:
+        self.values.clear()
+        self.expiry.clear()
+        return OK
+
+    def delete(self, *keys: bytes) -> RESPValue:
+        deleted = [self.values.pop(key) for key in keys if self.is_alive(key)]
+        return len(deleted)
+
+    def exists(self, *keys: bytes) -> RESPValue:
+        return len([key for key in keys if self.is_alive(key)])
+
+    def expire(self, key: bytes, seconds: bytes) -> RESPValue:
+        if not self.is_alive(key):
+            return 0
+        self.expiry[key] = time() + float(seconds)
+        return 1
+
+    def get(self, key: bytes) -> RESPValue:
+        return self.values[key] if self.is_alive(key) else None
+
+    def set(self, key: bytes, value: bytes, *options: bytes) -> RESPValue:
+        flags = [option.upper() for option in options]
+        if b"NX" in flags and self.is_alive(key):
+            return None
+        self.values[key] = value
+        self.expiry.pop(key, None)
+        if b"EX" in flags:
+            self.expiry[key] = time() + float(flags[flags.index(b"EX") + 1])
+        return OK
+
+    def incrby(self, key: bytes, amount: bytes) -> RESPValue:
+        value = int(self.values[key] if self.is_alive(key) else 0) + int(amount)
+        self.values[key] = str(value).encode()
+        return value
+
+    def ttl(self, key: bytes) -> RESPValue:
+        if not self.is_alive(key):
+            return -2
+        expires_at = self.expiry.get(key)
+        return -1 if expires_at is None else math.ceil(expires_at - time())
+
+    def list_value(self, key: bytes) -> list[bytes]:
+        if not self.is_alive(key):
+            self.values[key] = []
+        return self.values[key]  # type: ignore[no-any-return]
+
+    def rpush(self, key: bytes, *elements: bytes) -> RESPValue:
+        list_value = self.list_value(key)
+        list_value.extend(elements)
+        return len(list_value)
+
+    def lpop(self, key: bytes, count: bytes | None = None) -> RESPValue:
+        list_value = self.list_value(key)
+        if len(list_value) == 0:
+            return None
+        popped = list_value[: 1 if count is None else int(count)]
+        del list_value[: len(popped)]
+        return popped[0] if count is None else popped
+
+    def llen(self, key: bytes) -> RESPValue:
+        return len(self.list_value(key))
+
+    @staticmethod
+    def build_range(start: bytes, stop: bytes) -> slice:
+        stop_index = int(stop)
+        return slice(int(start), None if stop_index == -1 else stop_index + 1)
+
+    def lrange(self, key: bytes, start: bytes, stop: bytes) -> RESPValue:
+        return self.list_value(key)[self.build_range(start, stop)]
+
+    def ltrim(self, key: bytes, start: bytes, stop: bytes) -> RESPValue:
+        list_value = self.list_value(key)
+        list_value[:] = list_value[self.build_range(start, stop)]
+        return OK
+
+    def sorted_set(self, key: bytes) -> dict[bytes, float]:
+        if not self.is_alive(key):
+            self.values[key] = {}
+        return self.values[key]  # type: ignore[no-any-return]
+
+    def zadd(self, key: bytes, *options_and_scores_and_members: bytes) -> RESPValue:
+        only_new = options_and_scores_and_members[0].upper() == b"NX"
+        scores_and_members = options_and_scores_and_members[int(only_new) :]
+        sorted_set = self.sorted_set(key)
+        added = 0
+        for score, member in zip(
+            scores_and_members[::2], scores_and_members[1::2], strict=True
+        ):
+            if only_new and member in sorted_set:
+                continue
+            added += member not in sorted_set
+            sorted_set[member] = float(score)
+        return added
+
+    def zrem(self, key: bytes, *members: bytes) -> RESPValue:
+        sorted_set = self.sorted_set(key)
+        return len(
+            [sorted_set.pop(member) for member in members if member in sorted_set]
+        )
+
+    def zrange(self, key: bytes, start: bytes, stop: bytes) -> RESPValue:
+        members = sorted(self.sorted_set(key).items(), key=lambda item: item[1])
+        stop_index = int(stop)
+        return [
+            member
+            for member, _ in members[
+                int(start) : None if stop_index == -1 else stop_index + 1
+            ]
+        ]
+
+    def zrangebyscore(self, key: bytes, minimum: bytes, maximum: bytes) -> RESPValue:
+        members = sorted(self.sorted_set(key).items(), key=lambda item: item[1])
+        return [
+            member
+            for member, score in members
+            if float(minimum) <= score <= float(maximum)
+        ]
+
+    def zremrangebyscore(self, key: bytes, minimum: bytes, maximum: bytes) -> RESPValue:
+        sorted_set = self.sorted_set(key)
+        removed = [
+            member
+            for member, score in sorted_set.items()
+            if float(minimum) <= score <= float(maximum)
+        ]
+        for member in removed:
+            sorted_set.pop(member)
+        return len(removed)
+
+    def execute(self, name: bytes, *args: bytes) -> RESPValue:
+        command = self.commands.get(name.upper())
+        if command is None:
+            raise RESPError(f"ERR unknown command '{name.decode()}'")
+        return command(*args)
+
+    @classmethod
+    def encode(cls, value: RESPValue) -> bytes:  # noqa: WPS212  # RESP types
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, list):
+            return b"*%d\r\n" % len(value) + b"".join(map(cls.encode, value))
+        if isinstance(value, SimpleString):
+            return b"+%b\r\n" % value
+        return b"$%d\r\n%b\r\n" % (len(value), value)
+
+    async def handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        while not reader.at_eof():
+            header = await reader.readline()
+            if not header.startswith(b"*"):
+                break
+            arguments = []
+            for _ in range(int(header[1:])):
+                length = int((await reader.readline())[1:])
+                arguments.append((await reader.readexactly(length + 2))[:-2])
+            try:
+                writer.write(self.encode(self.execute(*arguments)))
+            except RESPError as e:
+                writer.write(f"-{e}\r\n".encode())
+            await writer.drain()
+        writer.close()
+
+    @asynccontextmanager
+    async def serve(self, host: str = "127.0.0.1") -> AsyncIterator[str]:
+        server = await asyncio.start_server(self.handle_connection, host, port=0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            yield f"redis://{host}:{port}/0"
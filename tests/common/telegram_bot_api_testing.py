@@ -0,0 +1,98 @@
+import asyncio
+from collections import defaultdict, deque
+from time import monotonic
+from typing import Any
+
+from aiogram.exceptions import (
+    TelegramForbiddenError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+from aiogram.methods import SendMessage, TelegramMethod
+
+
+class TelegramBotAPIStandIn:
+    """
+    Stand-in for the Bot API, meant to replace `Bot.__call__` (through
+    `MockedBot.call_mock.side_effect`) in tests & load tests of delivery.
+    Enforces global and per-chat limits the same way telegram does: requests
+    over the limit are rejected with flood control (retry_after).
+    Also simulates latency, blocked chats and transient server errors
+    """
+
+    def __init__(
+        self,
+        global_limit: int = 30,
+        chat_limit: int = 1,
+        window: float = 1,
+        latency: float = 0,
+        retry_after: int = 1,
+    ) -> None:
+        self.global_limit = global_limit
+        self.chat_limit = chat_limit
+        self.window = window
+        self.latency = latency
+        self.retry_after = retry_after
+
+        self.blocked_chat_ids: set[int] = set()
+        self.chat_id_to_failures: dict[int, int] = defaultdict(int)
+        self.forced_flood_control_count: int = 0
+
+        self.global_sent_at: deque[float] = deque()
+        self.chat_id_to_sent_at: dict[int, deque[float]] = defaultdict(deque)
+        self.sent_messages: list[SendMessage] = []
+        self.flood_control_count: int = 0
+
+    def count_recent(self, sent_at: deque[float], now: float) -> int:
+        while sent_at and sent_at[0] <= now - self.window:
+            sent_at.popleft()
+        return len(sent_at)
+
+    def is_over_limit(self, chat_id: int, now: float) -> bool:
+        return (
+            self.count_recent(self.global_sent_at, now) >= self.global_limit
+            or self.count_recent(self.chat_id_to_sent_at[chat_id], now)
+            >= self.chat_limit
+        )
+
+    def check_send_message(self, method: SendMessage) -> None:
+        chat_id = int(method.chat_id)
+        if chat_id in self.blocked_chat_ids:
+            raise TelegramForbiddenError(
+                method=method, message="Forbidden: bot was blocked by the user"
+            )
+
+        if self.chat_id_to_failures[chat_id] > 0:
+            self.chat_id_to_failures[chat_id] -= 1
+            raise TelegramServerError(method=method, message="Bad Gateway")
+
+        now = monotonic()
+        if self.forced_flood_control_count > 0 or self.is_over_limit(chat_id, now):
+            self.forced_flood_control_count = max(
+                0, self.forced_flood_control_count - 1
+            )
+            self.flood_control_count += 1
+            raise TelegramRetryAfter(
+                method=method,
+                message=f"Too Many Requests: retry after {self.retry_after}",
+                retry_after=self.retry_after,
+            )
+
+        self.global_sent_at.append(now)
+        self.chat_id_to_sent_at[chat_id].append(now)
+        self.sent_messages.append(method)
+
+    async def __call__(
+        self, method: TelegramMethod[Any], request_timeout: int | None = None
+    ) -> Any:
+        await asyncio.sleep(self.latency)
+        if isinstance(method, SendMessage):
+            self.check_send_message(method)
+        return None
+
+    def list_chat_messages(self, chat_id: int) -> list[str]:
+        return [
+            message.text
+            for message in self.sent_messages
+            if int(message.chat_id) == chat_id
+        ]
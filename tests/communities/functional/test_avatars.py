@@ -1,10 +1,13 @@
 from collections.abc import AsyncIterator
+from io import BytesIO
 
 import pytest
 from faker import Faker
+from PIL import Image
 from starlette import status
 from starlette.testclient import TestClient
 
+from app.common.pillow_ext import IMAGE_VARIANT_SIZES
 from app.communities.models.communities_db import Community
 from tests.common.assert_contains_ext import assert_nodata_response, assert_response
 
@@ -16,12 +19,18 @@ async def image(faker: Faker) -> bytes:
     return faker.graphic_webp_file(raw=True)  # type: ignore[no-any-return]
 
 
+@pytest.fixture()
+async def broken_image(faker: Faker) -> bytes:
+    # passes the webp signature check, but can't be decoded
+    return b"RIFF\x00\x00\x00\x00WEBPVP8 " + faker.random.randbytes(100)
+
+
 @pytest.fixture()
 async def _create_avatar(community: Community, image: bytes) -> AsyncIterator[None]:
     with community.avatar_path.open("wb") as f:
         f.write(image)
     yield
-    community.avatar_path.unlink(missing_ok=True)
+    community.unlink_avatar()
 
 
 async def test_avatar_uploading(
@@ -38,7 +47,11 @@ async def test_avatar_uploading(
     with community.avatar_path.open("rb") as f:
         assert f.read() == image
 
-    community.avatar_path.unlink()
+    for size in IMAGE_VARIANT_SIZES:
+        with Image.open(community.build_avatar_variant_path(size)) as variant:
+            assert max(variant.size) <= size
+
+    community.unlink_avatar()
 
 
 async def test_avatar_uploading_wrong_format(
@@ -54,6 +67,33 @@ async def test_avatar_uploading_wrong_format(
     )
 
 
+@pytest.mark.usefixtures("_create_avatar")
+async def test_avatar_uploading_broken_image(
+    authorized_client: TestClient,
+    community: Community,
+    image: bytes,
+    broken_image: bytes,
+) -> None:
+    assert_response(
+        authorized_client.put(
+            f"/api/protected/community-service/communities/{community.id}/avatar/",
+            files={"avatar": ("avatar.webp", broken_image, "image/webp")},
+        ),
+        expected_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        expected_json={"detail": "Invalid image format"},
+    )
+
+    # the previous avatar is kept as is
+    with community.avatar_path.open("rb") as f:
+        assert f.read() == image
+    # and no temporary files are left behind
+    assert not any(
+        path.name.startswith(".")
+        and path.name.lstrip(".").startswith(f"{community.id}.")
+        for path in community.avatar_path.parent.iterdir()
+    )
+
+
 @pytest.mark.usefixtures("_create_avatar")
 async def test_avatar_replacing(
     faker: Faker, authorized_client: TestClient, community: Community
@@ -94,3 +134,78 @@ async def test_mub_community_deletion_with_avatar(
     )
 
     assert not community.avatar_path.is_file()
+
+
+@pytest.mark.parametrize(
+    "size",
+    [
+        pytest.param(None, id="original"),
+        pytest.param(64, id="variant"),
+    ],
+)
+@pytest.mark.usefixtures("_create_avatar")
+async def test_avatar_reading(
+    authorized_client: TestClient,
+    community: Community,
+    image: bytes,
+    size: int | None,
+) -> None:
+    response = assert_response(
+        authorized_client.get(
+            f"/api/protected/community-service/communities/{community.id}/avatar/",
+            params=None if size is None else {"size": size},
+        ),
+        expected_headers={"Content-Type": "image/webp"},
+        expected_json=None,
+    )
+
+    if size is None:
+        assert response.content == image
+    else:
+        assert (
+            response.content == community.build_avatar_variant_path(size).read_bytes()
+        )
+        with Image.open(BytesIO(response.content)) as variant:
+            assert max(variant.size) <= size
+
+
+@pytest.mark.parametrize(
+    "size",
+    [
+        pytest.param(None, id="original"),
+        pytest.param(64, id="variant"),
+    ],
+)
+async def test_avatar_reading_missing(
+    authorized_client: TestClient,
+    community: Community,
+    size: int | None,
+) -> None:
+    assert_response(
+        authorized_client.get(
+            f"/api/protected/community-service/communities/{community.id}/avatar/",
+            params=None if size is None else {"size": size},
+        ),
+        expected_code=status.HTTP_404_NOT_FOUND,
+        expected_json={"detail": "Avatar not found"},
+    )
+
+
+async def test_avatar_reading_broken_image(
+    authorized_client: TestClient,
+    community: Community,
+    broken_image: bytes,
+) -> None:
+    with community.avatar_path.open("wb") as f:
+        f.write(broken_image)
+
+    assert_response(
+        authorized_client.get(
+            f"/api/protected/community-service/communities/{community.id}/avatar/",
+            params={"size": 64},
+        ),
+        expected_code=status.HTTP_409_CONFLICT,
+        expected_json={"detail": "Avatar can't be resized"},
+    )
+
+    community.unlink_avatar()
@@ -0,0 +1,35 @@
+import pytest
+from starlette import status
+from starlette.testclient import TestClient
+
+from app.communities.models.participants_db import Participant
+from tests.common.assert_contains_ext import assert_response
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_listing_community_participant_user_ids(
+    internal_client: TestClient,
+    participant: Participant,
+) -> None:
+    assert_response(
+        internal_client.get(
+            "/internal/community-service"
+            f"/communities/{participant.community_id}/participants/user-ids/",
+        ),
+        expected_json=[participant.user_id],
+    )
+
+
+async def test_listing_community_participant_user_ids_community_not_found(
+    internal_client: TestClient,
+    deleted_community_id: int,
+) -> None:
+    assert_response(
+        internal_client.get(
+            "/internal/community-service"
+            f"/communities/{deleted_community_id}/participants/user-ids/",
+        ),
+        expected_code=status.HTTP_404_NOT_FOUND,
+        expected_json={"detail": "Community not found"},
+    )
@@ -0,0 +1,127 @@
+import asyncio
+import multiprocessing
+from collections.abc import AsyncIterator, Callable, Iterator
+from multiprocessing.context import SpawnProcess
+
+import anyio
+import pytest
+from redis.asyncio import Redis
+
+from app.communities.store import UserSidsRegistry
+from tests.common.redis_testing import RedisStandIn
+
+pytestmark = pytest.mark.anyio
+
+HEARTBEAT_INTERVAL: float = 0.1
+EXPIRY_TIMEOUT: int = 1
+
+SpawnWorker = Callable[[int, str], SpawnProcess]
+
+
+def run_worker(redis_url: str, user_id: int, sid: str) -> None:
+    async def connect_and_heartbeat() -> None:
+        async with Redis.from_url(redis_url) as redis:
+            registry = UserSidsRegistry(redis=redis, expiry_timeout=EXPIRY_TIMEOUT)
+            await registry.add(user_id, sid)
+            await registry.run_heartbeats(HEARTBEAT_INTERVAL)
+
+    asyncio.run(connect_and_heartbeat())
+
+
+@pytest.fixture()
+async def redis_url() -> AsyncIterator[str]:
+    async with RedisStandIn().serve() as url:
+        yield url
+
+
+@pytest.fixture()
+async def registry(redis_url: str) -> AsyncIterator[UserSidsRegistry]:
+    async with Redis.from_url(redis_url) as redis:
+        yield UserSidsRegistry(redis=redis, expiry_timeout=EXPIRY_TIMEOUT)
+
+
+@pytest.fixture()
+def spawn_worker(redis_url: str) -> Iterator[SpawnWorker]:
+    processes: list[SpawnProcess] = []
+
+    def spawn_worker_inner(user_id: int, sid: str) -> SpawnProcess:
+        process = multiprocessing.get_context("spawn").Process(
+            target=run_worker,
+            args=(redis_url, user_id, sid),
+            daemon=True,
+        )
+        process.start()
+        processes.append(process)
+        return process
+
+    yield spawn_worker_inner
+
+    for process in processes:
+        process.kill()
+
+
+async def wait_for_sids(
+    registry: UserSidsRegistry,
+    user_id: int,
+    expected_sids: set[str],
+) -> None:
+    with anyio.fail_after(30):
+        while await registry.list_sids(user_id) != expected_sids:  # noqa: ASYNC110
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+
+async def test_sids_shared_between_processes(
+    registry: UserSidsRegistry,
+    spawn_worker: SpawnWorker,
+) -> None:
+    spawn_worker(1, "first")
+    spawn_worker(1, "second")
+    spawn_worker(2, "third")
+
+    await wait_for_sids(registry, 1, {"first", "second"})
+    await wait_for_sids(registry, 2, {"third"})
+
+
+async def test_sids_kept_alive_by_heartbeats(
+    registry: UserSidsRegistry,
+    spawn_worker: SpawnWorker,
+) -> None:
+    spawn_worker(1, "first")
+    await wait_for_sids(registry, 1, {"first"})
+
+    await asyncio.sleep(EXPIRY_TIMEOUT * 2)
+    assert await registry.list_sids(1) == {"first"}
+
+
+async def test_sids_of_dead_process_expire(
+    registry: UserSidsRegistry,
+    spawn_worker: SpawnWorker,
+) -> None:
+    dead_process = spawn_worker(1, "first")
+    spawn_worker(1, "second")
+    await wait_for_sids(registry, 1, {"first", "second"})
+
+    dead_process.kill()
+    await wait_for_sids(registry, 1, {"second"})
+
+
+async def test_removing_sids(registry: UserSidsRegistry) -> None:
+    await registry.add(1, "first")
+    await registry.add(1, "second")
+
+    await registry.remove(1, "first")
+
+    assert await registry.list_sids(1) == {"second"}
+    assert registry.local_user_id_to_sids == {1: {"second"}}
+
+
+async def test_local_registry_without_redis() -> None:
+    registry = UserSidsRegistry(redis=None, expiry_timeout=EXPIRY_TIMEOUT)
+    await registry.add(1, "first")
+    await registry.heartbeat()
+
+    assert await registry.list_sids(1) == {"first"}
+
+    await registry.remove(1, "first")
+    assert await registry.list_sids(1) == set()
+    assert registry.local_user_id_to_sids == {}
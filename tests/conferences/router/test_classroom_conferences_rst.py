@@ -1,22 +1,20 @@
-import random
 from unittest.mock import AsyncMock
 
 import pytest
 from faker import Faker
 from livekit.protocol.models import Room
-from respx import MockRouter
 from starlette import status
 from starlette.testclient import TestClient
 
-from app.common.config import settings
 from app.common.schemas.notifications_sch import (
     ClassroomNotificationPayloadSchema,
+    ClassroomStudentsAudienceSchema,
+    NotificationAudienceKind,
     NotificationInputSchema,
     NotificationKind,
 )
 from tests.common.assert_contains_ext import assert_nodata_response, assert_response
 from tests.common.mock_stack import MockStack
-from tests.common.respx_ext import assert_last_httpx_request
 from tests.conferences.conftest import ClassroomRoleType
 from tests.conferences.factories import ConferenceParticipantFactory
 
@@ -25,7 +23,6 @@ pytestmark = pytest.mark.anyio
 
 async def test_classroom_conference_reactivation(
     mock_stack: MockStack,
-    classrooms_respx_mock: MockRouter,
     send_notification_mock: AsyncMock,
     outsider_client: TestClient,
     classroom_id: int,
@@ -35,11 +32,6 @@ async def test_classroom_conference_reactivation(
         "app.conferences.services.conferences_svc.reactivate_room"
     )
 
-    recipient_user_ids = random.choices(list(range(100)), k=random.randint(2, 10))
-    classroom_bridge_mock = classrooms_respx_mock.get(
-        path=f"/classrooms/{classroom_id}/students/"
-    ).respond(json=recipient_user_ids)
-
     assert_nodata_response(
         outsider_client.post(
             "/api/protected/conference-service/roles/tutor"
@@ -53,50 +45,13 @@ async def test_classroom_conference_reactivation(
                 kind=NotificationKind.CLASSROOM_CONFERENCE_STARTED_V1,
                 classroom_id=classroom_id,
             ),
-            recipient_user_ids=recipient_user_ids,
+            recipient_audience=ClassroomStudentsAudienceSchema(
+                kind=NotificationAudienceKind.CLASSROOM_STUDENTS,
+                classroom_id=classroom_id,
+            ),
         )
     )
 
-    assert_last_httpx_request(
-        classroom_bridge_mock,
-        expected_headers={"X-Api-Key": settings.api_key},
-    )
-
-    conferences_svc_mock.assert_awaited_once_with(
-        livekit_room_name=classroom_conference_room_name
-    )
-
-
-async def test_classroom_conference_reactivation_no_students(
-    mock_stack: MockStack,
-    classrooms_respx_mock: MockRouter,
-    send_notification_mock: AsyncMock,
-    outsider_client: TestClient,
-    classroom_id: int,
-    classroom_conference_room_name: str,
-) -> None:
-    conferences_svc_mock = mock_stack.enter_async_mock(
-        "app.conferences.services.conferences_svc.reactivate_room"
-    )
-
-    classroom_bridge_mock = classrooms_respx_mock.get(
-        path=f"/classrooms/{classroom_id}/students/"
-    ).respond(json=[])
-
-    assert_nodata_response(
-        outsider_client.post(
-            "/api/protected/conference-service/roles/tutor"
-            f"/classrooms/{classroom_id}/conference/",
-        ),
-    )
-
-    send_notification_mock.assert_not_called()
-
-    assert_last_httpx_request(
-        classroom_bridge_mock,
-        expected_headers={"X-Api-Key": settings.api_key},
-    )
-
     conferences_svc_mock.assert_awaited_once_with(
         livekit_room_name=classroom_conference_room_name
     )
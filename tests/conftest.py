@@ -33,6 +33,7 @@ pytest_plugins = (
     "tests.common.id_provider",
     "tests.common.livekit_testing",
     "tests.common.mock_stack",
+    "tests.common.query_budget",
     "tests.common.respx_ext",
 )
 
@@ -141,6 +142,21 @@ def send_notification_mock(mock_stack: MockStack) -> AsyncMock:
     return mock_stack.enter_async_mock(NotificationsBridge, "send_notification")
 
 
+@pytest.fixture()
+def send_notifications_mock(mock_stack: MockStack) -> AsyncMock:
+    return mock_stack.enter_async_mock(NotificationsBridge, "send_notifications")
+
+
+@pytest.fixture()
+def send_telegram_messages_mock(mock_stack: MockStack) -> AsyncMock:
+    return mock_stack.enter_async_mock(NotificationsBridge, "send_telegram_messages")
+
+
+@pytest.fixture()
+def send_email_messages_mock(mock_stack: MockStack) -> AsyncMock:
+    return mock_stack.enter_async_mock(PochtaBridge, "send_email_messages")
+
+
 @pytest.fixture()
 def send_email_message_mock(mock_stack: MockStack) -> AsyncMock:
     return mock_stack.enter_async_mock(PochtaBridge, "send_email_message")
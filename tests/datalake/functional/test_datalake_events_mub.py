@@ -1,10 +1,18 @@
 from unittest.mock import AsyncMock
 
 import pytest
+from faststream.redis import RedisBroker
 from starlette.testclient import TestClient
 
+from app.common.config import settings
+from app.common.faststream_ext import StreamConsumerStatsSchema
 from app.common.schemas.datalake_sch import DatalakeEventInputSchema
-from tests.common.assert_contains_ext import assert_nodata_response
+from app.datalake.routes.datalake_events_sub import datalake_events_consumer_stats
+from tests.common.assert_contains_ext import (
+    assert_nodata_response,
+    assert_response,
+)
+from tests.common.mock_stack import MockStack
 from tests.datalake import factories
 
 pytestmark = pytest.mark.anyio
@@ -24,3 +32,44 @@ async def test_queueing_datalake_event_recording(
     )
 
     record_datalake_event_mock.assert_awaited_once_with(input_data)
+
+
+async def test_retrieving_datalake_events_consumer_lag(
+    mub_client: TestClient,
+    mock_stack: MockStack,
+    faststream_broker: RedisBroker,
+) -> None:
+    xinfo_groups_mock = mock_stack.enter_async_mock(
+        faststream_broker.config.broker_config.connection.client,
+        "xinfo_groups",
+        return_value=[
+            {
+                "name": b"datalake-service",
+                "consumers": 2,
+                "pending": 3,
+                "last-delivered-id": b"1700000000000-0",
+                "entries-read": 10,
+                "lag": 7,
+            }
+        ],
+    )
+    datalake_events_consumer_stats.stats = StreamConsumerStatsSchema()
+
+    assert_response(
+        mub_client.get("/mub/datalake-service/datalake-events/consumer-lag/"),
+        expected_json={
+            "group": {
+                "stream_name": settings.datalake_events_record_stream_name,
+                "group_name": "datalake-service",
+                "consumer_count": 2,
+                "pending_count": 3,
+                "lag": 7,
+                "last_delivered_id": "1700000000000-0",
+            },
+            "instance": {"batch_count": 0, "message_count": 0},
+        },
+    )
+
+    xinfo_groups_mock.assert_awaited_once_with(
+        settings.datalake_events_record_stream_name
+    )
@@ -1,13 +1,19 @@
+from unittest.mock import ANY
 from uuid import UUID
 
 import pytest
 from pydantic_marshals.contains import assert_contains
 
 from app.common.config_bdg import datalake_bridge
+from app.common.faststream_ext import StreamConsumerStatsSchema
 from app.common.schemas.datalake_sch import DatalakeEventInputSchema
 from app.datalake.models.datalake_events_db import DatalakeEvent
-from app.datalake.routes.datalake_events_sub import record_datalake_event
+from app.datalake.routes.datalake_events_sub import (
+    datalake_events_consumer_stats,
+    record_datalake_events,
+)
 from tests.common.active_session import ActiveSession
+from tests.common.mock_stack import MockStack
 from tests.datalake import factories
 
 pytestmark = pytest.mark.anyio
@@ -18,12 +24,12 @@ async def test_datalake_event_recording(
 ) -> None:
     input_data: DatalakeEventInputSchema = factories.DatalakeEventInputFactory.build()
 
-    record_datalake_event.mock.reset_mock()
+    record_datalake_events.mock.reset_mock()
 
     await datalake_bridge.record_datalake_event(data=input_data)
 
-    record_datalake_event.mock.assert_called_once_with(
-        input_data.model_dump(mode="json")
+    record_datalake_events.mock.assert_called_once_with(
+        [input_data.model_dump(mode="json")]
     )
 
     async with active_session():
@@ -39,3 +45,65 @@ async def test_datalake_event_recording(
             },
         )
         await datalake_event.delete()
+
+
+async def test_datalake_events_batch_recording(
+    active_session: ActiveSession,
+) -> None:
+    input_data: list[DatalakeEventInputSchema] = (
+        factories.DatalakeEventInputFactory.batch(size=3)
+    )
+
+    datalake_events_consumer_stats.stats = StreamConsumerStatsSchema()
+
+    async with active_session():
+        await record_datalake_events(input_data)
+
+    assert_contains(
+        datalake_events_consumer_stats.stats,
+        {
+            "batch_count": 1,
+            "message_count": len(input_data),
+            "last_batch_size": len(input_data),
+            "last_batch_delay_ms": float,
+        },
+    )
+
+    async with active_session():
+        for event_data in input_data:
+            datalake_event = await DatalakeEvent.find_first_by_kwargs(
+                recorded_at=event_data.recorded_at
+            )
+            assert datalake_event is not None
+            assert_contains(
+                datalake_event,
+                {"kind": event_data.kind, "user_id": event_data.user_id},
+            )
+            await datalake_event.delete()
+
+
+async def test_datalake_events_batch_recording_invalid_event(
+    mock_stack: MockStack,
+    active_session: ActiveSession,
+) -> None:
+    input_data: list[DatalakeEventInputSchema] = (
+        factories.DatalakeEventInputFactory.batch(size=2)
+    )
+    dead_letter_stream_entry_mock = mock_stack.enter_mock(
+        "app.datalake.routes.datalake_events_sub.dead_letter_stream_entry"
+    )
+
+    async with active_session():
+        await record_datalake_events(
+            [input_data[0].model_dump(mode="json"), {"kind": "invalid"}, input_data[1]]
+        )
+
+    dead_letter_stream_entry_mock.assert_called_once_with(1, ANY)
+
+    async with active_session():
+        for event_data in input_data:
+            datalake_event = await DatalakeEvent.find_first_by_kwargs(
+                recorded_at=event_data.recorded_at
+            )
+            assert datalake_event is not None
+            await datalake_event.delete()
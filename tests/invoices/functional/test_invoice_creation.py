@@ -1,5 +1,5 @@
 from random import randint
-from unittest.mock import AsyncMock, call
+from unittest.mock import AsyncMock
 
 import pytest
 from freezegun import freeze_time
@@ -28,6 +28,7 @@ pytestmark = pytest.mark.anyio
 
 
 @freeze_time()
+@pytest.mark.query_budget(statements=3, max_repeats=1)
 @pytest.mark.parametrize(
     ("include_all_students", "expected_recipient_invoice_count"),
     [
@@ -37,7 +38,7 @@ pytestmark = pytest.mark.anyio
 )
 async def test_invoice_creation(
     active_session: ActiveSession,
-    send_notification_mock: AsyncMock,
+    send_notifications_mock: AsyncMock,
     classrooms_respx_mock: MockRouter,
     tutor_client: TestClient,
     tutor_id: int,
@@ -120,18 +121,19 @@ async def test_invoice_creation(
 
         await invoice.delete()
 
-    send_notification_mock.assert_has_awaits(
+    send_notifications_mock.assert_awaited_once_with(
         [
-            call(
-                NotificationInputSchema(
-                    payload=RecipientInvoiceNotificationPayloadSchema(
-                        kind=NotificationKind.RECIPIENT_INVOICE_CREATED_V1,
-                        recipient_invoice_id=recipient_invoice.id,
-                    ),
-                    recipient_user_ids=[recipient_invoice.student_id],
-                )
+            NotificationInputSchema(
+                payload=RecipientInvoiceNotificationPayloadSchema(
+                    kind=NotificationKind.RECIPIENT_INVOICE_CREATED_V1,
+                    recipient_invoice_id=recipient_invoice.id,
+                ),
+                recipient_user_ids=[recipient_invoice.student_id],
+            )
+            for recipient_invoice in sorted(
+                student_id_to_recipient_invoice.values(),
+                key=lambda recipient_invoice: recipient_invoice.id,
             )
-            for recipient_invoice in student_id_to_recipient_invoice.values()
         ]
     )
 
@@ -0,0 +1,201 @@
+import json
+import os
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+import pytest
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.common.config import engine
+from app.notifications.models.notifications_db import (
+    Notification,
+    NotificationCursorSchema,
+    NotificationSearchRequestSchema,
+)
+from app.notifications.models.recipient_notifications_db import RecipientNotification
+from tests.common.id_provider import IDProvider
+from tests.notifications import factories
+
+# Opt-in, as filling the inbox takes a while: BENCHMARK_INBOX_SIZE=1000000
+BENCHMARK_INBOX_SIZE = int(os.getenv("BENCHMARK_INBOX_SIZE", "0"))
+UNREAD_RATIO = 0.1
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(BENCHMARK_INBOX_SIZE == 0, reason="benchmarks are opt-in"),
+]
+
+
+async def fill_inbox(connection: AsyncConnection, recipient_user_id: int) -> None:
+    payload = factories.NotificationSimpleInputFactory.build().payload
+    await connection.execute(
+        text(
+            f"""
+            WITH inserted AS (
+                INSERT INTO {Notification.__table__.fullname} (id, created_at, payload)
+                SELECT
+                    gen_random_uuid(),
+                    -- pairs share created_at to exercise the tie-breaker
+                    now() - make_interval(secs => i / 2),
+                    CAST(:payload AS JSON)
+                FROM generate_series(1, :size) AS i
+                RETURNING id, created_at
+            )
+            INSERT INTO {RecipientNotification.__table__.fullname}
+                (notification_id, recipient_user_id, created_at, kind, read_at)
+            SELECT
+                id,
+                :recipient_user_id,
+                created_at,
+                :kind,
+                CASE WHEN random() < :unread_ratio THEN NULL ELSE created_at END
+            FROM inserted
+            """  # noqa: S608  # table names are not user input
+        ),
+        {
+            "payload": payload.model_dump_json(),
+            "size": BENCHMARK_INBOX_SIZE,
+            "recipient_user_id": recipient_user_id,
+            "kind": payload.kind,
+            "unread_ratio": UNREAD_RATIO,
+        },
+    )
+    await connection.execute(
+        text(f"ANALYZE {RecipientNotification.__table__.fullname}")
+    )
+
+
+async def clear_inbox(connection: AsyncConnection, recipient_user_id: int) -> None:
+    await connection.execute(
+        text(
+            f"""
+            DELETE FROM {Notification.__table__.fullname}
+            WHERE id IN (
+                SELECT notification_id
+                FROM {RecipientNotification.__table__.fullname}
+                WHERE recipient_user_id = :recipient_user_id
+            )
+            """  # noqa: S608  # table names are not user input
+        ),
+        {"recipient_user_id": recipient_user_id},
+    )
+
+
+@pytest.fixture(scope="module")
+def inbox_user_id() -> int:
+    return IDProvider().generate_id()
+
+
+@pytest.fixture(scope="module")
+async def inbox_connection(inbox_user_id: int) -> AsyncIterator[AsyncConnection]:
+    async with engine.connect() as connection:
+        await fill_inbox(connection, inbox_user_id)
+        await connection.commit()
+        try:
+            yield connection
+        finally:
+            await connection.rollback()
+            await clear_inbox(connection, inbox_user_id)
+            await connection.commit()
+
+
+def iter_plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for subplan in plan.get("Plans", []):
+        yield from iter_plan_nodes(subplan)
+
+
+async def explain_analyze(
+    connection: AsyncConnection, stmt: Select[Any]
+) -> tuple[float, list[dict[str, Any]]]:
+    compiled = stmt.compile(dialect=connection.dialect)
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {compiled.string}",
+        compiled.params,
+    )
+    explained = result.scalar_one()
+    if isinstance(explained, str):
+        explained = json.loads(explained)
+    return explained[0]["Execution Time"], list(iter_plan_nodes(explained[0]["Plan"]))
+
+
+async def find_middle_cursor(
+    connection: AsyncConnection, recipient_user_id: int
+) -> NotificationCursorSchema:
+    row = (
+        await connection.execute(
+            text(
+                f"""
+                SELECT created_at, notification_id
+                FROM {RecipientNotification.__table__.fullname}
+                WHERE recipient_user_id = :recipient_user_id
+                ORDER BY created_at DESC, notification_id DESC
+                OFFSET :offset LIMIT 1
+                """  # noqa: S608  # table names are not user input
+            ),
+            {
+                "recipient_user_id": recipient_user_id,
+                "offset": BENCHMARK_INBOX_SIZE // 2,
+            },
+        )
+    ).one()
+    created_at: datetime = row.created_at
+    notification_id: UUID = row.notification_id
+    return NotificationCursorSchema(
+        created_at=created_at, notification_id=notification_id
+    )
+
+
+@pytest.mark.parametrize("deep", [False, True], ids=["first_page", "middle_page"])
+async def test_inbox_page_benchmark(
+    inbox_connection: AsyncConnection,
+    inbox_user_id: int,
+    deep: bool,
+) -> None:
+    search_params = NotificationSearchRequestSchema(
+        cursor=(
+            await find_middle_cursor(inbox_connection, inbox_user_id) if deep else None
+        ),
+        limit=12,
+    )
+
+    execution_time, plan_nodes = await explain_analyze(
+        inbox_connection,
+        RecipientNotification.select_paginated_by_recipient_user_id(
+            recipient_user_id=inbox_user_id, search_params=search_params
+        ),
+    )
+    print(  # noqa: WPS421  # benchmark report
+        f"inbox page ({'middle' if deep else 'first'}) of {BENCHMARK_INBOX_SIZE} "
+        f"notifications: {execution_time:.3f} ms"
+    )
+
+    assert not any(node["Node Type"] == "Sort" for node in plan_nodes)
+    assert any(
+        node.get("Index Name") == "recipient_notifications_inbox_index"
+        for node in plan_nodes
+    )
+
+
+async def test_unread_count_benchmark(
+    inbox_connection: AsyncConnection,
+    inbox_user_id: int,
+) -> None:
+    execution_time, plan_nodes = await explain_analyze(
+        inbox_connection,
+        RecipientNotification.select_unread_counts_by_recipient_user_ids(
+            recipient_user_ids=[inbox_user_id]
+        ),
+    )
+    print(  # noqa: WPS421  # benchmark report
+        f"unread count of {BENCHMARK_INBOX_SIZE} notifications: "
+        f"{execution_time:.3f} ms"
+    )
+
+    assert any(
+        node.get("Index Name") == "recipient_notifications_unread_index"
+        for node in plan_nodes
+    )
@@ -114,6 +114,8 @@ async def recipient_notification(
         return await RecipientNotification.create(
             notification=notification,
             recipient_user_id=authorized_user_id,
+            created_at=notification.created_at,
+            kind=notification.payload.kind,
         )
 
 
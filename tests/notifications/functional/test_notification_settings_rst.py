@@ -1,20 +1,29 @@
 import pytest
+from starlette import status
 from starlette.testclient import TestClient
 
+from app.common.config import settings
 from app.common.dependencies.authorization_dep import ProxyAuthData
 from app.common.schemas.user_contacts_sch import UserContactKind
+from app.notifications.models.email_connections_db import EmailConnection
 from app.notifications.models.telegram_connections_db import (
     TelegramConnection,
     TelegramConnectionStatus,
 )
 from app.notifications.models.user_contacts_db import UserContact
+from app.notifications.services.email_digests_svc import EmailNotificationDigests
 from tests.common.active_session import ActiveSession
 from tests.common.assert_contains_ext import assert_response
+from tests.common.mock_stack import MockStack
 from tests.common.types import AnyJSON
 from tests.notifications.factories import UserContactInputFactory
 
 pytestmark = pytest.mark.anyio
 
+NOTIFICATION_SETTINGS_PATH = (
+    "/api/protected/notification-service/users/current/notification-settings/"
+)
+
 
 @pytest.mark.parametrize(
     ("has_telegram_connection", "has_personal_telegram_contact"),
@@ -78,3 +87,92 @@ async def test_retrieving_notification_settings(
             user_id=proxy_auth_data.user_id,
             kind=UserContactKind.PERSONAL_TELEGRAM,
         )
+
+
+async def test_retrieving_email_notification_settings(
+    authorized_client: TestClient,
+    email_connection: EmailConnection,
+) -> None:
+    assert_response(
+        authorized_client.get(NOTIFICATION_SETTINGS_PATH),
+        expected_json={
+            "email": {"digest_window_minutes": 0},
+            "telegram": None,
+        },
+    )
+
+
+async def test_updating_email_notification_settings(
+    active_session: ActiveSession,
+    mock_stack: MockStack,
+    authorized_client: TestClient,
+    email_connection: EmailConnection,
+) -> None:
+    mock_stack.enter_mock(EmailNotificationDigests, "is_available", property_value=True)
+
+    assert_response(
+        authorized_client.patch(
+            f"{NOTIFICATION_SETTINGS_PATH}email/",
+            json={"digest_window_minutes": 30},
+        ),
+        expected_json={"digest_window_minutes": 30},
+    )
+
+    async with active_session() as session:
+        session.add(email_connection)
+        await session.refresh(email_connection)
+        assert email_connection.digest_window_minutes == 30
+
+
+async def test_updating_email_notification_settings_digests_not_available(
+    active_session: ActiveSession,
+    mock_stack: MockStack,
+    authorized_client: TestClient,
+    email_connection: EmailConnection,
+) -> None:
+    mock_stack.enter_mock(
+        EmailNotificationDigests, "is_available", property_value=False
+    )
+
+    assert_response(
+        authorized_client.patch(
+            f"{NOTIFICATION_SETTINGS_PATH}email/",
+            json={"digest_window_minutes": 30},
+        ),
+        expected_code=status.HTTP_409_CONFLICT,
+        expected_json={"detail": "Email digests are not available"},
+    )
+
+    async with active_session() as session:
+        session.add(email_connection)
+        await session.refresh(email_connection)
+        assert email_connection.digest_window_minutes == 0
+
+
+async def test_updating_email_notification_settings_window_too_long(
+    authorized_client: TestClient,
+    email_connection: EmailConnection,
+) -> None:
+    assert_response(
+        authorized_client.patch(
+            f"{NOTIFICATION_SETTINGS_PATH}email/",
+            json={
+                "digest_window_minutes": settings.email_digests.max_window_minutes + 1
+            },
+        ),
+        expected_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        expected_json={"detail": [{"loc": ["body", "digest_window_minutes"]}]},
+    )
+
+
+async def test_updating_email_notification_settings_email_connection_not_found(
+    authorized_client: TestClient,
+) -> None:
+    assert_response(
+        authorized_client.patch(
+            f"{NOTIFICATION_SETTINGS_PATH}email/",
+            json={"digest_window_minutes": 30},
+        ),
+        expected_code=status.HTTP_404_NOT_FOUND,
+        expected_json={"detail": "Email connection not found"},
+    )
@@ -1,10 +1,18 @@
+from typing import Any
 from unittest.mock import AsyncMock
 
 import pytest
+from faststream.redis import RedisBroker
 from starlette.testclient import TestClient
 
+from app.common.config import settings
+from app.common.faststream_ext import StreamConsumerStatsSchema
 from app.common.schemas.notifications_sch import NotificationInputSchema
-from tests.common.assert_contains_ext import assert_nodata_response
+from app.notifications.routes.notifications_sub import notifications_consumer_stats
+from app.notifications.routes.telegram_messages_sub import (
+    telegram_messages_consumer_stats,
+)
+from tests.common.assert_contains_ext import assert_nodata_response, assert_response
 from tests.common.mock_stack import MockStack
 from tests.notifications import factories
 
@@ -30,3 +38,63 @@ async def test_queueing_notification_sending(
     )
 
     send_notification_mock.assert_awaited_once_with(input_data)
+
+
+async def test_retrieving_notifications_consumer_lag(
+    mub_client: TestClient,
+    mock_stack: MockStack,
+    faststream_broker: RedisBroker,
+) -> None:
+    xinfo_groups_mock = mock_stack.enter_async_mock(
+        faststream_broker.config.broker_config.connection.client,
+        "xinfo_groups",
+        return_value=[
+            {
+                "name": b"notification-service",
+                "consumers": 2,
+                "pending": 3,
+                "last-delivered-id": b"1700000000000-0",
+                "entries-read": 10,
+                "lag": 7,
+            }
+        ],
+    )
+    notifications_consumer_stats.stats = StreamConsumerStatsSchema()
+    telegram_messages_consumer_stats.stats = StreamConsumerStatsSchema()
+    notifications_consumer_stats.record_batch(
+        size=1, oldest_created_at=None, duration=0.1
+    )
+
+    def build_expected_group_lag(stream_name: str) -> dict[str, Any]:
+        return {
+            "stream_name": stream_name,
+            "group_name": "notification-service",
+            "consumer_count": 2,
+            "pending_count": 3,
+            "lag": 7,
+            "last_delivered_id": "1700000000000-0",
+        }
+
+    assert_response(
+        mub_client.get("/mub/notification-service/notifications/consumer-lag/"),
+        expected_json={
+            "platform": {
+                "group": build_expected_group_lag(
+                    settings.notifications_send_stream_name
+                ),
+                "instance": {
+                    "batch_count": 1,
+                    "message_count": 1,
+                    "last_batch_size": 1,
+                },
+            },
+            "telegram": {
+                "group": build_expected_group_lag(
+                    settings.telegram_messages_send_stream_name
+                ),
+                "instance": {"batch_count": 0, "message_count": 0},
+            },
+        },
+    )
+
+    assert xinfo_groups_mock.await_count == 2
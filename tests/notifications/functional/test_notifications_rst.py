@@ -11,10 +11,16 @@ from starlette import status
 from starlette.testclient import TestClient
 
 from app.common.utils.datetime import datetime_utc_now
+from app.communities.rooms import user_room
 from app.notifications.models.notifications_db import Notification
 from app.notifications.models.recipient_notifications_db import RecipientNotification
+from app.notifications.services.unread_counters_svc import (
+    unread_notifications_counters,
+)
 from tests.common.active_session import ActiveSession
 from tests.common.assert_contains_ext import assert_nodata_response, assert_response
+from tests.common.mock_stack import MockStack
+from tests.common.tmexio_testing import TMEXIOListenerFactory
 from tests.common.utils import remove_none_values
 from tests.notifications import factories
 
@@ -40,6 +46,8 @@ async def recipient_notifications(
                 await RecipientNotification.create(
                     notification=notification,
                     recipient_user_id=authorized_user_id,
+                    created_at=notification.created_at,
+                    kind=notification.payload.kind,
                     read_at=(
                         None
                         if i % 3 == 0
@@ -105,6 +113,56 @@ async def test_notification_listing(
     )
 
 
+async def test_notification_listing_same_created_at(
+    active_session: ActiveSession,
+    authorized_client: TestClient,
+    authorized_user_id: int,
+) -> None:
+    created_at = datetime_utc_now()
+    async with active_session():
+        notifications = [
+            await Notification.create(
+                payload=factories.NotificationSimpleInputFactory.build().payload,
+                created_at=created_at,
+            )
+            for _ in range(RECIPIENT_NOTIFICATIONS_LIST_SIZE)
+        ]
+        await RecipientNotification.create_many(
+            {
+                "notification_id": notification.id,
+                "recipient_user_id": authorized_user_id,
+                "created_at": created_at,
+                "kind": notification.payload.kind,
+            }
+            for notification in notifications
+        )
+
+    listed_notification_ids: list[str] = []
+    cursor: dict[str, str] | None = None
+    while True:  # noqa: WPS457  # paginating until the end
+        response = authorized_client.post(
+            "/api/protected/notification-service/users/current/notifications/searches/",
+            json=remove_none_values({"cursor": cursor, "limit": 2}),
+        )
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        if len(page) == 0:
+            break
+        listed_notification_ids.extend(item["notification"]["id"] for item in page)
+        cursor = {
+            "created_at": page[-1]["notification"]["created_at"],
+            "notification_id": page[-1]["notification"]["id"],
+        }
+
+    assert listed_notification_ids == sorted(
+        (str(notification.id) for notification in notifications), reverse=True
+    )
+
+    async with active_session():
+        for notification in notifications:
+            await notification.delete()
+
+
 @pytest.mark.parametrize(
     ("limit", "expected_count"),
     [
@@ -139,8 +197,14 @@ async def test_counting_unread_notifications(
 async def test_marking_notification_as_read(
     active_session: ActiveSession,
     authorized_client: TestClient,
+    authorized_user_id: int,
+    tmexio_listener_factory: TMEXIOListenerFactory,
     recipient_notification: RecipientNotification,
 ) -> None:
+    user_room_listener = await tmexio_listener_factory(
+        room_name=user_room(authorized_user_id)
+    )
+
     assert_nodata_response(
         authorized_client.post(
             "/api/protected/notification-service/users/current"
@@ -148,6 +212,12 @@ async def test_marking_notification_as_read(
         ),
     )
 
+    user_room_listener.assert_next_event(
+        expected_name="unread-notifications-count-changed",
+        expected_data={"unread_notifications_count": 0},
+    )
+    user_room_listener.assert_no_more_events()
+
     async with active_session() as session:
         session.add(recipient_notification)
         await session.refresh(recipient_notification)
@@ -175,6 +245,259 @@ async def test_marking_notification_as_read_already_marked_as_read(
     )
 
 
+async def test_marking_notification_as_read_concurrently_marked_as_read(
+    faker: Faker,
+    active_session: ActiveSession,
+    mock_stack: MockStack,
+    authorized_client: TestClient,
+    authorized_user_id: int,
+    tmexio_listener_factory: TMEXIOListenerFactory,
+    recipient_notification: RecipientNotification,
+) -> None:
+    user_room_listener = await tmexio_listener_factory(
+        room_name=user_room(authorized_user_id)
+    )
+    stale_recipient_notification = RecipientNotification(
+        notification_id=recipient_notification.notification_id,
+        recipient_user_id=recipient_notification.recipient_user_id,
+        read_at=None,
+    )
+    mock_stack.enter_async_mock(
+        RecipientNotification,
+        "find_first_by_ids",
+        return_value=stale_recipient_notification,
+    )
+    decrement_mock = mock_stack.enter_async_mock(
+        unread_notifications_counters, "decrement"
+    )
+
+    async with active_session() as session:
+        session.add(recipient_notification)
+        await session.refresh(recipient_notification)
+        recipient_notification.read_at = faker.past_datetime(tzinfo=timezone.utc)
+
+    assert_response(
+        authorized_client.post(
+            "/api/protected/notification-service/users/current"
+            f"/notifications/{recipient_notification.notification_id}/read/",
+        ),
+        expected_code=status.HTTP_409_CONFLICT,
+        expected_json={"detail": "Notification already marked as read"},
+    )
+
+    decrement_mock.assert_not_called()
+    user_room_listener.assert_no_more_events()
+
+
+@freeze_time()
+async def test_marking_all_notifications_as_read(
+    active_session: ActiveSession,
+    authorized_client: TestClient,
+    authorized_user_id: int,
+    tmexio_listener_factory: TMEXIOListenerFactory,
+    recipient_notifications: list[RecipientNotification],
+) -> None:
+    user_room_listener = await tmexio_listener_factory(
+        room_name=user_room(authorized_user_id)
+    )
+    recipient_notification_id_to_read_at = {
+        recipient_notification.notification_id: recipient_notification.read_at
+        for recipient_notification in recipient_notifications
+    }
+
+    assert_nodata_response(
+        authorized_client.post(
+            "/api/protected/notification-service/users/current/notifications/read/",
+        ),
+    )
+
+    user_room_listener.assert_next_event(
+        expected_name="unread-notifications-count-changed",
+        expected_data={"unread_notifications_count": 0},
+    )
+    user_room_listener.assert_no_more_events()
+
+    assert_response(
+        authorized_client.get(
+            "/api/protected/notification-service/users/current/unread-notifications-count/",
+        ),
+        expected_json=0,
+    )
+
+    async with active_session():
+        for recipient_notification in await RecipientNotification.find_all_by_kwargs(
+            recipient_user_id=authorized_user_id
+        ):
+            # notifications read before are left intact
+            assert recipient_notification.read_at == (
+                recipient_notification_id_to_read_at[
+                    recipient_notification.notification_id
+                ]
+                or datetime_utc_now()
+            )
+
+
+def count_unread(recipient_notifications: list[RecipientNotification]) -> int:
+    return sum(
+        recipient_notification.read_at is None
+        for recipient_notification in recipient_notifications
+    )
+
+
+async def assert_read_notifications(
+    active_session: ActiveSession,
+    recipient_notifications: list[RecipientNotification],
+    expected_read_notification_ids: set[UUID],
+) -> None:
+    async with active_session():
+        for recipient_notification in recipient_notifications:
+            updated_recipient_notification = (
+                await RecipientNotification.find_first_by_ids(
+                    notification_id=recipient_notification.notification_id,
+                    recipient_user_id=recipient_notification.recipient_user_id,
+                )
+            )
+            assert updated_recipient_notification is not None
+            if recipient_notification.notification_id in expected_read_notification_ids:
+                assert updated_recipient_notification.read_at is not None
+            else:
+                assert (
+                    updated_recipient_notification.read_at
+                    == recipient_notification.read_at
+                )
+
+
+@pytest.mark.parametrize(
+    "with_notification_id",
+    [
+        pytest.param(True, id="with_notification_id"),
+        pytest.param(False, id="without_notification_id"),
+    ],
+)
+async def test_marking_notifications_as_read_until_cursor(
+    active_session: ActiveSession,
+    authorized_client: TestClient,
+    authorized_user_id: int,
+    tmexio_listener_factory: TMEXIOListenerFactory,
+    recipient_notifications: list[RecipientNotification],
+    with_notification_id: bool,
+) -> None:
+    user_room_listener = await tmexio_listener_factory(
+        room_name=user_room(authorized_user_id)
+    )
+    offset = RECIPIENT_NOTIFICATIONS_LIST_SIZE // 2
+    cursor_notification = recipient_notifications[offset].notification
+
+    assert_nodata_response(
+        authorized_client.post(
+            "/api/protected/notification-service"
+            "/users/current/notifications/read-until/",
+            json=remove_none_values(
+                {
+                    "created_at": cursor_notification.created_at.isoformat(),
+                    "notification_id": (
+                        str(cursor_notification.id) if with_notification_id else None
+                    ),
+                }
+            ),
+        ),
+    )
+
+    user_room_listener.assert_next_event(
+        expected_name="unread-notifications-count-changed",
+        expected_data={
+            "unread_notifications_count": count_unread(recipient_notifications[:offset])
+        },
+    )
+    user_room_listener.assert_no_more_events()
+
+    await assert_read_notifications(
+        active_session=active_session,
+        recipient_notifications=recipient_notifications,
+        expected_read_notification_ids={
+            recipient_notification.notification_id
+            for recipient_notification in recipient_notifications[offset:]
+        },
+    )
+
+
+async def test_marking_notifications_as_read_by_ids(
+    active_session: ActiveSession,
+    authorized_client: TestClient,
+    authorized_user_id: int,
+    tmexio_listener_factory: TMEXIOListenerFactory,
+    recipient_notifications: list[RecipientNotification],
+) -> None:
+    user_room_listener = await tmexio_listener_factory(
+        room_name=user_room(authorized_user_id)
+    )
+    offset = RECIPIENT_NOTIFICATIONS_LIST_SIZE // 2
+    notification_ids = [
+        recipient_notification.notification_id
+        for recipient_notification in recipient_notifications[:offset]
+    ]
+
+    assert_nodata_response(
+        authorized_client.post(
+            "/api/protected/notification-service"
+            "/users/current/notifications/read-many/",
+            json={
+                "notification_ids": [
+                    str(notification_id) for notification_id in notification_ids
+                ]
+            },
+        ),
+    )
+
+    user_room_listener.assert_next_event(
+        expected_name="unread-notifications-count-changed",
+        expected_data={
+            "unread_notifications_count": count_unread(recipient_notifications[offset:])
+        },
+    )
+    user_room_listener.assert_no_more_events()
+
+    await assert_read_notifications(
+        active_session=active_session,
+        recipient_notifications=recipient_notifications,
+        expected_read_notification_ids=set(notification_ids),
+    )
+
+
+async def test_marking_notifications_as_read_by_ids_nothing_to_read(
+    active_session: ActiveSession,
+    authorized_client: TestClient,
+    authorized_user_id: int,
+    tmexio_listener_factory: TMEXIOListenerFactory,
+    recipient_notifications: list[RecipientNotification],
+) -> None:
+    user_room_listener = await tmexio_listener_factory(
+        room_name=user_room(authorized_user_id)
+    )
+
+    assert_nodata_response(
+        authorized_client.post(
+            "/api/protected/notification-service"
+            "/users/current/notifications/read-many/",
+            json={
+                "notification_ids": [
+                    str(recipient_notification.notification_id)
+                    for recipient_notification in recipient_notifications
+                    if recipient_notification.read_at is not None
+                ]
+            },
+        ),
+    )
+
+    user_room_listener.assert_no_more_events()
+
+    await assert_read_notifications(
+        active_session=active_session,
+        recipient_notifications=recipient_notifications,
+        expected_read_notification_ids=set(),
+    )
+
+
 @pytest.mark.parametrize(
     "deleted_id",
     [
@@ -1,5 +1,5 @@
 import random
-from unittest.mock import call
+from unittest.mock import AsyncMock
 from uuid import UUID
 
 import pytest
@@ -7,10 +7,17 @@ from faker import Faker
 from faststream.redis import RedisBroker
 from freezegun import freeze_time
 from pydantic_marshals.contains import assert_contains
+from pytest_lazy_fixtures import lf
+from respx import MockRouter
 
+from app.common.config import settings
 from app.common.config_bdg import notifications_bridge
 from app.common.schemas.notifications_sch import (
+    AnyNotificationAudienceSchema,
     AnyNotificationPayloadSchema,
+    ClassroomStudentsAudienceSchema,
+    CommunityParticipantsAudienceSchema,
+    NotificationAudienceKind,
     NotificationInputSchema,
 )
 from app.common.utils.datetime import datetime_utc_now
@@ -24,8 +31,12 @@ from app.notifications.services.senders.email_notification_sender import (
 from app.notifications.services.senders.telegram_notification_sender import (
     TelegramNotificationSender,
 )
+from app.notifications.services.unread_counters_svc import (
+    unread_notifications_counters,
+)
 from tests.common.active_session import ActiveSession
 from tests.common.mock_stack import MockStack
+from tests.common.respx_ext import assert_last_httpx_request
 from tests.common.tmexio_testing import TMEXIOListenerFactory
 from tests.notifications import factories
 
@@ -55,11 +66,11 @@ async def test_notification_send(
         for recipient_user_id in recipient_user_ids
     ]
 
-    email_notification_sender_mock = mock_stack.enter_async_mock(
-        EmailNotificationSender, "send_notification"
+    email_resolve_recipients_mock = mock_stack.enter_async_mock(
+        EmailNotificationSender, "resolve_recipients", return_value=[]
     )
-    telegram_notification_sender_mock = mock_stack.enter_async_mock(
-        TelegramNotificationSender, "send_notification"
+    telegram_resolve_recipients_mock = mock_stack.enter_async_mock(
+        TelegramNotificationSender, "resolve_recipients", return_value=[]
     )
 
     send_notification.mock.reset_mock()
@@ -73,6 +84,7 @@ async def test_notification_send(
                 "id": UUID,
                 "created_at": datetime_utc_now(),
                 "payload": notification_payload.model_dump(mode="json"),
+                "unread_notifications_count": 1,
             },
         ).data["id"]
         for user_room_listener in user_room_listeners
@@ -83,12 +95,9 @@ async def test_notification_send(
     for user_room_listener in user_room_listeners:
         user_room_listener.assert_no_more_events()
 
-    sender_calls = [
-        call(recipient_user_id=recipient_user_id)
-        for recipient_user_id in recipient_user_ids
-    ]
-    email_notification_sender_mock.assert_has_calls(sender_calls, any_order=True)
-    telegram_notification_sender_mock.assert_has_calls(sender_calls, any_order=True)
+    unique_recipient_user_ids = sorted(set(recipient_user_ids))
+    email_resolve_recipients_mock.assert_awaited_once_with(unique_recipient_user_ids)
+    telegram_resolve_recipients_mock.assert_awaited_once_with(unique_recipient_user_ids)
 
     send_notification.mock.assert_called_once_with(input_data.model_dump(mode="json"))
 
@@ -112,3 +121,139 @@ async def test_notification_send(
         notification = await Notification.find_first_by_id(notification_id)
         assert notification is not None
         await notification.delete()
+
+
+async def test_notification_send_failed_without_platform_side_effects(
+    faker: Faker,
+    active_session: ActiveSession,
+    mock_stack: MockStack,
+) -> None:
+    mock_stack.enter_async_mock(
+        EmailNotificationSender,
+        "resolve_recipients",
+        mock=AsyncMock(side_effect=RuntimeError),
+    )
+    increment_many_mock = mock_stack.enter_async_mock(
+        unread_notifications_counters, "increment_many"
+    )
+    emitter = AsyncMock()
+
+    with pytest.raises(RuntimeError):
+        async with active_session():
+            await send_notification(
+                emitter=emitter,
+                data=NotificationInputSchema(
+                    payload=factories.NotificationSimpleInputFactory.build().payload,
+                    recipient_user_ids=[faker.random_int(1000, 9999)],
+                ),
+            )
+
+    # the message is retried, so counters & socket events must wait for commit
+    increment_many_mock.assert_not_awaited()
+    emitter.emit.assert_not_awaited()
+
+
+AUDIENCE_ID = 1
+
+audience_parametrization = pytest.mark.parametrize(
+    ("recipient_audience", "bridge_respx_mock", "bridge_path"),
+    [
+        pytest.param(
+            ClassroomStudentsAudienceSchema(
+                kind=NotificationAudienceKind.CLASSROOM_STUDENTS,
+                classroom_id=AUDIENCE_ID,
+            ),
+            lf("classrooms_respx_mock"),
+            f"/classrooms/{AUDIENCE_ID}/students/",
+            id="classroom_students",
+        ),
+        pytest.param(
+            CommunityParticipantsAudienceSchema(
+                kind=NotificationAudienceKind.COMMUNITY_PARTICIPANTS,
+                community_id=AUDIENCE_ID,
+            ),
+            lf("communities_respx_mock"),
+            f"/communities/{AUDIENCE_ID}/participants/user-ids/",
+            id="community_participants",
+        ),
+    ],
+)
+
+
+@audience_parametrization
+async def test_notification_send_to_audience(
+    faker: Faker,
+    active_session: ActiveSession,
+    mock_stack: MockStack,
+    faststream_broker: RedisBroker,
+    recipient_audience: AnyNotificationAudienceSchema,
+    bridge_respx_mock: MockRouter,
+    bridge_path: str,
+) -> None:
+    audience_user_ids = [faker.unique.random_int(1000, 9999) for _ in range(3)]
+    explicit_user_id = faker.unique.random_int(1000, 9999)
+    bridge_mock = bridge_respx_mock.get(path=bridge_path).respond(
+        json=audience_user_ids
+    )
+
+    email_resolve_recipients_mock = mock_stack.enter_async_mock(
+        EmailNotificationSender, "resolve_recipients", return_value=[]
+    )
+    mock_stack.enter_async_mock(
+        TelegramNotificationSender, "resolve_recipients", return_value=[]
+    )
+
+    await notifications_bridge.send_notification(
+        NotificationInputSchema(
+            payload=factories.NotificationSimpleInputFactory.build().payload,
+            # overlapping recipients are deduplicated
+            recipient_user_ids=[explicit_user_id, audience_user_ids[0]],
+            recipient_audience=recipient_audience,
+        )
+    )
+
+    assert_last_httpx_request(
+        bridge_mock,
+        expected_headers={"X-Api-Key": settings.api_key},
+    )
+    recipient_user_ids = sorted({explicit_user_id, *audience_user_ids})
+    email_resolve_recipients_mock.assert_awaited_once_with(recipient_user_ids)
+
+    async with active_session():
+        for recipient_user_id in recipient_user_ids:
+            recipient_notifications = await RecipientNotification.find_all_by_kwargs(
+                recipient_user_id=recipient_user_id
+            )
+            assert len(recipient_notifications) == 1
+            await recipient_notifications[0].notification.delete()
+
+
+@audience_parametrization
+async def test_notification_send_to_empty_audience(
+    active_session: ActiveSession,
+    mock_stack: MockStack,
+    faststream_broker: RedisBroker,
+    recipient_audience: AnyNotificationAudienceSchema,
+    bridge_respx_mock: MockRouter,
+    bridge_path: str,
+) -> None:
+    bridge_respx_mock.get(path=bridge_path).respond(json=[])
+    email_resolve_recipients_mock = mock_stack.enter_async_mock(
+        EmailNotificationSender, "resolve_recipients", return_value=[]
+    )
+
+    async with active_session():
+        notifications_count = await Notification.count_by_kwargs(Notification.id)
+
+    await notifications_bridge.send_notification(
+        NotificationInputSchema(
+            payload=factories.NotificationSimpleInputFactory.build().payload,
+            recipient_audience=recipient_audience,
+        )
+    )
+
+    email_resolve_recipients_mock.assert_not_awaited()
+    async with active_session():
+        assert (
+            await Notification.count_by_kwargs(Notification.id) == notifications_count
+        )
@@ -0,0 +1,75 @@
+import pytest
+from faker import Faker
+from faststream.redis import RedisBroker
+
+from app.common.config_bdg import notifications_bridge
+from app.common.schemas.notifications_sch import TelegramMessageInputSchema
+from app.notifications.models.telegram_connections_db import (
+    TelegramConnection,
+    TelegramConnectionStatus,
+)
+from app.notifications.routes.telegram_messages_sub import send_telegram_messages
+from tests.common.active_session import ActiveSession
+from tests.common.aiogram_testing import MockedBot
+from tests.common.telegram_bot_api_testing import TelegramBotAPIStandIn
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def bot_api_stand_in(mocked_bot: MockedBot) -> TelegramBotAPIStandIn:
+    bot_api_stand_in = TelegramBotAPIStandIn()
+    mocked_bot.call_mock.side_effect = bot_api_stand_in
+    return bot_api_stand_in
+
+
+@pytest.fixture()
+def telegram_message(
+    faker: Faker,
+    active_telegram_connection: TelegramConnection,
+) -> TelegramMessageInputSchema:
+    return TelegramMessageInputSchema(
+        user_id=active_telegram_connection.user_id,
+        chat_id=active_telegram_connection.chat_id,
+        message_text=faker.sentence(),
+        button_text=faker.sentence(),
+        button_link=faker.url(),
+    )
+
+
+async def test_telegram_messages_sending(
+    faststream_broker: RedisBroker,
+    bot_api_stand_in: TelegramBotAPIStandIn,
+    telegram_message: TelegramMessageInputSchema,
+) -> None:
+    send_telegram_messages.mock.reset_mock()
+
+    await notifications_bridge.send_telegram_messages([telegram_message])
+
+    send_telegram_messages.mock.assert_called_once_with(
+        [telegram_message.model_dump(mode="json")]
+    )
+    assert bot_api_stand_in.list_chat_messages(telegram_message.chat_id) == [
+        telegram_message.message_text
+    ]
+
+
+async def test_telegram_messages_sending_bot_blocked(
+    active_session: ActiveSession,
+    faststream_broker: RedisBroker,
+    bot_api_stand_in: TelegramBotAPIStandIn,
+    active_telegram_connection: TelegramConnection,
+    telegram_message: TelegramMessageInputSchema,
+) -> None:
+    bot_api_stand_in.blocked_chat_ids.add(telegram_message.chat_id)
+
+    await notifications_bridge.send_telegram_messages([telegram_message])
+
+    assert bot_api_stand_in.sent_messages == []
+
+    async with active_session():
+        telegram_connection = await TelegramConnection.find_first_by_kwargs(
+            user_id=active_telegram_connection.user_id
+        )
+        assert telegram_connection is not None
+        assert telegram_connection.status is TelegramConnectionStatus.BLOCKED
@@ -2,15 +2,23 @@ import logging
 from unittest.mock import AsyncMock
 
 import pytest
+from faker import Faker
 
+from app.common.config import query_stats_registry
+from app.common.query_stats_ext import collect_query_stats
 from app.common.schemas.pochta_sch import EmailMessageInputSchema
 from app.notifications.models.email_connections_db import EmailConnection
 from app.notifications.models.notifications_db import Notification
+from app.notifications.services.email_digests_svc import (
+    EmailNotificationDigests,
+    email_notification_digests,
+)
 from app.notifications.services.senders.email_notification_sender import (
     EmailNotificationSender,
 )
 from tests.common.active_session import ActiveSession
 from tests.common.mock_stack import MockStack
+from tests.notifications import factories
 
 pytestmark = pytest.mark.anyio
 
@@ -25,20 +33,20 @@ async def email_notification_sender(
 async def test_email_notification_sending(
     active_session: ActiveSession,
     authorized_user_id: int,
-    send_email_message_mock: AsyncMock,
+    send_email_messages_mock: AsyncMock,
     email_connection: EmailConnection,
     email_notification_sender: EmailNotificationSender,
 ) -> None:
     async with active_session():
-        await email_notification_sender.send_notification(
-            recipient_user_id=authorized_user_id
-        )
+        await email_notification_sender.send(recipient_user_ids=[authorized_user_id])
 
-    send_email_message_mock.assert_awaited_once_with(
-        EmailMessageInputSchema(
-            payload=email_notification_sender.email_message_payload,
-            recipient_emails=[email_connection.email],
-        )
+    send_email_messages_mock.assert_awaited_once_with(
+        [
+            EmailMessageInputSchema(
+                payload=email_notification_sender.email_message_payload,
+                recipient_emails=[email_connection.email],
+            )
+        ]
     )
 
 
@@ -46,16 +54,14 @@ async def test_email_notification_sending_email_connection_not_found(
     active_session: ActiveSession,
     mock_stack: MockStack,
     authorized_user_id: int,
-    send_email_message_mock: AsyncMock,
+    send_email_messages_mock: AsyncMock,
     notification: Notification,
     email_notification_sender: EmailNotificationSender,
 ) -> None:
     logging_error_mock = mock_stack.enter_mock(logging, "error")
 
     async with active_session():
-        await email_notification_sender.send_notification(
-            recipient_user_id=authorized_user_id
-        )
+        await email_notification_sender.send(recipient_user_ids=[authorized_user_id])
 
     logging_error_mock.assert_called_once_with(
         f"User {authorized_user_id} has no email connections",
@@ -65,4 +71,97 @@ async def test_email_notification_sending_email_connection_not_found(
         },
     )
 
-    send_email_message_mock.assert_not_called()
+    send_email_messages_mock.assert_awaited_once_with([])
+
+
+async def test_email_notification_sending_resolves_recipients_at_once(
+    faker: Faker,
+    active_session: ActiveSession,
+    send_email_messages_mock: AsyncMock,
+    email_notification_sender: EmailNotificationSender,
+) -> None:
+    recipient_user_ids = [faker.random_int(1000, 9999) + i * 10000 for i in range(5)]
+
+    async with active_session():
+        email_connections = await EmailConnection.create_many(
+            {
+                "user_id": recipient_user_id,
+                **factories.EmailConnectionInputFactory.build_python(),
+            }
+            for recipient_user_id in recipient_user_ids
+        )
+
+    async with active_session():
+        with collect_query_stats(query_stats_registry, "test") as query_stats:
+            await email_notification_sender.send(recipient_user_ids=recipient_user_ids)
+
+    assert query_stats.statement_count == 1
+    send_email_messages_mock.assert_awaited_once_with(
+        [
+            EmailMessageInputSchema(
+                payload=email_notification_sender.email_message_payload,
+                recipient_emails=[email_connection.email],
+            )
+            for email_connection in email_connections
+        ]
+    )
+
+    async with active_session():
+        for email_connection in email_connections:
+            await email_connection.delete()
+
+
+async def test_email_notification_sending_into_digest(
+    active_session: ActiveSession,
+    mock_stack: MockStack,
+    authorized_user_id: int,
+    send_email_messages_mock: AsyncMock,
+    email_connection: EmailConnection,
+    email_notification_sender: EmailNotificationSender,
+) -> None:
+    mock_stack.enter_mock(EmailNotificationDigests, "is_available", property_value=True)
+    add_many_mock = mock_stack.enter_async_mock(email_notification_digests, "add_many")
+
+    async with active_session() as session:
+        session.add(email_connection)
+        email_connection.digest_window_minutes = 30
+
+    async with active_session():
+        await email_notification_sender.send(recipient_user_ids=[authorized_user_id])
+
+    add_many_mock.assert_awaited_once()
+    assert add_many_mock.await_args is not None
+    assert add_many_mock.await_args.kwargs["payload"] == (
+        email_notification_sender.email_message_payload
+    )
+    assert [
+        recipient.user_id
+        for recipient in add_many_mock.await_args.kwargs["email_connections"]
+    ] == [authorized_user_id]
+    send_email_messages_mock.assert_awaited_once_with([])
+
+
+async def test_email_notification_sending_into_digest_rolled_back(
+    active_session: ActiveSession,
+    mock_stack: MockStack,
+    authorized_user_id: int,
+    send_email_messages_mock: AsyncMock,
+    email_connection: EmailConnection,
+    email_notification_sender: EmailNotificationSender,
+) -> None:
+    mock_stack.enter_mock(EmailNotificationDigests, "is_available", property_value=True)
+    add_many_mock = mock_stack.enter_async_mock(email_notification_digests, "add_many")
+
+    async with active_session() as session:
+        session.add(email_connection)
+        email_connection.digest_window_minutes = 30
+
+    with pytest.raises(RuntimeError):
+        async with active_session():
+            await email_notification_sender.send(
+                recipient_user_ids=[authorized_user_id]
+            )
+            raise RuntimeError
+
+    # digests are only updated once the notification is committed
+    add_many_mock.assert_not_awaited()
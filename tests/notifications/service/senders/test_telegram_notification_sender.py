@@ -1,6 +1,8 @@
+from unittest.mock import AsyncMock
+
 import pytest
-from aiogram.methods import SendMessage
 
+from app.common.schemas.notifications_sch import TelegramMessageInputSchema
 from app.notifications.models.notifications_db import Notification
 from app.notifications.models.telegram_connections_db import (
     TelegramConnection,
@@ -9,7 +11,6 @@ from app.notifications.services.senders.telegram_notification_sender import (
     TelegramNotificationSender,
 )
 from tests.common.active_session import ActiveSession
-from tests.common.aiogram_testing import MockedBot
 
 pytestmark = pytest.mark.anyio
 
@@ -24,60 +25,47 @@ async def telegram_notification_sender(
 async def test_telegram_notification_sending(
     active_session: ActiveSession,
     authorized_user_id: int,
-    mocked_bot: MockedBot,
+    send_telegram_messages_mock: AsyncMock,
     tg_chat_id: int,
     active_telegram_connection: TelegramConnection,
     telegram_notification_sender: TelegramNotificationSender,
 ) -> None:
     async with active_session():
-        await telegram_notification_sender.send_notification(
-            recipient_user_id=authorized_user_id
-        )
+        await telegram_notification_sender.send(recipient_user_ids=[authorized_user_id])
 
-    mocked_bot.assert_next_api_call(
-        SendMessage,
-        {
-            "chat_id": tg_chat_id,
-            "text": telegram_notification_sender.telegram_message_payload.message_text,
-            "reply_markup": {
-                "inline_keyboard": [
-                    [
-                        {
-                            "text": telegram_notification_sender.telegram_message_payload.button_text,
-                            "url": telegram_notification_sender.telegram_message_payload.button_link,
-                        }
-                    ]
-                ]
-            },
-        },
+    send_telegram_messages_mock.assert_awaited_once_with(
+        [
+            TelegramMessageInputSchema(
+                user_id=authorized_user_id,
+                chat_id=tg_chat_id,
+                message_text=telegram_notification_sender.telegram_message_payload.message_text,
+                button_text=telegram_notification_sender.telegram_message_payload.button_text,
+                button_link=telegram_notification_sender.telegram_message_payload.button_link,
+            )
+        ]
     )
-    mocked_bot.assert_no_more_api_calls()
 
 
 async def test_telegram_notification_sending_connection_is_not_active(
     active_session: ActiveSession,
     authorized_user_id: int,
-    mocked_bot: MockedBot,
+    send_telegram_messages_mock: AsyncMock,
     inactive_telegram_connection: TelegramConnection,
     telegram_notification_sender: TelegramNotificationSender,
 ) -> None:
     async with active_session():
-        await telegram_notification_sender.send_notification(
-            recipient_user_id=authorized_user_id
-        )
+        await telegram_notification_sender.send(recipient_user_ids=[authorized_user_id])
 
-    mocked_bot.assert_no_more_api_calls()
+    send_telegram_messages_mock.assert_awaited_once_with([])
 
 
 async def test_telegram_notification_sending_telegram_connection_not_found(
     active_session: ActiveSession,
     authorized_user_id: int,
-    mocked_bot: MockedBot,
+    send_telegram_messages_mock: AsyncMock,
     telegram_notification_sender: TelegramNotificationSender,
 ) -> None:
     async with active_session():
-        await telegram_notification_sender.send_notification(
-            recipient_user_id=authorized_user_id
-        )
+        await telegram_notification_sender.send(recipient_user_ids=[authorized_user_id])
 
-    mocked_bot.assert_no_more_api_calls()
+    send_telegram_messages_mock.assert_awaited_once_with([])
@@ -0,0 +1,184 @@
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from faker import Faker
+from redis.asyncio import Redis
+
+from app.common.schemas.pochta_sch import (
+    ClassroomNotificationEmailMessagePayloadSchema,
+    EmailMessageInputSchema,
+    EmailMessageKind,
+    NotificationsDigestEmailMessagePayloadSchema,
+)
+from app.notifications.models.email_connections_db import EmailConnection
+from app.notifications.services.email_digests_svc import EmailNotificationDigests
+from tests.common.redis_testing import RedisStandIn
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+async def redis() -> AsyncIterator[Redis]:
+    async with RedisStandIn().serve() as redis_url:
+        async with Redis.from_url(redis_url) as redis:
+            yield redis
+
+
+@pytest.fixture()
+def digests(redis: Redis) -> EmailNotificationDigests:
+    return EmailNotificationDigests(
+        redis=redis,
+        template_id="template-id",
+        max_size=2,
+        poll_interval=0,
+        flush_lease=60,
+    )
+
+
+def build_payload(faker: Faker) -> ClassroomNotificationEmailMessagePayloadSchema:
+    return ClassroomNotificationEmailMessagePayloadSchema(
+        kind=EmailMessageKind.ENROLLMENT_CREATED_V1,
+        classroom_id=faker.random_int(),
+        notification_id=uuid4(),
+    )
+
+
+def build_email_connection(faker: Faker, digest_window_minutes: int) -> EmailConnection:
+    return EmailConnection(
+        user_id=faker.random_int(),
+        email=faker.email(),
+        digest_window_minutes=digest_window_minutes,
+    )
+
+
+async def test_flushing_digest(
+    faker: Faker,
+    send_email_messages_mock: AsyncMock,
+    digests: EmailNotificationDigests,
+) -> None:
+    email_connection = build_email_connection(faker, digest_window_minutes=0)
+    payloads = [build_payload(faker), build_payload(faker)]
+    for payload in payloads:
+        await digests.add_many(payload=payload, email_connections=[email_connection])
+
+    assert await digests.flush_due() == 1
+
+    send_email_messages_mock.assert_awaited_once_with(
+        [
+            EmailMessageInputSchema(
+                payload=NotificationsDigestEmailMessagePayloadSchema(
+                    kind=EmailMessageKind.NOTIFICATIONS_DIGEST_V1,
+                    notifications=payloads,
+                ),
+                recipient_emails=[email_connection.email],
+            )
+        ]
+    )
+    assert await digests.flush_due() == 0
+
+
+async def test_flushing_digest_publishing_failed(
+    faker: Faker,
+    send_email_messages_mock: AsyncMock,
+    digests: EmailNotificationDigests,
+) -> None:
+    email_connection = build_email_connection(faker, digest_window_minutes=0)
+    payload = build_payload(faker)
+    await digests.add_many(payload=payload, email_connections=[email_connection])
+
+    send_email_messages_mock.side_effect = RuntimeError
+    with pytest.raises(RuntimeError):
+        await digests.flush_due()
+
+    send_email_messages_mock.side_effect = None
+    assert await digests.flush_due() == 1
+
+    send_email_messages_mock.assert_awaited_with(
+        [
+            EmailMessageInputSchema(
+                payload=payload,
+                recipient_emails=[email_connection.email],
+            )
+        ]
+    )
+    assert await digests.flush_due() == 0
+
+
+async def test_flushing_digest_leased_by_another_instance(
+    faker: Faker,
+    redis: Redis,
+    send_email_messages_mock: AsyncMock,
+    digests: EmailNotificationDigests,
+) -> None:
+    email_connection = build_email_connection(faker, digest_window_minutes=0)
+    await digests.add_many(
+        payload=build_payload(faker), email_connections=[email_connection]
+    )
+    await redis.set(digests.build_lease_key(email_connection.email), 1)
+
+    assert await digests.flush_due() == 0
+
+    send_email_messages_mock.assert_not_called()
+
+
+async def test_flushing_single_notification_digest(
+    faker: Faker,
+    send_email_messages_mock: AsyncMock,
+    digests: EmailNotificationDigests,
+) -> None:
+    email_connection = build_email_connection(faker, digest_window_minutes=0)
+    payload = build_payload(faker)
+    await digests.add_many(payload=payload, email_connections=[email_connection])
+
+    assert await digests.flush_due() == 1
+
+    send_email_messages_mock.assert_awaited_once_with(
+        [
+            EmailMessageInputSchema(
+                payload=payload,
+                recipient_emails=[email_connection.email],
+            )
+        ]
+    )
+
+
+async def test_flushing_full_digest(
+    faker: Faker,
+    send_email_messages_mock: AsyncMock,
+    digests: EmailNotificationDigests,
+) -> None:
+    email_connection = build_email_connection(faker, digest_window_minutes=0)
+    payloads = [build_payload(faker) for _ in range(digests.max_size + 1)]
+    for payload in payloads:
+        await digests.add_many(payload=payload, email_connections=[email_connection])
+
+    assert await digests.flush_due() == 1
+    assert await digests.flush_due() == 1
+
+    assert [
+        send_call.args[0][0].payload
+        for send_call in send_email_messages_mock.await_args_list
+    ] == [
+        NotificationsDigestEmailMessagePayloadSchema(
+            kind=EmailMessageKind.NOTIFICATIONS_DIGEST_V1,
+            notifications=payloads[: digests.max_size],
+        ),
+        payloads[digests.max_size],
+    ]
+
+
+async def test_not_flushing_digest_before_window_ends(
+    faker: Faker,
+    send_email_messages_mock: AsyncMock,
+    digests: EmailNotificationDigests,
+) -> None:
+    email_connection = build_email_connection(faker, digest_window_minutes=30)
+    await digests.add_many(
+        payload=build_payload(faker), email_connections=[email_connection]
+    )
+
+    assert await digests.flush_due() == 0
+
+    send_email_messages_mock.assert_not_called()
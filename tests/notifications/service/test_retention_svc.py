@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+import pytest
+
+from app.common.utils.datetime import datetime_utc_now
+from app.notifications.models.notifications_db import Notification
+from app.notifications.models.recipient_notifications_db import RecipientNotification
+from app.notifications.services.retention_svc import NotificationsRetention
+from tests.common.active_session import ActiveSession
+from tests.notifications import factories
+
+pytestmark = pytest.mark.anyio
+
+HORIZON = timedelta(days=30)
+OLD_NOTIFICATIONS_COUNT = 5
+
+
+async def create_notification(
+    authorized_user_id: int, age: timedelta
+) -> RecipientNotification:
+    notification = await Notification.create(
+        payload=factories.NotificationSimpleInputFactory.build().payload,
+        created_at=datetime_utc_now() - age,
+    )
+    return await RecipientNotification.create(
+        notification=notification,
+        recipient_user_id=authorized_user_id,
+        created_at=notification.created_at,
+        kind=notification.payload.kind,
+    )
+
+
+async def test_purging_old_notifications(
+    active_session: ActiveSession,
+    authorized_user_id: int,
+) -> None:
+    async with active_session():
+        old_recipient_notifications = [
+            await create_notification(
+                authorized_user_id, age=HORIZON + timedelta(days=1)
+            )
+            for _ in range(OLD_NOTIFICATIONS_COUNT)
+        ]
+        recent_recipient_notification = await create_notification(
+            authorized_user_id, age=HORIZON - timedelta(days=1)
+        )
+
+    retention = NotificationsRetention(horizon=HORIZON, batch_size=2, interval=0)
+    assert await retention.purge() >= OLD_NOTIFICATIONS_COUNT
+
+    async with active_session():
+        for recipient_notification in old_recipient_notifications:
+            assert (
+                await Notification.find_first_by_id(
+                    recipient_notification.notification_id
+                )
+                is None
+            )
+        # recipient notifications are deleted by the cascade
+        assert [
+            recipient_notification.notification_id
+            for recipient_notification in await RecipientNotification.find_all_by_kwargs(
+                recipient_user_id=authorized_user_id
+            )
+        ] == [recent_recipient_notification.notification_id]
+
+        notification = await Notification.find_first_by_id(
+            recent_recipient_notification.notification_id
+        )
+        assert notification is not None
+        await notification.delete()
@@ -0,0 +1,169 @@
+import logging
+from time import monotonic
+
+import pytest
+from faker import Faker
+
+from app.common.schemas.notifications_sch import TelegramMessageInputSchema
+from app.notifications.services.telegram_delivery_svc import (
+    TelegramDeliveryResult,
+    TelegramDeliveryScheduler,
+    TokenBucket,
+)
+from tests.common.aiogram_testing import MockedBot
+from tests.common.mock_stack import MockStack
+from tests.common.telegram_bot_api_testing import TelegramBotAPIStandIn
+
+pytestmark = pytest.mark.anyio
+
+GLOBAL_RATE: int = 50
+CHAT_RATE: int = 10
+
+
+@pytest.fixture()
+def bot_api_stand_in(mocked_bot: MockedBot) -> TelegramBotAPIStandIn:
+    bot_api_stand_in = TelegramBotAPIStandIn(
+        global_limit=GLOBAL_RATE + 10,
+        chat_limit=CHAT_RATE + 2,
+        latency=0.01,
+    )
+    mocked_bot.call_mock.side_effect = bot_api_stand_in
+    return bot_api_stand_in
+
+
+@pytest.fixture()
+def scheduler() -> TelegramDeliveryScheduler:
+    return TelegramDeliveryScheduler(
+        global_rate=GLOBAL_RATE,
+        chat_rate=CHAT_RATE,
+        max_concurrency=5,
+        max_attempts=3,
+        retry_delay=0.01,
+    )
+
+
+def build_messages(
+    faker: Faker, chat_ids: list[int], per_chat: int
+) -> list[TelegramMessageInputSchema]:
+    return [
+        TelegramMessageInputSchema(
+            user_id=chat_id,
+            chat_id=chat_id,
+            message_text=f"{chat_id}: {index}",
+            button_text=faker.sentence(),
+            button_link=faker.url(),
+        )
+        for index in range(per_chat)
+        for chat_id in chat_ids
+    ]
+
+
+async def test_token_bucket_rate() -> None:
+    token_bucket = TokenBucket(rate=100)
+
+    started_at = monotonic()
+    for _ in range(21):
+        await token_bucket.acquire()
+
+    assert monotonic() - started_at >= 0.2
+
+
+async def test_token_bucket_pause() -> None:
+    token_bucket = TokenBucket(rate=100)
+    token_bucket.pause(0.2)
+
+    started_at = monotonic()
+    await token_bucket.acquire()
+
+    assert monotonic() - started_at >= 0.2
+
+
+async def test_delivery_under_load_stays_within_limits(
+    faker: Faker,
+    bot_api_stand_in: TelegramBotAPIStandIn,
+    scheduler: TelegramDeliveryScheduler,
+) -> None:
+    chat_ids = [faker.unique.random_int(1, 10**9) for _ in range(20)]
+    messages = build_messages(faker, chat_ids=chat_ids, per_chat=5)
+
+    delivery_results = await scheduler.deliver_many(messages)
+
+    assert delivery_results == [TelegramDeliveryResult.DELIVERED] * len(messages)
+    assert bot_api_stand_in.flood_control_count == 0
+    for chat_id in chat_ids:  # order within a chat is preserved
+        assert bot_api_stand_in.list_chat_messages(chat_id) == [
+            f"{chat_id}: {index}" for index in range(5)
+        ]
+
+
+async def test_delivery_honours_retry_after(
+    faker: Faker,
+    bot_api_stand_in: TelegramBotAPIStandIn,
+    scheduler: TelegramDeliveryScheduler,
+) -> None:
+    bot_api_stand_in.forced_flood_control_count = 1
+    messages = build_messages(faker, chat_ids=[faker.random_int()], per_chat=2)
+
+    started_at = monotonic()
+    delivery_results = await scheduler.deliver_many(messages)
+
+    assert monotonic() - started_at >= bot_api_stand_in.retry_after
+    assert delivery_results == [TelegramDeliveryResult.DELIVERED] * len(messages)
+    assert len(bot_api_stand_in.sent_messages) == len(messages)
+
+
+async def test_delivery_to_blocked_chat(
+    faker: Faker,
+    bot_api_stand_in: TelegramBotAPIStandIn,
+    scheduler: TelegramDeliveryScheduler,
+) -> None:
+    blocked_chat_id, chat_id = faker.unique.random_int(), faker.unique.random_int()
+    bot_api_stand_in.blocked_chat_ids.add(blocked_chat_id)
+
+    delivery_results = await scheduler.deliver_many(
+        build_messages(faker, chat_ids=[blocked_chat_id, chat_id], per_chat=1)
+    )
+
+    assert delivery_results == [
+        TelegramDeliveryResult.BLOCKED,
+        TelegramDeliveryResult.DELIVERED,
+    ]
+
+
+async def test_delivery_retries_server_errors(
+    faker: Faker,
+    bot_api_stand_in: TelegramBotAPIStandIn,
+    scheduler: TelegramDeliveryScheduler,
+) -> None:
+    chat_id = faker.random_int()
+    bot_api_stand_in.chat_id_to_failures[chat_id] = 2
+
+    delivery_results = await scheduler.deliver_many(
+        build_messages(faker, chat_ids=[chat_id], per_chat=1)
+    )
+
+    assert delivery_results == [TelegramDeliveryResult.DELIVERED]
+
+
+async def test_delivery_fails_after_max_attempts(
+    faker: Faker,
+    mock_stack: MockStack,
+    bot_api_stand_in: TelegramBotAPIStandIn,
+    scheduler: TelegramDeliveryScheduler,
+) -> None:
+    logging_error_mock = mock_stack.enter_mock(logging, "error")
+    failing_chat_id, chat_id = faker.unique.random_int(), faker.unique.random_int()
+    bot_api_stand_in.chat_id_to_failures[failing_chat_id] = scheduler.max_attempts
+
+    delivery_results = await scheduler.deliver_many(
+        build_messages(faker, chat_ids=[failing_chat_id, chat_id], per_chat=1)
+    )
+
+    assert delivery_results == [
+        TelegramDeliveryResult.FAILED,
+        TelegramDeliveryResult.DELIVERED,
+    ]
+    logging_error_mock.assert_called_once_with(
+        f"Telegram message delivery failed after {scheduler.max_attempts} attempts",
+        extra={"user_id": failing_chat_id, "chat_id": failing_chat_id},
+    )
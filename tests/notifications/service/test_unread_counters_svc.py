@@ -0,0 +1,115 @@
+from collections.abc import AsyncIterator
+
+import pytest
+from redis.asyncio import Redis
+
+from app.notifications.models.recipient_notifications_db import RecipientNotification
+from app.notifications.services.unread_counters_svc import UnreadNotificationsCounters
+from tests.common.active_session import ActiveSession
+from tests.common.redis_testing import RedisStandIn
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+async def redis() -> AsyncIterator[Redis]:
+    async with RedisStandIn().serve() as redis_url:
+        async with Redis.from_url(redis_url) as redis:
+            yield redis
+
+
+@pytest.fixture()
+def counters(redis: Redis) -> UnreadNotificationsCounters:
+    return UnreadNotificationsCounters(redis=redis, ttl=60)
+
+
+async def test_getting_missing_counter(
+    active_session: ActiveSession,
+    authorized_user_id: int,
+    recipient_notification: RecipientNotification,
+    counters: UnreadNotificationsCounters,
+) -> None:
+    async with active_session():
+        assert await counters.get(authorized_user_id) == 1
+
+    assert await counters.redis.get(counters.build_key(authorized_user_id)) == b"1"
+    assert await counters.redis.ttl(counters.build_key(authorized_user_id)) > 0
+
+
+async def test_getting_cached_counter(
+    active_session: ActiveSession,
+    authorized_user_id: int,
+    counters: UnreadNotificationsCounters,
+) -> None:
+    await counters.redis.set(counters.build_key(authorized_user_id), 5, ex=60)
+
+    async with active_session():
+        assert await counters.get(authorized_user_id) == 5
+
+
+async def test_incrementing_counters(
+    active_session: ActiveSession,
+    authorized_user_id: int,
+    recipient_notification: RecipientNotification,
+    counters: UnreadNotificationsCounters,
+) -> None:
+    other_user_id = authorized_user_id + 1
+    await counters.redis.set(counters.build_key(other_user_id), 5, ex=60)
+
+    async with active_session():
+        user_id_to_count = await counters.increment_many(
+            [authorized_user_id, other_user_id]
+        )
+
+    # the missing counter is recounted, as the increment can't be trusted
+    assert user_id_to_count == {authorized_user_id: 1, other_user_id: 6}
+    assert await counters.redis.ttl(counters.build_key(authorized_user_id)) > 0
+
+
+async def test_decrementing_counter(
+    active_session: ActiveSession,
+    authorized_user_id: int,
+    counters: UnreadNotificationsCounters,
+) -> None:
+    await counters.redis.set(counters.build_key(authorized_user_id), 5, ex=60)
+
+    async with active_session():
+        assert await counters.decrement(authorized_user_id) == 4
+
+
+async def test_decrementing_drifted_counter(
+    active_session: ActiveSession,
+    authorized_user_id: int,
+    counters: UnreadNotificationsCounters,
+) -> None:
+    await counters.redis.set(counters.build_key(authorized_user_id), 0, ex=60)
+
+    async with active_session():
+        assert await counters.decrement(authorized_user_id) == 0
+
+
+async def test_resetting_counter(
+    active_session: ActiveSession,
+    authorized_user_id: int,
+    recipient_notification: RecipientNotification,
+    counters: UnreadNotificationsCounters,
+) -> None:
+    await counters.reset(authorized_user_id)
+
+    async with active_session():
+        assert await counters.get(authorized_user_id) == 0
+
+
+async def test_counting_without_redis(
+    active_session: ActiveSession,
+    authorized_user_id: int,
+    recipient_notification: RecipientNotification,
+) -> None:
+    counters = UnreadNotificationsCounters(redis=None, ttl=60)
+
+    async with active_session():
+        assert await counters.increment_many([authorized_user_id]) == {
+            authorized_user_id: 1
+        }
+        await counters.reset(authorized_user_id)
+        assert await counters.get(authorized_user_id) == 1
@@ -4,6 +4,7 @@ from pydantic import BaseModel
 from app.common.schemas.pochta_sch import (
     ClassroomNotificationEmailMessagePayloadSchema,
     EmailMessageInputSchema,
+    NotificationsDigestEmailMessagePayloadSchema,
     RecipientInvoiceNotificationEmailMessagePayloadSchema,
     TokenEmailMessagePayloadSchema,
 )
@@ -41,6 +42,12 @@ class RecipientInvoiceNotificationEmailMessagePayloadFactory(
     __model__ = RecipientInvoiceNotificationEmailMessagePayloadSchema
 
 
+class NotificationsDigestEmailMessagePayloadFactory(
+    BaseModelFactory[NotificationsDigestEmailMessagePayloadSchema]
+):
+    __model__ = NotificationsDigestEmailMessagePayloadSchema
+
+
 class EmailMessageInputFactory(BaseModelFactory[EmailMessageInputSchema]):
     __model__ = EmailMessageInputSchema
 
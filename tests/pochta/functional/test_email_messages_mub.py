@@ -1,10 +1,15 @@
 from unittest.mock import AsyncMock
 
 import pytest
+from faststream.redis import RedisBroker
 from starlette.testclient import TestClient
 
+from app.common.config import settings
+from app.common.faststream_ext import StreamConsumerStatsSchema
 from app.common.schemas.pochta_sch import EmailMessageInputSchema
-from tests.common.assert_contains_ext import assert_nodata_response
+from app.pochta.routes.email_messages_sub import email_messages_consumer_stats
+from tests.common.assert_contains_ext import assert_nodata_response, assert_response
+from tests.common.mock_stack import MockStack
 from tests.pochta import factories
 
 pytestmark = pytest.mark.anyio
@@ -24,3 +29,42 @@ async def test_queueing_email_message_sending(
     )
 
     send_email_message_mock.assert_awaited_once_with(input_data)
+
+
+async def test_retrieving_email_messages_consumer_lag(
+    mub_client: TestClient,
+    mock_stack: MockStack,
+    faststream_broker: RedisBroker,
+) -> None:
+    xinfo_groups_mock = mock_stack.enter_async_mock(
+        faststream_broker.config.broker_config.connection.client,
+        "xinfo_groups",
+        return_value=[
+            {
+                "name": b"pochta-service",
+                "consumers": 1,
+                "pending": 0,
+                "last-delivered-id": b"1700000000000-0",
+                "entries-read": 10,
+                "lag": 0,
+            }
+        ],
+    )
+    email_messages_consumer_stats.stats = StreamConsumerStatsSchema()
+
+    assert_response(
+        mub_client.get("/mub/pochta-service/email-messages/consumer-lag/"),
+        expected_json={
+            "group": {
+                "stream_name": settings.email_messages_send_stream_name,
+                "group_name": "pochta-service",
+                "consumer_count": 1,
+                "pending_count": 0,
+                "lag": 0,
+                "last_delivered_id": "1700000000000-0",
+            },
+            "instance": {"batch_count": 0, "message_count": 0},
+        },
+    )
+
+    xinfo_groups_mock.assert_awaited_once_with(settings.email_messages_send_stream_name)
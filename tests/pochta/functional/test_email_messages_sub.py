@@ -1,16 +1,21 @@
+import json
 import logging
 from typing import Any
+from unittest.mock import ANY
 
 import pytest
 from faker import Faker
+from httpx import HTTPStatusError, Response
 from respx import MockRouter
 
 from app.common.config_bdg import pochta_bridge
 from app.common.schemas.pochta_sch import EmailMessageInputSchema, EmailMessageKind
+from app.pochta.dependencies.unisender_go_dep import unisender_go_client_manager
 from app.pochta.routes.email_messages_sub import (
     GLOBAL_TEMPLATE_VARIABLES,
     KIND_TO_TEMPLATE_ID,
-    send_email_message,
+    coalesce_email_messages,
+    send_email_messages,
 )
 from app.pochta.schemas.unisender_go_sch import (
     UnisenderGoMessageSchema,
@@ -74,6 +79,11 @@ pytestmark = pytest.mark.anyio
             factories.RecipientInvoiceNotificationEmailMessagePayloadFactory,
             id="student_recipient_invoice_payment_confirmed_v1",
         ),
+        pytest.param(
+            EmailMessageKind.NOTIFICATIONS_DIGEST_V1,
+            factories.NotificationsDigestEmailMessagePayloadFactory,
+            id="notifications_digest_v1",
+        ),
     ],
 )
 async def test_email_message_sending(
@@ -88,7 +98,7 @@ async def test_email_message_sending(
         recipient_emails=[faker.email() for _ in range(faker.random_int(2, 10))],
     )
 
-    send_email_message.mock.reset_mock()
+    send_email_messages.mock.reset_mock()
 
     unisender_go_send_mock = unisender_go_mock.post(
         path="/api/v1/email/send.json",
@@ -100,7 +110,9 @@ async def test_email_message_sending(
 
     await pochta_bridge.send_email_message(data=input_data)
 
-    send_email_message.mock.assert_called_once_with(input_data.model_dump(mode="json"))
+    send_email_messages.mock.assert_called_once_with(
+        [input_data.model_dump(mode="json")]
+    )
 
     assert_last_httpx_request(
         unisender_go_send_mock,
@@ -133,7 +145,7 @@ async def test_email_message_sending_unisender_failed(
         recipient_emails=[failed_email]
     )
 
-    send_email_message.mock.reset_mock()
+    send_email_messages.mock.reset_mock()
 
     logging_error_mock = mock_stack.enter_mock(logging, "error")
 
@@ -147,7 +159,9 @@ async def test_email_message_sending_unisender_failed(
 
     await pochta_bridge.send_email_message(data=input_data)
 
-    send_email_message.mock.assert_called_once_with(input_data.model_dump(mode="json"))
+    send_email_messages.mock.assert_called_once_with(
+        [input_data.model_dump(mode="json")]
+    )
 
     logging_error_mock.assert_called_once_with(
         f"Sending email to {failed_email} failed",
@@ -174,3 +188,144 @@ async def test_email_message_sending_unisender_failed(
             )
         ).model_dump(mode="json"),
     )
+
+
+async def test_email_messages_sending_unisender_unavailable(
+    faker: Faker,
+    unisender_go_mock: MockRouter,
+) -> None:
+    input_data: EmailMessageInputSchema = factories.EmailMessageInputFactory.build(
+        recipient_emails=[faker.email()]
+    )
+
+    unisender_go_mock.post(path="/api/v1/email/send.json").respond(status_code=500)
+
+    with pytest.raises(HTTPStatusError):
+        await send_email_messages(
+            unisender_go_client=unisender_go_client_manager(),
+            data=[input_data],
+        )
+
+
+@pytest.mark.parametrize(
+    "failed_index",
+    [
+        pytest.param(0, id="first_group_failed"),
+        pytest.param(1, id="last_group_failed"),
+    ],
+)
+async def test_email_messages_sending_unisender_partially_failed(
+    faker: Faker,
+    mock_stack: MockStack,
+    unisender_go_mock: MockRouter,
+    failed_index: int,
+) -> None:
+    payload = factories.TokenEmailMessagePayloadFactory.build(
+        kind=EmailMessageKind.PASSWORD_RESET_V2
+    )
+    other_payload = factories.TokenEmailMessagePayloadFactory.build(
+        kind=EmailMessageKind.EMAIL_CHANGE_V2
+    )
+    input_data = [
+        EmailMessageInputSchema(
+            payload=payload, recipient_emails=[faker.unique.email()]
+        ),
+        EmailMessageInputSchema(
+            payload=other_payload, recipient_emails=[faker.unique.email()]
+        ),
+    ]
+
+    dead_letter_stream_entry_mock = mock_stack.enter_mock(
+        "app.pochta.routes.email_messages_sub.dead_letter_stream_entry"
+    )
+
+    responses = [
+        Response(
+            status_code=200,
+            json=factories.UnisenderGoSendEmailSuccessfulResponseFactory.build_json(
+                emails=[input_data[1 - failed_index].recipient_emails[0]]
+            ),
+        )
+    ]
+    responses.insert(failed_index, Response(status_code=500))
+    unisender_go_mock.post(path="/api/v1/email/send.json").mock(side_effect=responses)
+
+    await send_email_messages(
+        unisender_go_client=unisender_go_client_manager(),
+        data=input_data,
+    )
+
+    dead_letter_stream_entry_mock.assert_called_once_with(failed_index, ANY)
+
+
+async def test_email_messages_coalescing(
+    faker: Faker,
+    unisender_go_mock: MockRouter,
+) -> None:
+    payload = factories.ClassroomNotificationEmailMessagePayloadFactory.build(
+        kind=EmailMessageKind.CLASSROOM_CONFERENCE_STARTED_V1
+    )
+    other_payload = factories.TokenEmailMessagePayloadFactory.build(
+        kind=EmailMessageKind.PASSWORD_RESET_V2
+    )
+    recipient_emails: list[str] = [faker.unique.email() for _ in range(10)]
+    other_recipient_email: str = faker.unique.email()
+
+    input_data = [
+        *(
+            EmailMessageInputSchema(payload=payload, recipient_emails=[recipient_email])
+            for recipient_email in recipient_emails
+        ),
+        EmailMessageInputSchema(
+            payload=other_payload, recipient_emails=[other_recipient_email]
+        ),
+        EmailMessageInputSchema(  # duplicate recipients are sent only once
+            payload=payload, recipient_emails=recipient_emails[:2]
+        ),
+    ]
+
+    unisender_go_send_mock = unisender_go_mock.post(
+        path="/api/v1/email/send.json",
+    ).respond(
+        json=factories.UnisenderGoSendEmailSuccessfulResponseFactory.build_json(
+            emails=[*recipient_emails, other_recipient_email]
+        )
+    )
+
+    await send_email_messages(
+        unisender_go_client=unisender_go_client_manager(),
+        data=input_data,
+    )
+
+    assert unisender_go_send_mock.call_count == 2
+    assert [
+        (
+            request_data["message"]["template_id"],
+            [recipient["email"] for recipient in request_data["message"]["recipients"]],
+        )
+        for request_data in (
+            json.loads(mock_call.request.content)
+            for mock_call in unisender_go_send_mock.calls
+        )
+    ] == [
+        (KIND_TO_TEMPLATE_ID[payload.kind], recipient_emails),
+        (KIND_TO_TEMPLATE_ID[other_payload.kind], [other_recipient_email]),
+    ]
+
+
+async def test_email_messages_coalescing_maps_recipients_to_input_data(
+    faker: Faker,
+) -> None:
+    payload = factories.TokenEmailMessagePayloadFactory.build(
+        kind=EmailMessageKind.EMAIL_CONFIRMATION_V2
+    )
+    input_data = [
+        EmailMessageInputSchema(payload=payload, recipient_emails=[faker.email()])
+        for _ in range(3)
+    ]
+
+    (coalesced,) = coalesce_email_messages(input_data)
+
+    assert coalesced.recipient_email_to_input_data == {
+        message.recipient_emails[0]: message for message in input_data
+    }
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from hashlib import sha256
 from os import stat
 from typing import Any, Protocol
 from uuid import UUID, uuid4
@@ -12,6 +13,7 @@ from starlette.testclient import TestClient
 from app.common.config import settings, storage_token_provider
 from app.common.dependencies.authorization_dep import ProxyAuthData
 from app.storage_v2.models.access_groups_db import AccessGroup, AccessGroupFile
+from app.storage_v2.models.blobs_db import Blob
 from app.storage_v2.models.files_db import File, FileKind
 from app.storage_v2.models.ydocs_db import YDoc
 from tests.common.active_session import ActiveSession
@@ -151,22 +153,26 @@ def parametrized_file_input_data(
     return request.param
 
 
+async def create_file_with_content(name: str, kind: FileKind, content: bytes) -> File:
+    blob = await Blob.acquire(sha256=sha256(content).hexdigest(), size=len(content))
+    blob.path.parent.mkdir(parents=True, exist_ok=True)
+    with blob.path.open("wb") as f:
+        f.write(content)
+    return await File.create(name=name, kind=kind, blob_sha256=blob.sha256)
+
+
 @pytest.fixture()
 async def file(
     active_session: ActiveSession,
     parametrized_file_input_data: FileInputData,
 ) -> File:
     async with active_session():
-        file = await File.create(
+        return await create_file_with_content(
             name=parametrized_file_input_data.name,
             kind=parametrized_file_input_data.kind,
+            content=parametrized_file_input_data.content,
         )
 
-    with file.path.open("wb") as f:
-        f.write(parametrized_file_input_data.content)
-
-    return file
-
 
 @pytest.fixture()
 def file_data(file: File) -> AnyJSON:
@@ -194,8 +200,8 @@ def file_response(file: File) -> FileResponse:
 
 
 @pytest.fixture()
-def file_etag(file_response: FileResponse) -> str | None:
-    return file_response.headers["etag"]
+def file_etag(file: File) -> str | None:
+    return file.etag
 
 
 @pytest.fixture()
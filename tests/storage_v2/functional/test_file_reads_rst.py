@@ -1,19 +1,28 @@
+from io import BytesIO
 from uuid import UUID
 
 import pytest
+from PIL import Image
 from pytest_lazy_fixtures import lf, lfc
 from starlette import status
 from starlette.testclient import TestClient
 
-from app.common.config import storage_token_provider
+from app.common.config import (
+    StorageOffloadMode,
+    StorageOffloadSettings,
+    settings,
+    storage_token_provider,
+)
 from app.common.schemas.storage_sch import StorageTokenPayloadSchema
 from app.storage_v2.models.access_groups_db import AccessGroupFile
+from app.storage_v2.models.blobs_db import Blob
 from app.storage_v2.models.files_db import (
     FILE_KIND_TO_CONTENT_DISPOSITION,
     ContentDisposition,
     File,
 )
 from tests.common.assert_contains_ext import assert_nodata_response, assert_response
+from tests.common.mock_stack import MockStack
 from tests.common.types import AnyJSON
 from tests.storage_v2 import factories
 from tests.storage_v2.conftest import FileInputData
@@ -121,6 +130,182 @@ async def test_file_reading_not_modified_by_datetime(
     )
 
 
+async def test_file_reading_byte_range(
+    authorized_client: TestClient,
+    parametrized_file_input_data: FileInputData,
+    access_group_file: AccessGroupFile,
+    file_read_storage_token: str,
+    file_etag: str,
+) -> None:
+    content = parametrized_file_input_data.content
+
+    response = assert_response(
+        authorized_client.get(
+            f"/api/protected/storage-service/v2/files/{access_group_file.file_id}/",
+            headers={
+                "X-Storage-Token": file_read_storage_token,
+                "Range": "bytes=0-9",
+                "If-Range": file_etag,
+            },
+        ),
+        expected_code=status.HTTP_206_PARTIAL_CONTENT,
+        expected_headers={
+            "ETag": file_etag,
+            "Content-Range": f"bytes 0-9/{len(content)}",
+            "Content-Type": str,
+        },
+        expected_json=None,
+    )
+    assert response.content == content[:10]
+
+
+async def test_file_reading_multiple_byte_ranges(
+    authorized_client: TestClient,
+    parametrized_file_input_data: FileInputData,
+    access_group_file: AccessGroupFile,
+    file_read_storage_token: str,
+) -> None:
+    content = parametrized_file_input_data.content
+
+    response = assert_response(
+        authorized_client.get(
+            f"/api/protected/storage-service/v2/files/{access_group_file.file_id}/",
+            headers={
+                "X-Storage-Token": file_read_storage_token,
+                "Range": "bytes=0-4,10-14",
+            },
+        ),
+        expected_code=status.HTTP_206_PARTIAL_CONTENT,
+        expected_headers={"Content-Type": str},
+        expected_json=None,
+    )
+    assert response.headers["Content-Type"].startswith("multipart/byteranges")
+    assert f"bytes 0-4/{len(content)}".encode() in response.content
+    assert content[:5] in response.content
+    assert f"bytes 10-14/{len(content)}".encode() in response.content
+    assert content[10:15] in response.content
+
+
+async def test_file_reading_byte_range_outdated(
+    authorized_client: TestClient,
+    parametrized_file_input_data: FileInputData,
+    access_group_file: AccessGroupFile,
+    file_read_storage_token: str,
+) -> None:
+    response = assert_response(
+        authorized_client.get(
+            f"/api/protected/storage-service/v2/files/{access_group_file.file_id}/",
+            headers={
+                "X-Storage-Token": file_read_storage_token,
+                "Range": "bytes=0-9",
+                "If-Range": '"outdated"',
+            },
+        ),
+        expected_headers={"Content-Type": str},
+        expected_json=None,
+    )
+    assert response.content == parametrized_file_input_data.content
+
+
+@pytest.mark.parametrize(
+    ("offload_mode", "header_name"),
+    [
+        pytest.param(
+            StorageOffloadMode.X_ACCEL_REDIRECT,
+            "X-Accel-Redirect",
+            id="x_accel_redirect",
+        ),
+        pytest.param(StorageOffloadMode.X_SENDFILE, "X-Sendfile", id="x_sendfile"),
+    ],
+)
+async def test_file_reading_offloaded(
+    mock_stack: MockStack,
+    authorized_client: TestClient,
+    file: File,
+    access_group_file: AccessGroupFile,
+    file_read_storage_token: str,
+    file_etag: str,
+    offload_mode: StorageOffloadMode,
+    header_name: str,
+) -> None:
+    storage_offload = StorageOffloadSettings(mode=offload_mode)
+    mock_stack.enter_patch(settings, "storage_offload", new=storage_offload)
+
+    response = assert_response(
+        authorized_client.get(
+            f"/api/protected/storage-service/v2/files/{access_group_file.file_id}/",
+            headers={"X-Storage-Token": file_read_storage_token},
+        ),
+        expected_headers={
+            "ETag": file_etag,
+            "Content-Type": str,
+            "Content-Disposition": str,
+        },
+        expected_json=None,
+    )
+    assert response.content == b""
+    assert response.headers[header_name] == (
+        storage_offload.location
+        + file.path.relative_to(settings.storage_path).as_posix()
+        if offload_mode is StorageOffloadMode.X_ACCEL_REDIRECT
+        else str(file.path)
+    )
+
+
+@pytest.mark.parametrize(
+    "parametrized_file_input_data",
+    [pytest.param(lf("image_file_input_data"), id="image")],
+)
+async def test_image_variant_reading(
+    authorized_client: TestClient,
+    file: File,
+    access_group_file: AccessGroupFile,
+    file_read_storage_token: str,
+) -> None:
+    size = 64
+    assert file.blob_sha256 is not None
+    variant_path = Blob.build_variant_path(file.blob_sha256, size)
+
+    for _ in range(2):  # rendered on the first read, cached for the second one
+        response = assert_response(
+            authorized_client.get(
+                f"/api/protected/storage-service/v2/files/{access_group_file.file_id}/",
+                params={"size": size},
+                headers={"X-Storage-Token": file_read_storage_token},
+            ),
+            expected_headers={
+                "ETag": f'"{file.blob_sha256}.{size}"',
+                "Content-Type": "image/webp",
+            },
+            expected_json=None,
+        )
+        assert response.content == variant_path.read_bytes()
+
+    with Image.open(BytesIO(response.content)) as image:
+        assert image.format == "WEBP"
+        assert max(image.size) <= size
+
+
+@pytest.mark.parametrize(
+    "parametrized_file_input_data",
+    [pytest.param(lf("uncategorized_file_input_data"), id="uncategorized")],
+)
+async def test_image_variant_reading_not_an_image(
+    authorized_client: TestClient,
+    access_group_file: AccessGroupFile,
+    file_read_storage_token: str,
+) -> None:
+    assert_response(
+        authorized_client.get(
+            f"/api/protected/storage-service/v2/files/{access_group_file.file_id}/",
+            params={"size": 64},
+            headers={"X-Storage-Token": file_read_storage_token},
+        ),
+        expected_code=status.HTTP_409_CONFLICT,
+        expected_json={"detail": "Only images can be resized"},
+    )
+
+
 file_reading_request_parametrization = pytest.mark.parametrize(
     ("method", "postfix"),
     [
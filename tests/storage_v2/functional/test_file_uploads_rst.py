@@ -5,12 +5,14 @@ from pytest_lazy_fixtures import lf, lfc
 from starlette import status
 from starlette.testclient import TestClient
 
-from app.common.config import storage_token_provider
+from app.common.config import settings, storage_token_provider
 from app.common.schemas.storage_sch import StorageTokenPayloadSchema
 from app.storage_v2.models.access_groups_db import AccessGroup, AccessGroupFile
+from app.storage_v2.models.blobs_db import Blob
 from app.storage_v2.models.files_db import File
 from tests.common.active_session import ActiveSession
 from tests.common.assert_contains_ext import assert_response
+from tests.common.mock_stack import MockStack
 from tests.storage_v2 import factories
 from tests.storage_v2.conftest import FileInputData
 
@@ -78,6 +80,89 @@ async def test_file_uploading(
         await file.delete()
 
 
+async def test_file_uploading_duplicate_content(
+    active_session: ActiveSession,
+    authorized_client: TestClient,
+    parametrized_file_input_data: FileInputData,
+    file_upload_storage_token: str,
+) -> None:
+    file_ids: list[UUID] = [
+        assert_response(
+            authorized_client.post(
+                "/api/protected/storage-service/v2"
+                f"/file-kinds/{parametrized_file_input_data.kind}/files/",
+                headers={"X-Storage-Token": file_upload_storage_token},
+                files={
+                    "upload": (
+                        parametrized_file_input_data.name,
+                        parametrized_file_input_data.content,
+                        parametrized_file_input_data.content_type,
+                    )
+                },
+            ),
+            expected_code=status.HTTP_201_CREATED,
+        ).json()["id"]
+        for _ in range(2)
+    ]
+
+    async with active_session():
+        files = [await File.find_first_by_id(file_id) for file_id in file_ids]
+        assert files[0] is not None
+        assert files[1] is not None
+        assert files[0].blob_sha256 == files[1].blob_sha256
+
+        blob = await Blob.find_first_by_id(files[0].blob_sha256)
+        assert blob is not None
+        assert blob.size == len(parametrized_file_input_data.content)
+        assert blob.refcount == 2
+
+        for file in files:
+            await AccessGroupFile.delete_by_kwargs(file_id=file.id)
+            await file.delete()
+
+    async with active_session():
+        assert await Blob.find_first_by_id(blob.sha256) is None
+    assert not blob.path.is_file()
+
+
+async def test_file_uploading_too_large(
+    mock_stack: MockStack,
+    active_session: ActiveSession,
+    authorized_client: TestClient,
+    access_group: AccessGroup,
+    parametrized_file_input_data: FileInputData,
+    file_upload_storage_token: str,
+) -> None:
+    mock_stack.enter_patch(
+        settings.uploads,
+        "max_file_size",
+        new=len(parametrized_file_input_data.content) - 1,
+    )
+
+    assert_response(
+        authorized_client.post(
+            "/api/protected/storage-service/v2"
+            f"/file-kinds/{parametrized_file_input_data.kind}/files/",
+            headers={"X-Storage-Token": file_upload_storage_token},
+            files={
+                "upload": (
+                    parametrized_file_input_data.name,
+                    parametrized_file_input_data.content,
+                    parametrized_file_input_data.content_type,
+                )
+            },
+        ),
+        expected_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        expected_json={"detail": "Upload is too large"},
+    )
+
+    async with active_session():
+        assert (
+            await AccessGroupFile.find_first_by_kwargs(access_group_id=access_group.id)
+            is None
+        )
+
+
 async def test_image_file_uploading_wrong_content_format(
     authorized_client: TestClient,
     uncategorized_file_content: bytes,
@@ -0,0 +1,38 @@
+import pytest
+from faker import Faker
+from starlette.testclient import TestClient
+
+from app.storage_v2.models.files_db import File, FileKind
+from tests.common.active_session import ActiveSession
+from tests.common.assert_contains_ext import assert_response
+from tests.storage_v2.conftest import create_file_with_content
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_orphaned_files_reporting(
+    faker: Faker,
+    active_session: ActiveSession,
+    mub_client: TestClient,
+) -> None:
+    content: bytes = faker.bin_file(raw=True)
+    async with active_session():
+        orphaned_file = await create_file_with_content(
+            name=faker.file_name(),
+            kind=FileKind.UNCATEGORIZED,
+            content=content,
+        )
+
+    report = assert_response(
+        mub_client.get("/mub/storage-service/v2/files/orphaned/report/"),
+        expected_json={"files_count": int, "reclaimed_bytes": int},
+    ).json()
+    assert report["files_count"] >= 1
+    assert report["reclaimed_bytes"] >= len(content)
+
+    async with active_session():
+        # nothing is deleted by the report
+        existing_file = await File.find_first_by_id(orphaned_file.id)
+        assert existing_file is not None
+        assert orphaned_file.path.is_file()
+        await existing_file.delete()
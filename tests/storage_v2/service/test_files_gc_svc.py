@@ -0,0 +1,136 @@
+from collections.abc import AsyncIterator
+
+import pytest
+from faker import Faker
+from redis.asyncio import Redis
+
+from app.storage_v2.models.access_groups_db import AccessGroup, AccessGroupFile
+from app.storage_v2.models.blobs_db import Blob
+from app.storage_v2.models.files_db import File, FileKind
+from app.storage_v2.services.files_gc_svc import FilesGC
+from tests.common.active_session import ActiveSession
+from tests.common.redis_testing import RedisStandIn
+from tests.storage_v2.conftest import create_file_with_content
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_collecting_orphaned_files(
+    faker: Faker,
+    active_session: ActiveSession,
+    access_group: AccessGroup,
+) -> None:
+    shared_content: bytes = faker.bin_file(raw=True)
+    orphaned_content: bytes = faker.bin_file(raw=True)
+    async with active_session():
+        linked_file = await create_file_with_content(
+            name=faker.file_name(),
+            kind=FileKind.UNCATEGORIZED,
+            content=shared_content,
+        )
+        await AccessGroupFile.create(
+            access_group_id=access_group.id,
+            file_id=linked_file.id,
+        )
+        orphaned_files = [
+            await create_file_with_content(
+                name=faker.file_name(),
+                kind=FileKind.UNCATEGORIZED,
+                content=content,
+            )
+            for content in (shared_content, orphaned_content)
+        ]
+
+    report = await FilesGC(redis=None, batch_size=1, interval=0).collect()
+    assert report.files_count >= len(orphaned_files)
+    assert report.reclaimed_bytes >= len(orphaned_content)
+
+    async with active_session():
+        for orphaned_file in orphaned_files:
+            assert await File.find_first_by_id(orphaned_file.id) is None
+        assert not orphaned_files[1].path.exists()
+
+        shared_blob = await Blob.find_first_by_id(linked_file.blob_sha256)
+        assert shared_blob is not None
+        assert shared_blob.refcount == 1
+        assert shared_blob.path.is_file()
+
+        remaining_file = await File.find_first_by_id(linked_file.id)
+        assert remaining_file is not None
+        await AccessGroupFile.delete_by_kwargs(file_id=remaining_file.id)
+        await remaining_file.delete()
+
+
+async def test_purging_file_rolled_back(
+    faker: Faker,
+    active_session: ActiveSession,
+) -> None:
+    async with active_session():
+        file = await create_file_with_content(
+            name=faker.file_name(),
+            kind=FileKind.UNCATEGORIZED,
+            content=faker.bin_file(raw=True),
+        )
+
+    with pytest.raises(RuntimeError):
+        async with active_session():
+            purged_file = await File.find_first_by_id(file.id)
+            assert purged_file is not None
+            await purged_file.purge()
+            raise RuntimeError
+
+    # the content is only removed after the deletion commits
+    assert file.path.is_file()
+
+    async with active_session():
+        blob = await Blob.find_first_by_id(file.blob_sha256)
+        assert blob is not None
+        assert blob.refcount == 1
+
+        purged_file = await File.find_first_by_id(file.id)
+        assert purged_file is not None
+        await purged_file.purge()
+
+    assert not file.path.exists()
+
+    async with active_session():  # the placeholder row is never persisted
+        assert await Blob.find_first_by_id(file.blob_sha256) is None
+
+
+async def test_unlinking_released_content_acquired_again(
+    faker: Faker,
+    active_session: ActiveSession,
+) -> None:
+    async with active_session():
+        file = await create_file_with_content(
+            name=faker.file_name(),
+            kind=FileKind.UNCATEGORIZED,
+            content=faker.bin_file(raw=True),
+        )
+
+    async with active_session():
+        await Blob.unlink_released_content(file.blob_sha256)
+
+    assert file.path.is_file()
+
+    async with active_session():
+        blob = await Blob.find_first_by_id(file.blob_sha256)
+        assert blob is not None
+        assert blob.refcount == 1
+
+        purged_file = await File.find_first_by_id(file.id)
+        assert purged_file is not None
+        await purged_file.purge()
+
+
+@pytest.fixture()
+async def redis() -> AsyncIterator[Redis]:
+    async with RedisStandIn().serve() as redis_url:
+        async with Redis.from_url(redis_url) as redis:
+            yield redis
+
+
+async def test_collecting_on_one_instance_per_interval(redis: Redis) -> None:
+    files_gcs = [FilesGC(redis=redis, batch_size=1, interval=60) for _ in range(2)]
+
+    assert [await files_gc.acquire_lock() for files_gc in files_gcs] == [True, False]
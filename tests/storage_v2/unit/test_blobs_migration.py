@@ -0,0 +1,50 @@
+from hashlib import sha256
+
+import pytest
+from faker import Faker
+
+from app.storage_v2.blobs_migration import migrate_files
+from app.storage_v2.models.blobs_db import Blob
+from app.storage_v2.models.files_db import File, FileKind
+from tests.common.active_session import ActiveSession
+
+pytestmark = pytest.mark.anyio
+
+
+async def create_legacy_file(faker: Faker, content: bytes | None) -> File:
+    file = await File.create(name=faker.file_name(), kind=FileKind.UNCATEGORIZED)
+    if content is not None:
+        file.legacy_path.parent.mkdir(parents=True, exist_ok=True)
+        file.legacy_path.write_bytes(content)
+    return file
+
+
+async def test_migrating_files_into_blobs(
+    faker: Faker,
+    active_session: ActiveSession,
+) -> None:
+    content: bytes = faker.bin_file(raw=True)
+    async with active_session():
+        files = [await create_legacy_file(faker, content) for _ in range(2)]
+        missing_file = await create_legacy_file(faker, content=None)
+
+    assert await migrate_files(batch_size=1) == len(files)
+
+    async with active_session():
+        blob = await Blob.find_first_by_id(sha256(content).hexdigest())
+        assert blob is not None
+        assert blob.size == len(content)
+        assert blob.refcount == len(files)
+        assert blob.path.read_bytes() == content
+
+        for file in files:
+            migrated_file = await File.find_first_by_id(file.id)
+            assert migrated_file is not None
+            assert migrated_file.blob_sha256 == blob.sha256
+            assert not file.legacy_path.exists()
+            await migrated_file.delete()
+
+        skipped_file = await File.find_first_by_id(missing_file.id)
+        assert skipped_file is not None
+        assert skipped_file.blob_sha256 is None
+        await skipped_file.delete()
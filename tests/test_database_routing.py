@@ -0,0 +1,174 @@
+from collections.abc import AsyncIterator
+from unittest.mock import Mock
+
+import pytest
+from faker import Faker
+from redis.asyncio import Redis
+from sqlalchemy import Update, text, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette import status
+from starlette.testclient import TestClient
+
+from app.common.config import create_replica_sessionmaker, settings
+from app.common.database_routing import PrimaryPins, routed_session
+from app.common.sqlalchemy_ext import db
+from app.users.models.users_db import User
+from tests.common.assert_contains_ext import assert_response
+from tests.common.mock_stack import MockStack
+from tests.common.redis_testing import RedisStandIn
+
+pytestmark = pytest.mark.anyio
+
+NOTIFICATION_SERVICE_PATH = "/api/protected/notification-service/users/current"
+
+
+@pytest.fixture()
+async def replica_sessionmaker() -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    # the primary itself, with read-only transactions like on a real replica
+    replica_sessionmaker = create_replica_sessionmaker(settings.postgres_dsn)
+    yield replica_sessionmaker
+    await replica_sessionmaker.kw["bind"].dispose()
+
+
+@pytest.fixture()
+def replica_sessionmaker_mock(
+    mock_stack: MockStack,
+    replica_sessionmaker: async_sessionmaker[AsyncSession],
+) -> Mock:
+    replica_sessionmaker_mock = Mock(wraps=replica_sessionmaker)
+    mock_stack.enter_patch(
+        "app.common.database_routing.replica_sessionmakers",
+        new=[replica_sessionmaker_mock],
+    )
+    return replica_sessionmaker_mock
+
+
+@pytest.fixture()
+def primary_pins(mock_stack: MockStack) -> PrimaryPins:
+    primary_pins = PrimaryPins(redis=None, timeout=60)
+    mock_stack.enter_patch("app.common.database_routing.primary_pins", new=primary_pins)
+    return primary_pins
+
+
+def update_nothing() -> Update:
+    return update(User).filter(User.id == -1).values(username="nobody")
+
+
+async def test_replica_transactions_read_only(
+    replica_sessionmaker: async_sessionmaker[AsyncSession],
+) -> None:
+    async with replica_sessionmaker() as session:
+        assert await session.scalar(text("SHOW transaction_read_only")) == "on"
+
+        with pytest.raises(DBAPIError, match="read-only transaction"):
+            await session.execute(update_nothing())
+
+
+async def test_get_request_routed_to_replica(
+    authorized_client: TestClient,
+    replica_sessionmaker_mock: Mock,
+) -> None:
+    assert_response(
+        authorized_client.get(f"{NOTIFICATION_SERVICE_PATH}/notification-settings/"),
+        expected_json={"email": None, "telegram": None},
+    )
+
+    replica_sessionmaker_mock.assert_called_once_with()
+
+
+async def test_write_request_routed_to_primary(
+    authorized_client: TestClient,
+    replica_sessionmaker_mock: Mock,
+) -> None:
+    assert_response(
+        authorized_client.patch(
+            f"{NOTIFICATION_SERVICE_PATH}/notification-settings/email/",
+            json={"digest_window_minutes": 0},
+        ),
+        expected_code=status.HTTP_404_NOT_FOUND,
+        expected_json={"detail": "Email connection not found"},
+    )
+
+    replica_sessionmaker_mock.assert_not_called()
+
+
+async def test_read_request_routed_to_replica_explicitly(
+    authorized_client: TestClient,
+    replica_sessionmaker_mock: Mock,
+) -> None:
+    assert_response(
+        authorized_client.post(
+            f"{NOTIFICATION_SERVICE_PATH}/notifications/searches/",
+            json={},
+        ),
+        expected_json=[],
+    )
+
+    replica_sessionmaker_mock.assert_called_once_with()
+
+
+async def test_pinning_to_primary_after_write(
+    faker: Faker,
+    replica_sessionmaker_mock: Mock,
+    primary_pins: PrimaryPins,
+) -> None:
+    user_id: int = faker.random_int()
+    other_user_id: int = faker.random_int(10000, 99999)
+
+    async with routed_session(use_replica=False, user_id=user_id):
+        await db.session.execute(update_nothing())
+    assert await primary_pins.is_pinned(user_id)
+
+    async with routed_session(use_replica=True, user_id=user_id) as lazy_session:
+        assert not lazy_session.is_replica_session
+    async with routed_session(use_replica=True, user_id=other_user_id) as lazy_session:
+        assert lazy_session.is_replica_session
+        assert await db.session.scalar(text("SHOW transaction_read_only")) == "on"
+
+    replica_sessionmaker_mock.assert_called_once_with()
+
+
+async def test_not_pinning_to_primary_after_read(
+    faker: Faker,
+    replica_sessionmaker_mock: Mock,
+    primary_pins: PrimaryPins,
+) -> None:
+    user_id: int = faker.random_int()
+
+    async with routed_session(use_replica=False, user_id=user_id):
+        await db.session.get(User, user_id)
+
+    assert not await primary_pins.is_pinned(user_id)
+
+
+@pytest.fixture()
+async def redis() -> AsyncIterator[Redis]:
+    async with RedisStandIn().serve() as redis_url:
+        async with Redis.from_url(redis_url) as redis:
+            yield redis
+
+
+async def test_primary_pins_shared_between_instances(
+    faker: Faker,
+    redis: Redis,
+) -> None:
+    user_id: int = faker.random_int()
+
+    await PrimaryPins(redis=redis, timeout=60).pin(user_id)
+
+    other_instance_pins = PrimaryPins(redis=redis, timeout=60)
+    assert await other_instance_pins.is_pinned(user_id)
+    assert not await other_instance_pins.is_pinned(user_id + 1)
+
+
+async def test_primary_pins_pruned_locally() -> None:
+    primary_pins = PrimaryPins(redis=None, timeout=0)
+    primary_pins.max_local_pins = 1
+
+    await primary_pins.pin(1)
+    await primary_pins.pin(2)
+
+    # expired pins are dropped once the limit is reached
+    assert list(primary_pins.local_pins) == [2]
+    assert not await primary_pins.is_pinned(2)
@@ -1,15 +1,28 @@
-from unittest.mock import AsyncMock
+from unittest.mock import ANY, AsyncMock, call, patch
 
 import pytest
+from faststream.redis import RedisBroker
 from freezegun import freeze_time
 from pydantic_marshals.contains import assert_contains
 from socketio import packet as sio_packet  # type: ignore[import-untyped]
+from starlette import status
+from starlette.testclient import TestClient
 
+from app.common.bridges.outbox import buffered_publishing
+from app.common.config import settings
+from app.common.config_bdg import datalake_bridge
 from app.common.dependencies.authorization_dep import ProxyAuthData
+from app.common.query_stats_ext import (
+    QUERY_COUNT_HEADER_NAME,
+    QUERY_DURATION_HEADER_NAME,
+    QUERY_REPEATS_HEADER_NAME,
+)
 from app.common.schemas.datalake_sch import DatalakeEventInputSchema, DatalakeEventKind
 from app.common.utils.datetime import datetime_utc_now
 from app.communities.rooms import user_room
-from app.communities.store import user_id_to_sids
+from app.communities.store import user_sids_registry
+from tests.common.assert_contains_ext import assert_nodata_response, assert_response
+from tests.common.mock_stack import MockStack
 from tests.common.tmexio_testing import TMEXIOTestServer
 
 pytestmark = pytest.mark.anyio
@@ -23,7 +36,9 @@ async def test_socketio_connection(
 ) -> None:
     # on_connect
     async with tmexio_server.authorized_client(proxy_auth_data) as client:
-        assert user_id_to_sids[proxy_auth_data.user_id] == {client.sio_sid}
+        assert await user_sids_registry.list_sids(proxy_auth_data.user_id) == {
+            client.sio_sid
+        }
 
         assert user_room(proxy_auth_data.user_id) in client.current_rooms()
 
@@ -36,7 +51,7 @@ async def test_socketio_connection(
     )
 
     # on_disconnect
-    assert user_id_to_sids[proxy_auth_data.user_id] == set()
+    assert await user_sids_registry.list_sids(proxy_auth_data.user_id) == set()
 
 
 async def test_socketio_connection_unauthorized(
@@ -53,4 +68,128 @@ async def test_socketio_connection_unauthorized(
             },
         )
 
-        assert set.union(*user_id_to_sids.values()) == set()
+        assert len(user_sids_registry.local_user_id_to_sids) == 0
+
+
+async def test_database_session_not_started_without_usage(
+    mock_stack: MockStack,
+    client: TestClient,
+) -> None:
+    sessionmaker_mock = mock_stack.enter_mock(
+        "app.common.database_routing.sessionmaker"
+    )
+
+    assert_nodata_response(
+        client.get("/proxy/auth/", headers={"X-Request-Method": "OPTIONS"}),
+    )
+
+    sessionmaker_mock.assert_not_called()
+
+
+async def test_query_stats_collection(
+    client: TestClient,
+    mub_client: TestClient,
+) -> None:
+    assert_nodata_response(mub_client.delete("/mub/query-stats/"))
+
+    assert_nodata_response(
+        client.get("/proxy/optional-auth/"),
+        expected_headers={
+            QUERY_COUNT_HEADER_NAME: "0",
+            QUERY_DURATION_HEADER_NAME: "0.00",
+            QUERY_REPEATS_HEADER_NAME: "0",
+        },
+    )
+
+    assert_response(
+        mub_client.get("/mub/query-stats/"),
+        expected_json=[
+            {
+                "scope": "DELETE /mub/query-stats/",
+                "call_count": 1,
+                "statement_count": 0,
+            },
+            {
+                "scope": "GET /proxy/optional-auth/",
+                "call_count": 1,
+                "statement_count": 0,
+                "max_statement_count": 0,
+                "repeated_fingerprints": {},
+            },
+        ],
+    )
+
+
+async def test_query_stats_collection_unmatched(
+    client: TestClient,
+    mub_client: TestClient,
+) -> None:
+    assert_nodata_response(mub_client.delete("/mub/query-stats/"))
+
+    for path in ("/missing/1/", "/missing/2/"):
+        assert_response(
+            client.get(path),
+            expected_code=status.HTTP_404_NOT_FOUND,
+            expected_json={"detail": "Not Found"},
+        )
+    assert_response(
+        client.request("UNKNOWN", "/proxy/optional-auth/"),
+        expected_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+        expected_json={"detail": "Method Not Allowed"},
+    )
+
+    assert_response(
+        mub_client.get("/mub/query-stats/"),
+        expected_json=[
+            {"scope": "DELETE /mub/query-stats/", "call_count": 1},
+            {"scope": "http unmatched", "call_count": 3},
+        ],
+    )
+
+
+async def test_buffered_publishing(
+    mock_stack: MockStack,
+    faststream_broker: RedisBroker,
+) -> None:
+    mock_stack.enter_context(patch.object(settings.outbox, "enabled", False))
+    publish_mock = mock_stack.enter_async_mock(faststream_broker, "publish")
+    events = [
+        DatalakeEventInputSchema(
+            kind=DatalakeEventKind.OPEN_SOCKETIO_CONNECTION, user_id=user_id
+        )
+        for user_id in range(3)
+    ]
+
+    async with buffered_publishing():
+        await datalake_bridge.record_datalake_event(events[0])
+        await datalake_bridge.record_datalake_events(events[1:])
+        publish_mock.assert_not_called()
+
+    publish_mock.assert_has_awaits(
+        [
+            call(
+                message=event.model_dump(mode="json"),
+                stream=settings.datalake_events_record_stream_name,
+                pipeline=ANY,
+            )
+            for event in events
+        ]
+    )
+
+
+async def test_buffered_publishing_failed(
+    mock_stack: MockStack,
+    faststream_broker: RedisBroker,
+) -> None:
+    publish_mock = mock_stack.enter_async_mock(faststream_broker, "publish")
+
+    with pytest.raises(RuntimeError):
+        async with buffered_publishing():
+            await datalake_bridge.record_datalake_event(
+                DatalakeEventInputSchema(
+                    kind=DatalakeEventKind.OPEN_SOCKETIO_CONNECTION, user_id=1
+                )
+            )
+            raise RuntimeError
+
+    publish_mock.assert_not_called()
@@ -0,0 +1,91 @@
+import pytest
+from faststream.redis import RedisBroker
+from sqlalchemy import select
+
+from app.common.bridges.outbox import buffered_publishing, outbox_relay
+from app.common.config import settings
+from app.common.config_bdg import datalake_bridge
+from app.common.models.outbox_messages_db import OutboxMessage
+from app.common.schemas.datalake_sch import DatalakeEventInputSchema, DatalakeEventKind
+from app.common.sqlalchemy_ext import db
+from tests.common.active_session import ActiveSession
+from tests.common.mock_stack import MockStack
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def datalake_event() -> DatalakeEventInputSchema:
+    return DatalakeEventInputSchema(
+        kind=DatalakeEventKind.OPEN_SOCKETIO_CONNECTION,
+        user_id=1,
+    )
+
+
+async def find_outbox_messages(
+    datalake_event: DatalakeEventInputSchema,
+) -> list[OutboxMessage]:
+    return [
+        outbox_message
+        for outbox_message in await db.get_all(select(OutboxMessage))
+        if outbox_message.message == datalake_event.model_dump(mode="json")
+    ]
+
+
+async def test_publishing_through_outbox(
+    mock_stack: MockStack,
+    active_session: ActiveSession,
+    faststream_broker: RedisBroker,
+    datalake_event: DatalakeEventInputSchema,
+) -> None:
+    publish_mock = mock_stack.enter_async_mock(faststream_broker, "publish")
+    wake_mock = mock_stack.enter_mock(outbox_relay, "wake")
+
+    async with buffered_publishing():
+        async with active_session():
+            await datalake_bridge.record_datalake_event(datalake_event)
+
+    publish_mock.assert_not_called()
+    wake_mock.assert_called_once_with()
+
+    async with active_session():
+        outbox_messages = await find_outbox_messages(datalake_event)
+        assert len(outbox_messages) == 1
+        assert outbox_messages[0].stream == settings.datalake_events_record_stream_name
+
+    while await outbox_relay.relay_batch(faststream_broker) != 0:
+        pass
+
+    assert {
+        "message": datalake_event.model_dump(mode="json"),
+        "stream": settings.datalake_events_record_stream_name,
+    } in [
+        {
+            "message": publish_call.kwargs["message"],
+            "stream": publish_call.kwargs["stream"],
+        }
+        for publish_call in publish_mock.await_args_list
+    ]
+
+    async with active_session():
+        assert await find_outbox_messages(datalake_event) == []
+
+
+async def test_outbox_rolled_back(
+    mock_stack: MockStack,
+    active_session: ActiveSession,
+    faststream_broker: RedisBroker,
+    datalake_event: DatalakeEventInputSchema,
+) -> None:
+    publish_mock = mock_stack.enter_async_mock(faststream_broker, "publish")
+
+    with pytest.raises(RuntimeError):
+        async with buffered_publishing():
+            async with active_session():
+                await datalake_bridge.record_datalake_event(datalake_event)
+                raise RuntimeError
+
+    publish_mock.assert_not_called()
+
+    async with active_session():
+        assert await find_outbox_messages(datalake_event) == []
@@ -0,0 +1,369 @@
+from typing import Any
+from unittest.mock import AsyncMock, Mock, call
+
+import pytest
+from faststream import ContextRepo
+from faststream.redis import BinaryMessageFormatV1, RedisBroker
+from faststream.redis.message import bDATA_KEY
+from starlette.testclient import TestClient
+
+from app.common.config import StreamRetrySettings, settings
+from app.common.config_faststream import stream_dead_letters
+from app.common.faststream_ext import (
+    StreamDeadLetters,
+    StreamPendingReclaimer,
+    StreamRetryMiddleware,
+    dead_letter_stream_entry,
+    find_subscriber_stream_sub,
+)
+from app.notifications.routes.notifications_sub import NOTIFICATION_SERVICE_GROUP_NAME
+from tests.common.assert_contains_ext import assert_response
+from tests.common.mock_stack import MockStack
+
+pytestmark = pytest.mark.anyio
+
+STREAM_NAME = settings.notifications_send_stream_name
+DEAD_LETTERS_STREAM_NAME = StreamDeadLetters.build_stream_name(
+    STREAM_NAME, NOTIFICATION_SERVICE_GROUP_NAME
+)
+DEAD_LETTERS_PATH = (
+    f"/mub/stream-dead-letters/{STREAM_NAME}/{NOTIFICATION_SERVICE_GROUP_NAME}"
+)
+MESSAGE_ID = b"1700000000000-0"
+RETRY = StreamRetrySettings(
+    max_attempts=3,
+    initial_delay=0,
+    max_delay=0,
+    reclaim_batch_size=10,
+    max_deliveries=2,
+)
+
+
+@pytest.fixture()
+def subscriber(faststream_broker: RedisBroker) -> Any:
+    for subscriber in faststream_broker.subscribers:
+        stream_sub = find_subscriber_stream_sub(subscriber)
+        if stream_sub is not None and stream_sub.name == STREAM_NAME:
+            return subscriber
+    raise AssertionError("Subscriber not found")
+
+
+@pytest.fixture()
+def message_fields() -> dict[bytes, bytes]:
+    return {
+        bDATA_KEY: BinaryMessageFormatV1.encode(
+            message={"key": "value"},
+            reply_to=None,
+            headers={"header": "value"},
+            correlation_id="correlation",
+        )
+    }
+
+
+@pytest.fixture()
+def xadd_mock(
+    mock_stack: MockStack,
+    faststream_broker: RedisBroker,
+) -> AsyncMock:
+    return mock_stack.enter_async_mock(
+        faststream_broker.config.broker_config.connection.client, "xadd"
+    )
+
+
+async def consume_with_retries(
+    subscriber: Any,
+    message_fields: dict[bytes, bytes],
+    call_next: AsyncMock,
+) -> Any:
+    context = ContextRepo()
+    message = Mock(
+        raw_message={
+            "type": "stream",
+            "channel": STREAM_NAME,
+            "message_ids": [MESSAGE_ID],
+            "data": message_fields,
+        }
+    )
+    middleware = StreamRetryMiddleware(
+        message.raw_message,
+        context=context,
+        dead_letters=stream_dead_letters,
+        retry=RETRY,
+    )
+    with context.scope("handler_", subscriber):
+        return await middleware.consume_scope(call_next, message)
+
+
+async def test_retrying_failed_message(
+    subscriber: Any,
+    message_fields: dict[bytes, bytes],
+    xadd_mock: AsyncMock,
+) -> None:
+    call_next_mock = AsyncMock(side_effect=[RuntimeError, RuntimeError, "result"])
+
+    assert (
+        await consume_with_retries(subscriber, message_fields, call_next_mock)
+        == "result"
+    )
+
+    assert call_next_mock.await_count == RETRY.max_attempts
+    xadd_mock.assert_not_called()
+
+
+async def test_dead_lettering_failed_message(
+    subscriber: Any,
+    message_fields: dict[bytes, bytes],
+    xadd_mock: AsyncMock,
+) -> None:
+    call_next_mock = AsyncMock(side_effect=RuntimeError("failure"))
+
+    assert (
+        await consume_with_retries(subscriber, message_fields, call_next_mock) is None
+    )
+
+    assert call_next_mock.await_count == RETRY.max_attempts
+    xadd_mock.assert_awaited_once()
+    assert xadd_mock.await_args is not None
+    assert xadd_mock.await_args.args[0] == DEAD_LETTERS_STREAM_NAME
+    assert xadd_mock.await_args.args[1] == {
+        **message_fields,
+        StreamDeadLetters.message_id_key: MESSAGE_ID,
+        StreamDeadLetters.error_key: "RuntimeError('failure')",
+        StreamDeadLetters.failed_at_key: xadd_mock.await_args.args[1][
+            StreamDeadLetters.failed_at_key
+        ],
+    }
+
+
+async def test_dead_lettering_single_entry(
+    subscriber: Any,
+    message_fields: dict[bytes, bytes],
+    xadd_mock: AsyncMock,
+) -> None:
+    async def handle_message(_message: Any) -> str:
+        dead_letter_stream_entry(0, "failure")
+        return "result"
+
+    assert (
+        await consume_with_retries(
+            subscriber, message_fields, AsyncMock(side_effect=handle_message)
+        )
+        == "result"
+    )
+
+    xadd_mock.assert_awaited_once()
+    assert xadd_mock.await_args is not None
+    assert xadd_mock.await_args.args[0] == DEAD_LETTERS_STREAM_NAME
+    assert xadd_mock.await_args.args[1][StreamDeadLetters.error_key] == "failure"
+
+
+async def test_dead_lettering_single_entry_retried(
+    subscriber: Any,
+    message_fields: dict[bytes, bytes],
+    xadd_mock: AsyncMock,
+) -> None:
+    attempts: list[int] = []
+
+    async def handle_message(_message: Any) -> str:
+        attempts.append(len(attempts) + 1)
+        dead_letter_stream_entry(0, f"failure {len(attempts)}")
+        if len(attempts) == 1:
+            raise RuntimeError
+        return "result"
+
+    assert (
+        await consume_with_retries(
+            subscriber, message_fields, AsyncMock(side_effect=handle_message)
+        )
+        == "result"
+    )
+
+    assert attempts == [1, 2]
+    xadd_mock.assert_awaited_once()
+    assert xadd_mock.await_args is not None
+    assert xadd_mock.await_args.args[1][StreamDeadLetters.error_key] == "failure 2"
+
+
+async def test_dead_lettering_single_entry_of_failed_message(
+    subscriber: Any,
+    message_fields: dict[bytes, bytes],
+    xadd_mock: AsyncMock,
+) -> None:
+    async def handle_message(_message: Any) -> str:
+        dead_letter_stream_entry(0, "failure")
+        raise RuntimeError("message failure")
+
+    assert (
+        await consume_with_retries(
+            subscriber, message_fields, AsyncMock(side_effect=handle_message)
+        )
+        is None
+    )
+
+    xadd_mock.assert_awaited_once()  # the whole message, not the single entry
+    assert xadd_mock.await_args is not None
+    assert (
+        xadd_mock.await_args.args[1][StreamDeadLetters.error_key]
+        == "RuntimeError('message failure')"
+    )
+
+
+async def test_reclaiming_pending_entries(
+    mock_stack: MockStack,
+    faststream_broker: RedisBroker,
+    subscriber: Any,
+    message_fields: dict[bytes, bytes],
+    xadd_mock: AsyncMock,
+) -> None:
+    overdelivered_message_id = b"1700000000001-0"
+    client = faststream_broker.config.broker_config.connection.client
+
+    mock_stack.enter_async_mock(
+        client,
+        "xautoclaim",
+        mock=AsyncMock(
+            side_effect=lambda name, *_args, **_kwargs: (
+                [
+                    b"0-0",
+                    [
+                        (MESSAGE_ID, message_fields),
+                        (overdelivered_message_id, message_fields),
+                    ],
+                    [],
+                ]
+                if name == STREAM_NAME
+                else [b"0-0", [], []]
+            )
+        ),
+    )
+    xpending_range_mock = mock_stack.enter_async_mock(
+        client,
+        "xpending_range",
+        return_value=[
+            {"message_id": MESSAGE_ID, "times_delivered": 2},
+            {"message_id": overdelivered_message_id, "times_delivered": 3},
+        ],
+    )
+    xack_mock = mock_stack.enter_async_mock(client, "xack")
+    consume_mock = mock_stack.enter_async_mock(subscriber, "consume")
+
+    reclaimer = StreamPendingReclaimer(
+        broker=faststream_broker,
+        dead_letters=stream_dead_letters,
+        retry=RETRY,
+    )
+    assert await reclaimer.reclaim() == 2
+
+    xpending_range_mock.assert_awaited_once()
+    consume_mock.assert_awaited_once_with(
+        {
+            "type": "stream",
+            "channel": STREAM_NAME,
+            "data": message_fields,
+            "message_ids": [MESSAGE_ID],
+        }
+    )
+    xadd_mock.assert_awaited_once()
+    assert xadd_mock.await_args is not None
+    assert xadd_mock.await_args.args[0] == DEAD_LETTERS_STREAM_NAME
+    xack_mock.assert_awaited_once_with(
+        STREAM_NAME, NOTIFICATION_SERVICE_GROUP_NAME, overdelivered_message_id
+    )
+
+
+@pytest.fixture()
+def dead_letter_fields(message_fields: dict[bytes, bytes]) -> dict[bytes, bytes]:
+    return {
+        **message_fields,
+        StreamDeadLetters.message_id_key: MESSAGE_ID,
+        StreamDeadLetters.error_key: b"RuntimeError('failure')",
+        StreamDeadLetters.failed_at_key: b"2024-01-01T00:00:00+00:00",
+    }
+
+
+async def test_listing_dead_letters(
+    mock_stack: MockStack,
+    mub_client: TestClient,
+    faststream_broker: RedisBroker,
+    dead_letter_fields: dict[bytes, bytes],
+) -> None:
+    xrevrange_mock = mock_stack.enter_async_mock(
+        faststream_broker.config.broker_config.connection.client,
+        "xrevrange",
+        return_value=[(b"1800000000000-0", dead_letter_fields)],
+    )
+
+    assert_response(
+        mub_client.get(
+            f"{DEAD_LETTERS_PATH}/",
+            params={"limit": 10},
+        ),
+        expected_json=[
+            {
+                "id": "1800000000000-0",
+                "message_id": MESSAGE_ID.decode(),
+                "error": "RuntimeError('failure')",
+                "failed_at": "2024-01-01T00:00:00Z",
+                "headers": {"header": "value"},
+                "body": str,
+            }
+        ],
+    )
+
+    xrevrange_mock.assert_awaited_once_with(DEAD_LETTERS_STREAM_NAME, count=10)
+
+
+async def test_replaying_dead_letters(
+    mock_stack: MockStack,
+    mub_client: TestClient,
+    faststream_broker: RedisBroker,
+    message_fields: dict[bytes, bytes],
+    dead_letter_fields: dict[bytes, bytes],
+    xadd_mock: AsyncMock,
+) -> None:
+    client = faststream_broker.config.broker_config.connection.client
+    xrange_mock = mock_stack.enter_async_mock(
+        client,
+        "xrange",
+        mock=AsyncMock(
+            side_effect=lambda _name, min, max: (  # noqa: WPS125  # redis naming
+                [(b"1800000000000-0", dead_letter_fields)]
+                if min == "1800000000000-0"
+                else []
+            )
+        ),
+    )
+    xdel_mock = mock_stack.enter_async_mock(client, "xdel")
+
+    assert_response(
+        mub_client.post(
+            f"{DEAD_LETTERS_PATH}/replay/",
+            json={"dead_letter_ids": ["1800000000000-0", "1900000000000-0"]},
+        ),
+        expected_json=["1800000000000-0"],
+    )
+
+    assert xrange_mock.await_count == 2
+    xadd_mock.assert_awaited_once_with(STREAM_NAME, message_fields)
+    xdel_mock.assert_has_awaits([call(DEAD_LETTERS_STREAM_NAME, b"1800000000000-0")])
+
+
+@pytest.mark.parametrize(
+    ("stream_name", "group_name"),
+    [
+        pytest.param(STREAM_NAME, "unknown-service", id="unknown_group"),
+        pytest.param(
+            "unknown-stream", NOTIFICATION_SERVICE_GROUP_NAME, id="unknown_stream"
+        ),
+    ],
+)
+async def test_listing_dead_letters_consumer_group_not_found(
+    mub_client: TestClient,
+    stream_name: str,
+    group_name: str,
+) -> None:
+    assert_response(
+        mub_client.get(f"/mub/stream-dead-letters/{stream_name}/{group_name}/"),
+        expected_code=404,
+        expected_json={"detail": "Consumer group not found"},
+    )
@@ -0,0 +1,67 @@
+from hashlib import sha256
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from faker import Faker
+from fastapi import HTTPException
+from pydantic_marshals.contains import assert_contains
+from starlette.datastructures import UploadFile
+
+from app.common.starlette_uploads_ext import UploadResponses, store_upload
+
+pytestmark = pytest.mark.anyio
+
+CHUNK_SIZE = 16
+
+
+@pytest.fixture()
+def content(faker: Faker) -> bytes:
+    return faker.binary(length=CHUNK_SIZE * 4 + 1)
+
+
+@pytest.fixture()
+def path(tmp_path: Path) -> Path:
+    return tmp_path / "uploads" / "file"
+
+
+async def test_storing_upload(content: bytes, path: Path) -> None:
+    stored_upload = await store_upload(
+        upload=UploadFile(file=BytesIO(content), size=len(content)),
+        path=path,
+        max_size=len(content),
+        chunk_size=CHUNK_SIZE,
+    )
+
+    assert stored_upload.sha256 == sha256(content).hexdigest()
+    assert stored_upload.size == len(content)
+    assert path.read_bytes() == content
+    assert list(path.parent.iterdir()) == [path]
+
+
+@pytest.mark.parametrize(
+    "known_size",
+    [
+        pytest.param(True, id="known_size"),
+        pytest.param(False, id="unknown_size"),
+    ],
+)
+async def test_storing_upload_too_large(
+    content: bytes, path: Path, known_size: bool
+) -> None:
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"previous")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await store_upload(
+            upload=UploadFile(
+                file=BytesIO(content), size=len(content) if known_size else None
+            ),
+            path=path,
+            max_size=len(content) - 1,
+            chunk_size=CHUNK_SIZE,
+        )
+    assert_contains(exc_info, {"value": UploadResponses.TOO_LARGE})
+
+    assert path.read_bytes() == b"previous"
+    assert list(path.parent.iterdir()) == [path]
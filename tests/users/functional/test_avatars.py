@@ -1,12 +1,17 @@
 from collections.abc import AsyncIterator
+from io import BytesIO
 
 import pytest
 from faker import Faker
+from PIL import Image
 from starlette import status
 from starlette.testclient import TestClient
 
+from app.common.config import settings
+from app.common.pillow_ext import IMAGE_VARIANT_SIZES
 from app.users.models.users_db import User
 from tests.common.assert_contains_ext import assert_nodata_response, assert_response
+from tests.common.mock_stack import MockStack
 
 pytestmark = pytest.mark.anyio
 
@@ -16,12 +21,18 @@ async def image(faker: Faker) -> bytes:
     return faker.graphic_webp_file(raw=True)  # type: ignore[no-any-return]
 
 
+@pytest.fixture()
+async def broken_image(faker: Faker) -> bytes:
+    # passes the webp signature check, but can't be decoded
+    return b"RIFF\x00\x00\x00\x00WEBPVP8 " + faker.random.randbytes(100)
+
+
 @pytest.fixture()
 async def _create_avatar(user: User, image: bytes) -> AsyncIterator[None]:
     with user.avatar_path.open("wb") as f:
         f.write(image)
     yield
-    user.avatar_path.unlink(missing_ok=True)
+    user.unlink_avatar()
 
 
 async def test_avatar_uploading(
@@ -38,7 +49,11 @@ async def test_avatar_uploading(
     with user.avatar_path.open("rb") as f:
         assert f.read() == image
 
-    user.avatar_path.unlink()
+    for size in IMAGE_VARIANT_SIZES:
+        with Image.open(user.build_avatar_variant_path(size)) as variant:
+            assert max(variant.size) <= size
+
+    user.unlink_avatar()
 
 
 async def test_avatar_uploading_wrong_format(
@@ -54,6 +69,52 @@ async def test_avatar_uploading_wrong_format(
     )
 
 
+async def test_avatar_uploading_too_large(
+    mock_stack: MockStack,
+    authorized_client: TestClient,
+    user: User,
+    image: bytes,
+) -> None:
+    mock_stack.enter_patch(settings.uploads, "max_avatar_size", new=len(image) - 1)
+
+    assert_response(
+        authorized_client.put(
+            "/api/protected/user-service/users/current/avatar/",
+            files={"avatar": ("avatar.webp", image, "image/webp")},
+        ),
+        expected_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        expected_json={"detail": "Upload is too large"},
+    )
+
+    assert not user.avatar_path.is_file()
+
+
+@pytest.mark.usefixtures("_create_avatar")
+async def test_avatar_uploading_broken_image(
+    authorized_client: TestClient,
+    user: User,
+    image: bytes,
+    broken_image: bytes,
+) -> None:
+    assert_response(
+        authorized_client.put(
+            "/api/protected/user-service/users/current/avatar/",
+            files={"avatar": ("avatar.webp", broken_image, "image/webp")},
+        ),
+        expected_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        expected_json={"detail": "Invalid image format"},
+    )
+
+    # the previous avatar is kept as is
+    with user.avatar_path.open("rb") as f:
+        assert f.read() == image
+    # and no temporary files are left behind
+    assert not any(
+        path.name.startswith(".") and path.name.lstrip(".").startswith(f"{user.id}.")
+        for path in user.avatar_path.parent.iterdir()
+    )
+
+
 @pytest.mark.usefixtures("_create_avatar")
 async def test_avatar_replacing(
     authorized_client: TestClient, user: User, faker: Faker
@@ -87,3 +148,76 @@ async def test_mub_user_deletion_with_avatar(
     assert_nodata_response(mub_client.delete(f"/mub/user-service/users/{user.id}/"))
 
     assert not user.avatar_path.is_file()
+
+
+@pytest.mark.parametrize(
+    "size",
+    [
+        pytest.param(None, id="original"),
+        pytest.param(64, id="variant"),
+    ],
+)
+@pytest.mark.usefixtures("_create_avatar")
+async def test_avatar_reading(
+    authorized_client: TestClient,
+    user: User,
+    image: bytes,
+    size: int | None,
+) -> None:
+    response = assert_response(
+        authorized_client.get(
+            f"/api/protected/user-service/users/{user.id}/avatar/",
+            params=None if size is None else {"size": size},
+        ),
+        expected_headers={"Content-Type": "image/webp"},
+        expected_json=None,
+    )
+
+    if size is None:
+        assert response.content == image
+    else:
+        assert response.content == user.build_avatar_variant_path(size).read_bytes()
+        with Image.open(BytesIO(response.content)) as variant:
+            assert max(variant.size) <= size
+
+
+@pytest.mark.parametrize(
+    "size",
+    [
+        pytest.param(None, id="original"),
+        pytest.param(64, id="variant"),
+    ],
+)
+async def test_avatar_reading_missing(
+    authorized_client: TestClient,
+    user: User,
+    size: int | None,
+) -> None:
+    assert_response(
+        authorized_client.get(
+            f"/api/protected/user-service/users/{user.id}/avatar/",
+            params=None if size is None else {"size": size},
+        ),
+        expected_code=status.HTTP_404_NOT_FOUND,
+        expected_json={"detail": "Avatar not found"},
+    )
+
+
+async def test_avatar_reading_broken_image(
+    authorized_client: TestClient,
+    user: User,
+    broken_image: bytes,
+) -> None:
+    with user.avatar_path.open("wb") as f:
+        f.write(broken_image)
+
+    assert_response(
+        authorized_client.get(
+            f"/api/protected/user-service/users/{user.id}/avatar/",
+            params={"size": 64},
+        ),
+        expected_code=status.HTTP_409_CONFLICT,
+        expected_json={"detail": "Avatar can't be resized"},
+    )
+
+    user.unlink_avatar()
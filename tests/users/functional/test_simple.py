@@ -6,12 +6,14 @@ from starlette import status
 from starlette.testclient import TestClient
 
 from app.common.config import settings
+from app.common.dependencies.authorization_dep import ProxyAuthData
 from app.common.utils.datetime import datetime_utc_now
 from app.users.models.sessions_db import Session
 from app.users.models.users_db import User
 from app.users.utils.authorization import AUTH_COOKIE_NAME, AUTH_HEADER_NAME
 from tests.common.active_session import ActiveSession
 from tests.common.assert_contains_ext import assert_nodata_response, assert_response
+from tests.common.mock_stack import MockStack
 from tests.common.types import AnyJSON, PytestRequest
 from tests.users.utils import assert_session_from_cookie
 
@@ -60,6 +62,7 @@ def proxy_auth_path(request: PytestRequest[str]) -> str:
     return request.param
 
 
+@pytest.mark.query_budget(statements=1)
 async def test_requesting_proxy_auth(
     authorized_proxy_client: TestClient,
     session: Session,
@@ -76,6 +79,55 @@ async def test_requesting_proxy_auth(
     )
 
 
+async def test_requesting_proxy_auth_cached(
+    mock_stack: MockStack,
+    authorized_proxy_client: TestClient,
+    session: Session,
+    user: User,
+) -> None:
+    expected_headers = {
+        "X-User-ID": str(user.id),
+        "X-Username": user.username,
+        "X-Session-ID": str(session.id),
+    }
+    assert_nodata_response(
+        authorized_proxy_client.get("/proxy/auth/"),
+        expected_headers=expected_headers,
+    )
+
+    find_session_mock = mock_stack.enter_async_mock(
+        Session, "find_first_by_token_with_user"
+    )
+    assert_nodata_response(
+        authorized_proxy_client.get("/proxy/auth/"),
+        expected_headers=expected_headers,
+    )
+    find_session_mock.assert_not_called()
+
+
+async def test_requesting_proxy_auth_after_signing_out(
+    authorized_proxy_client: TestClient,
+    session: Session,
+    user: User,
+) -> None:
+    assert_nodata_response(authorized_proxy_client.get("/proxy/auth/"))
+
+    assert_nodata_response(
+        authorized_proxy_client.delete(
+            "/api/protected/user-service/sessions/current/",
+            headers=ProxyAuthData(
+                session_id=session.id, user_id=user.id, username=user.username
+            ).as_headers,
+        )
+    )
+
+    assert_response(
+        authorized_proxy_client.get("/proxy/auth/"),
+        expected_code=status.HTTP_401_UNAUTHORIZED,
+        expected_json={"detail": "Session is invalid"},
+    )
+
+
 async def test_requesting_options_in_proxy_auth(
     authorized_proxy_client: TestClient,
     session: Session,
@@ -0,0 +1,117 @@
+from contextlib import AsyncExitStack
+
+import pytest
+from faststream.redis import RedisBroker
+from respx import MockRouter
+from starlette.testclient import TestClient
+
+from app.common.bridges.base_bdg import LoopbackASGITransport
+from app.common.bridges.users_internal_bdg import UsersInternalBridge
+from app.common.config import settings
+from app.common.sqlalchemy_ext import session_context
+from app.users.models.users_db import User
+from tests.common.mock_stack import MockStack
+from tests.common.types import AnyJSON
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize(
+    ("bridge_base_url", "base_url", "is_colocated"),
+    [
+        pytest.param(
+            "http://localhost:5000",
+            "http://localhost:5000/internal/user-service",
+            True,
+            id="service_path",
+        ),
+        pytest.param(
+            "http://localhost:5000/api/",
+            "http://localhost:5000/api",
+            True,
+            id="same_path",
+        ),
+        pytest.param(
+            "http://localhost:5000",
+            "http://localhost:50001/internal/user-service",
+            False,
+            id="other_port",
+        ),
+        pytest.param(
+            "http://localhost:5000",
+            "https://localhost:5000/internal/user-service",
+            False,
+            id="other_scheme",
+        ),
+        pytest.param(
+            "http://localhost",
+            "http://localhost.example.com/internal/user-service",
+            False,
+            id="other_host",
+        ),
+        pytest.param(
+            "http://localhost:5000/api",
+            "http://localhost:5000/api-v2/internal/user-service",
+            False,
+            id="other_path",
+        ),
+    ],
+)
+def test_bridge_colocation(
+    mock_stack: MockStack,
+    bridge_base_url: str,
+    base_url: str,
+    is_colocated: bool,
+) -> None:
+    bridge = UsersInternalBridge()
+    bridge.base_url = base_url
+    mock_stack.enter_patch(settings, "bridge_base_url", new=bridge_base_url)
+
+    assert bridge.is_colocated is is_colocated
+
+
+async def test_bridge_calling_colocated_service(
+    client: TestClient,
+    faststream_broker: RedisBroker,
+    user: User,
+    user_profile_data: AnyJSON,
+) -> None:
+    bridge = UsersInternalBridge()
+    session = session_context.get()
+
+    async with AsyncExitStack() as exit_stack:
+        await bridge.setup(
+            exit_stack=exit_stack, broker=faststream_broker, asgi_app=client.app
+        )
+        assert isinstance(bridge.client._transport, LoopbackASGITransport)
+
+        user_profile = await bridge.retrieve_user(user.id)
+
+    assert user_profile.model_dump(mode="json") == user_profile_data
+    assert session_context.get() is session  # the app runs in a copied context
+
+
+async def test_bridge_calling_not_colocated_service(
+    mock_stack: MockStack,
+    client: TestClient,
+    faststream_broker: RedisBroker,
+    users_internal_respx_mock: MockRouter,
+    user: User,
+    user_profile_data: AnyJSON,
+) -> None:
+    bridge = UsersInternalBridge()
+    mock_stack.enter_patch(settings, "bridge_base_url", new="http://other-host:5000")
+    retrieve_user_mock = users_internal_respx_mock.get(f"/users/{user.id}/").respond(
+        json=user_profile_data
+    )
+
+    async with AsyncExitStack() as exit_stack:
+        await bridge.setup(
+            exit_stack=exit_stack, broker=faststream_broker, asgi_app=client.app
+        )
+        assert not isinstance(bridge.client._transport, LoopbackASGITransport)
+
+        user_profile = await bridge.retrieve_user(user.id)
+
+    assert user_profile.model_dump(mode="json") == user_profile_data
+    retrieve_user_mock.calls.assert_called_once()
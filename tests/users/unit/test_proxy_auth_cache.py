@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import pytest
+from freezegun import freeze_time
+
+from app.common.utils.datetime import datetime_utc_now
+from app.users.utils.proxy_auth_cache import ProxyAuthCache, ProxyAuthCacheEntry
+from tests.common.active_session import ActiveSession
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture()
+def cache() -> ProxyAuthCache:
+    return ProxyAuthCache(redis=None, local_ttl=5, local_max_size=2, shared_ttl=60)
+
+
+def build_entry(user_id: int = 1, session_id: int = 1) -> ProxyAuthCacheEntry:
+    return ProxyAuthCacheEntry(
+        session_id=session_id,
+        user_id=user_id,
+        username="username",
+        expires_at=datetime_utc_now() + timedelta(days=7),
+        renew_after=datetime_utc_now() + timedelta(days=4),
+    )
+
+
+async def test_caching_entry(cache: ProxyAuthCache) -> None:
+    entry = build_entry()
+    await cache.set("token", entry)
+
+    assert await cache.get("token") == entry
+    assert await cache.get("other") is None
+
+
+async def test_cached_entry_local_expiry(cache: ProxyAuthCache) -> None:
+    with freeze_time() as frozen_time:
+        await cache.set("token", build_entry())
+        frozen_time.tick(timedelta(seconds=cache.local_ttl + 1))
+        assert await cache.get("token") is None
+
+
+async def test_cached_entry_renewal_required(cache: ProxyAuthCache) -> None:
+    entry = build_entry()
+    entry.renew_after = datetime_utc_now() - timedelta(seconds=1)
+    await cache.set("token", entry)
+
+    assert await cache.get("token") is None
+
+
+async def test_cached_entries_eviction(cache: ProxyAuthCache) -> None:
+    for index in range(cache.local_max_size + 1):
+        await cache.set(f"token{index}", build_entry(session_id=index))
+
+    assert await cache.get("token0") is None
+    assert len(cache.local_entries) == cache.local_max_size
+
+
+async def test_invalidating_token(cache: ProxyAuthCache) -> None:
+    await cache.set("token", build_entry())
+    await cache.invalidate_token("token")
+
+    assert await cache.get("token") is None
+
+
+async def test_invalidating_user(cache: ProxyAuthCache) -> None:
+    await cache.set("token1", build_entry(user_id=1, session_id=1))
+    await cache.set("token2", build_entry(user_id=2, session_id=2))
+    await cache.invalidate_user(user_id=1)
+
+    assert await cache.get("token1") is None
+    assert await cache.get("token2") is not None
+
+
+async def test_invalidating_after_commit(
+    active_session: ActiveSession,
+    cache: ProxyAuthCache,
+) -> None:
+    entry = build_entry()
+    await cache.set("token", entry)
+
+    with pytest.raises(RuntimeError):
+        async with active_session():
+            cache.invalidate_token_after_commit("token")
+            raise RuntimeError
+    assert await cache.get("token") == entry
+
+    async with active_session():
+        cache.invalidate_token_after_commit("token")
+        assert await cache.get("token") == entry
+    assert await cache.get("token") is None